@@ -49,6 +49,10 @@ async def update_llm_model(
     obj = AIModelService.update_model(db, model_id, payload)
     if not obj:
         return error_response(message="Not found")
+    
+    # 修改的是当前主力模型时清除 Agent 缓存（Registry 仅在 invalidate 后重新校验配置）
+    if obj.is_active:
+        AgentRegistry.get_instance().invalidate()
     return success_response(data=AIModelOut.from_orm(obj))
 
 
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from neo4j import Driver, GraphDatabase
 
 
@@ -14,3 +16,13 @@ def get_neo4j_driver() -> Driver:
         DEFAULT_NEO4J_URI,
         auth=(DEFAULT_NEO4J_USER, DEFAULT_NEO4J_PASSWORD),
     )
+
+
+@lru_cache(maxsize=1)
+def get_shared_neo4j_driver() -> Driver:
+    """进程内共享的 Neo4j 驱动
+
+    驱动自带连接池且线程安全，高频的只读查询复用同一实例即可复用已建立的连接；
+    调用方只需按次打开/关闭 session，不要 close 该驱动。
+    """
+    return get_neo4j_driver()
@@ -6,17 +6,40 @@
 
 解决方案：
 在 _astream 阶段拦截 tool_call_chunks，根据 id 字段自动修正 index。
+
+另外：bind_tools 时缓存每个工具转换后的 OpenAI schema，
+工具实例为模块级单例且被多个 Agent 共享，无需每次绑定都重新反射 Pydantic 模型。
 """
 
-from typing import Any, AsyncIterator, Optional
+from threading import Lock
+from typing import Any, AsyncIterator, Dict, Optional, Sequence, Tuple
 
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import AIMessageChunk
 from langchain_core.outputs import ChatGenerationChunk
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
 
 from backend.app.core.logger import logger
 
 
+# 工具 schema 缓存：id(tool) -> (tool, schema)，保留 tool 引用避免 id 被复用
+_TOOL_SCHEMA_CACHE: Dict[int, Tuple[BaseTool, Dict[str, Any]]] = {}
+_TOOL_SCHEMA_LOCK = Lock()
+
+
+def _get_openai_tool_schema(tool: BaseTool) -> Dict[str, Any]:
+    """获取工具的 OpenAI function schema（按工具实例缓存）"""
+    cached = _TOOL_SCHEMA_CACHE.get(id(tool))
+    if cached is not None and cached[0] is tool:
+        return cached[1]
+    
+    schema = convert_to_openai_tool(tool)
+    with _TOOL_SCHEMA_LOCK:
+        _TOOL_SCHEMA_CACHE[id(tool)] = (tool, schema)
+    return schema
+
+
 class PatchedChatOpenAI(ChatOpenAI):
     """修复 tool_call index 的 ChatOpenAI 子类
     
@@ -24,6 +47,25 @@ class PatchedChatOpenAI(ChatOpenAI):
     确保不同工具调用有不同的 index。
     """
     
+    def bind_tools(
+        self,
+        tools: Sequence[Any],
+        *,
+        strict: Optional[bool] = None,
+        **kwargs: Any,
+    ):
+        """绑定工具前将 BaseTool 替换为缓存的 OpenAI schema
+        
+        create_agent 每次模型调用都会重新 bind_tools，缓存可跳过重复的 schema 反射。
+        指定 strict 时 schema 需按 strict 规则重新生成，不走缓存。
+        """
+        if strict is None:
+            tools = [
+                _get_openai_tool_schema(t) if isinstance(t, BaseTool) else t
+                for t in tools
+            ]
+        return super().bind_tools(tools, strict=strict, **kwargs)
+    
     async def _astream(
         self,
         *args: Any,
@@ -6,6 +6,7 @@
 - get_lite_task_llm: 创建轻量任务 LLM 实例（低温度，用于工具内部快速调用）
 """
 
+from functools import lru_cache
 from typing import Union, Optional
 
 from sqlalchemy.orm import Session
@@ -19,11 +20,60 @@ from backend.app.core.logger import logger
 
 
 
+@lru_cache(maxsize=4)
+def _build_langchain_llm(
+    model_name: str,
+    api_key: str,
+    base_url: Optional[str],
+    temperature: float,
+) -> PatchedChatOpenAI:
+    """按最终构造参数缓存 PatchedChatOpenAI 实例
+    
+    相同配置重复调用时直接复用已有实例，跳过客户端初始化。
+    配置变更后参数不同，自然构造新实例；也可通过 clear_llm_cache() 主动清空。
+    """
+    return PatchedChatOpenAI(
+        model=model_name,
+        api_key=api_key,
+        base_url=base_url,
+        temperature=temperature,
+        streaming=True,
+    )
+
+
+@lru_cache(maxsize=4)
+def _build_lite_task_llm(
+    model_name: str,
+    api_key: str,
+    base_url: Optional[str],
+) -> PatchedChatOpenAI:
+    """按构造参数缓存轻量任务 LLM 实例
+    
+    复用同一实例即复用其底层 HTTP 连接池（keep-alive），
+    工具内部频繁调用时无需每次重新建立 TCP/TLS 连接。
+    """
+    return PatchedChatOpenAI(
+        model=model_name,
+        api_key=api_key,
+        base_url=base_url,
+        temperature=0.1,
+        max_tokens=2000,
+        streaming=False,
+    )
+
+
+def clear_llm_cache() -> None:
+    """清空 LangChain LLM 实例缓存（含轻量任务 LLM）"""
+    _build_langchain_llm.cache_clear()
+    _build_lite_task_llm.cache_clear()
+
+
 def get_langchain_llm(db: Session) -> PatchedChatOpenAI:
     """基于当前激活的 AIModel 构造 LangChain ChatOpenAI 实例
     
     使用 PatchedChatOpenAI 修复流式响应中 tool_call index 字段错误的问题。
     某些 API 网关返回的 index 全为 0，会导致多个工具调用被错误合并。
+    相同配置下返回同一个缓存实例。
     
     Args:
         db: 数据库会话
@@ -47,13 +97,7 @@ def get_langchain_llm(db: Session) -> PatchedChatOpenAI:
             base_url = base_url + "/v1"
         
         logger.info(f"[LangChainLLM] 自定义网关模式: model={config.model_name}, base={base_url}")
-        return PatchedChatOpenAI(
-            model=config.model_name,
-            api_key=config.api_key,
-            base_url=base_url,
-            temperature=config.temperature,
-            streaming=True,
-        )
+        return _build_langchain_llm(config.model_name, config.api_key, base_url, config.temperature)
     
     # 标准模式：使用 provider 的 base_url
     base_url = config.base_url
@@ -62,13 +106,7 @@ def get_langchain_llm(db: Session) -> PatchedChatOpenAI:
     
     logger.info(f"[LangChainLLM] 标准模式: model={config.model_name}, base={base_url}")
     
-    return PatchedChatOpenAI(
-        model=config.model_name,
-        api_key=config.api_key,
-        base_url=base_url,
-        temperature=config.temperature,
-        streaming=True,
-    )
+    return _build_langchain_llm(config.model_name, config.api_key, base_url, config.temperature)
 
 
 def get_crewai_llm(db: Session) -> Union[LLM, BaseLLM]:
@@ -135,19 +173,20 @@ def get_crewai_llm(db: Session) -> Union[LLM, BaseLLM]:
         return llm
 
 
-def get_lite_task_llm(db: Session) -> PatchedChatOpenAI:
+def get_lite_task_llm(db: Optional[Session] = None) -> PatchedChatOpenAI:
     """基于小任务模型配置构造轻量 LLM 实例
     
     用于工具内部快速调用（如实体选择器），固定低温度保证输出稳定。
     未设置小任务模型时自动 fallback 到主力模型。
+    相同配置下返回同一个缓存实例，复用底层 HTTP 连接。
     
     Args:
-        db: 数据库会话
+        db: 可选，数据库会话；不传时仅在配置缓存未命中时才临时创建会话
         
     Returns:
         PatchedChatOpenAI 实例（temperature=0.1, max_tokens=2000）
     """
-    config = AIModelService.get_task_llm_config(db)
+    config = AIModelService.get_cached_task_llm_config(db)
     
     # 自定义网关模式
     if config.provider_type == "custom_gateway" and config.gateway_endpoint:
@@ -161,14 +200,7 @@ def get_lite_task_llm(db: Session) -> PatchedChatOpenAI:
             base_url = base_url + "/v1"
         
         logger.debug(f"[LiteTaskLLM] 自定义网关模式: model={config.model_name}, base={base_url}")
-        return PatchedChatOpenAI(
-            model=config.model_name,
-            api_key=config.api_key,
-            base_url=base_url,
-            temperature=0.1,
-            max_tokens=2000,
-            streaming=False,
-        )
+        return _build_lite_task_llm(config.model_name, config.api_key, base_url)
     
     # 标准模式
     base_url = config.base_url
@@ -177,11 +209,4 @@ def get_lite_task_llm(db: Session) -> PatchedChatOpenAI:
     
     logger.debug(f"[LiteTaskLLM] 标准模式: model={config.model_name}, base={base_url}")
     
-    return PatchedChatOpenAI(
-        model=config.model_name,
-        api_key=config.api_key,
-        base_url=base_url,
-        temperature=0.1,
-        max_tokens=2000,
-        streaming=False,
-    )
+    return _build_lite_task_llm(config.model_name, config.api_key, base_url)
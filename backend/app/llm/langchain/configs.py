@@ -6,12 +6,15 @@
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Callable, List, Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any, TYPE_CHECKING
 
 from langchain_core.tools import BaseTool
 
 from backend.app.llm.config import CodeWorkspaceConfig
 
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
 
 @dataclass
 class AgentConfig:
@@ -28,6 +31,28 @@ class AgentConfig:
     tags: List[str] = field(default_factory=list)  # 标签（用于分类筛选）
 
 
+@dataclass(frozen=True, slots=True)
+class TestingSessionMeta:
+    """测试会话元信息（创建后不再变化，三个阶段共享同一份）"""
+    
+    session_id: str = ""
+    project_name: str = ""
+    requirement_id: str = ""
+    requirement_name: str = ""
+    
+    @classmethod
+    def from_context(cls, agent_context: Optional[Dict[str, Any]]) -> "TestingSessionMeta":
+        """从 agent_context 中提取会话元信息，缺失字段为空字符串"""
+        if not agent_context:
+            return cls()
+        return cls(
+            session_id=agent_context.get("session_id") or "",
+            project_name=agent_context.get("project_name") or "",
+            requirement_id=agent_context.get("requirement_id") or "",
+            requirement_name=agent_context.get("requirement_name") or "",
+        )
+
+
 # ============================================================
 # System Prompts
 # ============================================================
@@ -289,6 +314,7 @@ LOG_TROUBLESHOOT_SYSTEM_PROMPT = """
 
 **可用工具**：
 - `get_table_schema`：获取表结构定义（DDL），了解表的字段、类型、索引等信息
+- `get_table_schemas`：批量获取多张表的结构定义，涉及多张表（如 JOIN）时优先使用，一次调用返回全部表
 - `query_database`：执行只读 SQL 查询，验证数据状态
 
 **⚠️ 重要：这是高危操作，必须遵守以下规则 ⚠️**
@@ -783,7 +809,11 @@ def get_intelligent_testing_tools() -> List[BaseTool]:
     return get_all_testing_tools()
 
 
-def get_testing_phase_system_prompt(phase: str, agent_context: Optional[Dict[str, Any]] = None) -> str:
+def get_testing_phase_system_prompt(
+    phase: str,
+    agent_context: Optional[Dict[str, Any]] = None,
+    db: Optional["Session"] = None,
+) -> str:
     """动态生成测试助手阶段 System Prompt
     
     根据阶段类型和上下文，注入前序阶段的摘要信息。
@@ -791,6 +821,7 @@ def get_testing_phase_system_prompt(phase: str, agent_context: Optional[Dict[str
     Args:
         phase: 阶段标识 (analysis/plan/generate)
         agent_context: 上下文信息，包含 session_id, project_name, requirement_id 等
+        db: 可选，复用请求级数据库会话读取前序阶段摘要
         
     Returns:
         完整的 System Prompt
@@ -798,18 +829,14 @@ def get_testing_phase_system_prompt(phase: str, agent_context: Optional[Dict[str
     from backend.app.core.logger import logger
     logger.info(f"[Testing] get_testing_phase_system_prompt: phase={phase}, agent_context={agent_context}")
     
+    meta = TestingSessionMeta.from_context(agent_context)
+    
     if phase == "analysis":
-        # 注入项目和需求信息
-        project_name = agent_context.get("project_name", "") if agent_context else ""
-        requirement_id = agent_context.get("requirement_id", "") if agent_context else ""
-        requirement_name = agent_context.get("requirement_name", "") if agent_context else ""
-        session_id = agent_context.get("session_id", "") if agent_context else ""
-        
         context_section = f"""## 当前任务信息
-        **项目名称**: {project_name}
-        **需求编号**: {requirement_id}
-        **需求标题**: {requirement_name}
-        **会话ID**: `{session_id}`
+        **项目名称**: {meta.project_name}
+        **需求编号**: {meta.requirement_id}
+        **需求标题**: {meta.requirement_name}
+        **会话ID**: `{meta.session_id}`
         
         **⚠️ 重要**：调用任何工具时，session_id 必须**完整复制**上述会话ID，不能截断或修改！（共36字符）
         
@@ -818,32 +845,26 @@ def get_testing_phase_system_prompt(phase: str, agent_context: Optional[Dict[str
         # 获取代码库工作区描述
         workspace_desc = CodeWorkspaceConfig.get_workspace_description()
         
-        return TESTING_ANALYSIS_SYSTEM_PROMPT.format(
+        prompt = TESTING_ANALYSIS_SYSTEM_PROMPT.format(
             context_section=context_section,
             workspace_description=workspace_desc
         )
     
     elif phase == "plan":
-        # 注入上下文信息（session_id 等）
-        session_id = agent_context.get("session_id", "") if agent_context else ""
-        project_name = agent_context.get("project_name", "") if agent_context else ""
-        requirement_id = agent_context.get("requirement_id", "") if agent_context else ""
-        requirement_name = agent_context.get("requirement_name", "") if agent_context else ""
-        
         context_section = f"""## 当前任务信息
         
-        **会话ID**: `{session_id}`
-        **项目名称**: {project_name}
-        **需求编号**: {requirement_id}
-        **需求标题**: {requirement_name}
+        **会话ID**: `{meta.session_id}`
+        **项目名称**: {meta.project_name}
+        **需求编号**: {meta.requirement_id}
+        **需求标题**: {meta.requirement_name}
         
         **⚠️ 重要**：调用任何工具时，session_id 必须**完整复制**上述会话ID，不能截断或修改！（共36字符）"""
         
         # 注入需求分析摘要
         analysis_summary = ""
-        if session_id:
+        if meta.session_id:
             from backend.app.services.intelligent_testing_service import get_phase_summary_sync
-            analysis_summary = get_phase_summary_sync(session_id, "requirement_summary")
+            analysis_summary = get_phase_summary_sync(meta.session_id, "requirement_summary", db)
         
         if analysis_summary:
             summary_section = f"""## 需求分析摘要（来自上一阶段）
@@ -854,32 +875,26 @@ def get_testing_phase_system_prompt(phase: str, agent_context: Optional[Dict[str
         else:
             summary_section = "## 注意：尚未获取到需求分析摘要，请先完成需求分析阶段。"
         
-        return TESTING_PLAN_SYSTEM_PROMPT.format(
+        prompt = TESTING_PLAN_SYSTEM_PROMPT.format(
             context_section=context_section,
             analysis_summary_section=summary_section
         )
     
     elif phase == "generate":
-        # 注入上下文信息（session_id 等）
-        session_id = agent_context.get("session_id", "") if agent_context else ""
-        project_name = agent_context.get("project_name", "") if agent_context else ""
-        requirement_id = agent_context.get("requirement_id", "") if agent_context else ""
-        requirement_name = agent_context.get("requirement_name", "") if agent_context else ""
-        
         context_section = f"""## 当前任务信息
 
-        **会话ID**: `{session_id}`
-        **项目名称**: {project_name}
-        **需求编号**: {requirement_id}
-        **需求标题**: {requirement_name}
+        **会话ID**: `{meta.session_id}`
+        **项目名称**: {meta.project_name}
+        **需求编号**: {meta.requirement_id}
+        **需求标题**: {meta.requirement_name}
         
         **⚠️ 重要**：调用任何工具时，session_id 必须**完整复制**上述会话ID，不能截断或修改！（共36字符）"""
         
         # 注入测试方案摘要
         plan_summary = ""
-        if session_id:
+        if meta.session_id:
             from backend.app.services.intelligent_testing_service import get_phase_summary_sync
-            plan_summary = get_phase_summary_sync(session_id, "test_plan")
+            plan_summary = get_phase_summary_sync(meta.session_id, "test_plan", db)
         
         if plan_summary:
             summary_section = f"""## 测试方案摘要（来自上一阶段）
@@ -890,13 +905,39 @@ def get_testing_phase_system_prompt(phase: str, agent_context: Optional[Dict[str
         else:
             summary_section = "## 注意：尚未获取到测试方案摘要，请先完成测试方案阶段。"
         
-        return TESTING_GENERATE_SYSTEM_PROMPT.format(
+        prompt = TESTING_GENERATE_SYSTEM_PROMPT.format(
             context_section=context_section,
             plan_summary_section=summary_section
         )
     
     else:
         return TESTING_ANALYSIS_SYSTEM_PROMPT
+    
+    return prompt + _get_phase_plan_section(phase, meta, db)
+
+
+def _get_phase_plan_section(
+    phase: str,
+    meta: TestingSessionMeta,
+    db: Optional["Session"] = None,
+) -> str:
+    """生成「参考执行计划」段落（来自同项目该阶段上次成功的工具调用顺序）"""
+    if db is None or not meta.project_name:
+        return ""
+    
+    from backend.app.services.intelligent_testing_service import get_cached_phase_plan, phase_plan_key
+    plan = get_cached_phase_plan(db, phase, phase_plan_key(meta.project_name))
+    if not plan:
+        return ""
+    
+    steps = "\n".join(f"{i}. {step}" for i, step in enumerate(plan, 1))
+    return f"""
+
+## 参考执行计划（本项目历史任务成功完成本阶段时的工具调用顺序）
+
+{steps}
+
+可直接按此顺序执行以节省规划时间；如当前需求有差异，请按实际情况调整。"""
 
 
 def get_log_troubleshoot_system_prompt(agent_context: Optional[Dict[str, Any]] = None) -> str:
@@ -9,8 +9,9 @@
 """
 
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from threading import Lock
-from typing import Dict, Optional, Any, TYPE_CHECKING
+from typing import Dict, List, Optional, Any, TYPE_CHECKING
 
 from langchain.agents import create_agent
 from langchain.agents.middleware import (
@@ -27,7 +28,7 @@ from backend.app.llm.langchain.configs import (
     get_log_troubleshoot_system_prompt,
     get_testing_phase_system_prompt,
 )
-from backend.app.llm.factory import get_langchain_llm
+from backend.app.llm.factory import get_langchain_llm, clear_llm_cache
 from backend.app.services.ai_model_service import AIModelService
 from backend.app.core.logger import logger
 
@@ -49,16 +50,33 @@ class AgentRegistry:
         agent = registry.get_agent("knowledge_qa", db)
     """
     
+    __slots__ = (
+        "_llm_cache",
+        "_tools_cache",
+        "_config_cache",
+        "_config_hashes",
+        "_cache_lock",
+        "_per_type_locks",
+        "_config_version",
+        "_last_seen_version",
+    )
+    
     _instance: Optional["AgentRegistry"] = None
     _lock: Lock = Lock()
     
     def __init__(self):
         """Private constructor. Use get_instance() instead."""
         # 缓存 LLM 实例和工具列表（这些是初始化开销较大的部分）
-        self._llm_cache: Dict[str, any] = {}  # LLM 实例缓存
+        self._llm_cache: Dict[str, Any] = {}  # LLM 实例缓存
         self._tools_cache: Dict[str, list] = {}  # 工具列表缓存
+        self._config_cache: Dict[str, AgentConfig] = {}  # Agent 配置缓存（仅在缓存未命中时查询）
         self._config_hashes: Dict[str, str] = {}
         self._cache_lock = Lock()
+        # 按 agent_type 细分的刷新锁，不同类型的首次创建互不阻塞
+        self._per_type_locks: Dict[str, Lock] = {}
+        # 配置版本号：仅 invalidate() 时递增；版本未变时跳过配置 hash 的数据库查询
+        self._config_version = 0
+        self._last_seen_version: Dict[str, int] = {}
     
     @classmethod
     def get_instance(cls) -> "AgentRegistry":
@@ -94,58 +112,79 @@ class AgentRegistry:
         Raises:
             ValueError: 未知的 agent_type
         """
-        # 获取 Agent 配置
-        config = get_agent_config(agent_type)
+        # 快速路径：自上次校验后未发生 invalidate，直接使用缓存
+        # invalidate 只持有 _cache_lock，缓存可能随时被清空，因此一次性取出到局部变量，任一缺失则走刷新路径
+        version = self._config_version
+        if self._last_seen_version.get(agent_type) == version:
+            config = self._config_cache.get(agent_type)
+            llm = self._llm_cache.get(agent_type)
+            tools = self._tools_cache.get(agent_type)
+            if config is not None and llm is not None and tools is not None:
+                return self._create_agent(agent_type, config, llm, tools, checkpointer, agent_context, db)
         
         # 计算当前 LLM 配置的 hash
         current_hash = self._compute_llm_config_hash(db)
         
-        # 检查是否需要重新创建 LLM 和 Tools
-        need_refresh = (
-            agent_type not in self._llm_cache or
-            self._config_hashes.get(agent_type) != current_hash
-        )
+        # dict.setdefault 是原子操作，无需全局锁即可拿到该类型专属的锁
+        type_lock = self._per_type_locks.setdefault(agent_type, Lock())
         
-        if need_refresh:
-            with self._cache_lock:
-                # Double-check
-                if (agent_type not in self._llm_cache or 
-                    self._config_hashes.get(agent_type) != current_hash):
-                    
-                    logger.info(f"[AgentRegistry] {'创建' if agent_type not in self._llm_cache else '刷新'} LLM/Tools 缓存: {agent_type}")
-                    
-                    # 缓存 LLM 和 Tools
-                    self._llm_cache[agent_type] = get_langchain_llm(db)
-                    self._tools_cache[agent_type] = config.tools_factory()
-                    self._config_hashes[agent_type] = current_hash
-                    
-                    logger.info(f"[AgentRegistry] LLM/Tools 缓存已就绪: {agent_type}, tools={len(self._tools_cache[agent_type])}, hash={current_hash[:16]}...")
+        with type_lock:
+            # 在锁内快照配置、LLM 和 Tools，后续只使用局部变量
+            config = self._config_cache.get(agent_type)
+            llm = self._llm_cache.get(agent_type)
+            tools = self._tools_cache.get(agent_type)
+            
+            # 检查是否需要重新创建 LLM 和 Tools
+            need_refresh = (
+                config is None or llm is None or tools is None or
+                self._config_hashes.get(agent_type) != current_hash
+            )
+            
+            if need_refresh:
+                logger.info(f"[AgentRegistry] {'创建' if llm is None else '刷新'} LLM/Tools 缓存: {agent_type}")
+                
+                # 仅在缓存未命中时解析 Agent 配置（未知类型在此抛出 ValueError）
+                config = get_agent_config(agent_type)
+                llm = get_langchain_llm(db)
+                tools = config.tools_factory()
+                
+                # 缓存配置、LLM 和 Tools
+                self._config_cache[agent_type] = config
+                self._llm_cache[agent_type] = llm
+                self._tools_cache[agent_type] = tools
+                self._config_hashes[agent_type] = current_hash
+                
+                logger.info(f"[AgentRegistry] LLM/Tools 缓存已就绪: {agent_type}, tools={len(tools)}, hash={current_hash[:16]}...")
+            
+            self._last_seen_version[agent_type] = version
         
         # 每次请求都重新编译 Agent 并绑定 checkpointer（支持动态 context）
-        return self._create_agent(config, agent_type, checkpointer, agent_context)
+        return self._create_agent(agent_type, config, llm, tools, checkpointer, agent_context, db)
     
     def _create_agent(
         self, 
-        config: AgentConfig, 
         agent_type: str, 
+        config: AgentConfig,
+        llm: Any,
+        tools: List[Any],
         checkpointer=None,
         agent_context: Optional[Dict[str, Any]] = None,
+        db: Optional["Session"] = None,
     ) -> "CompiledGraph":
         """创建 Agent（使用缓存的 LLM 和 Tools，绑定 checkpointer）
         
         Args:
-            config: Agent 配置
             agent_type: Agent 类型标识
+            config: Agent 配置（调用方已取出的快照）
+            llm: 缓存的 LLM 实例
+            tools: 缓存的工具列表
             checkpointer: 检查点存储
             agent_context: 动态上下文配置，用于注入到 System Prompt
+            db: 请求级数据库会话，复用于构建 System Prompt 时的查询
             
         Returns:
             编译后的 CompiledGraph
         """
-        # 使用缓存的 LLM 和 Tools
-        llm = self._llm_cache.get(agent_type)
-        tools = self._tools_cache.get(agent_type, [])
-        
         # 配置中间件
         middleware: list[AgentMiddleware] = [
             ModelCallLimitMiddleware(
@@ -167,7 +206,7 @@ class AgentRegistry:
         elif agent_type == "intelligent_testing":
             # 测试助手：根据 agent_context.phase 选择阶段 prompt
             phase = agent_context.get("phase", "analysis") if agent_context else "analysis"
-            system_prompt = get_testing_phase_system_prompt(phase, agent_context)
+            system_prompt = get_testing_phase_system_prompt(phase, agent_context, db)
         else:
             system_prompt = config.system_prompt
         
@@ -212,10 +251,26 @@ class AgentRegistry:
         self.get_agent(agent_type, db)
         logger.info(f"[AgentRegistry] Agent {agent_type} 预热完成")
     
-    def warmup_all(self, db: "Session") -> None:
-        """预热所有已注册的 Agent"""
-        for agent_type in AGENT_CONFIGS.keys():
-            self.warmup(agent_type, db)
+    def warmup_all(self) -> None:
+        """并发预热所有已注册的 Agent
+        
+        各 agent_type 的预热互相独立，放到线程池并发执行。
+        SQLAlchemy Session 非线程安全，每个工作线程使用独立的数据库会话。
+        """
+        from backend.app.db.sqlite import SessionLocal
+        
+        def _warmup_with_own_session(agent_type: str) -> None:
+            db = SessionLocal()
+            try:
+                self.warmup(agent_type, db)
+            except Exception as e:
+                logger.warning(f"[AgentRegistry] Agent {agent_type} 预热失败: {e}")
+            finally:
+                db.close()
+        
+        agent_types = list(AGENT_CONFIGS.keys())
+        with ThreadPoolExecutor(max_workers=min(8, len(agent_types)) or 1) as executor:
+            list(executor.map(_warmup_with_own_session, agent_types))
     
     def invalidate(self, agent_type: Optional[str] = None) -> None:
         """手动失效缓存
@@ -225,15 +280,19 @@ class AgentRegistry:
         Args:
             agent_type: 指定类型，为 None 时清除所有缓存
         """
+        clear_llm_cache()
         with self._cache_lock:
+            self._config_version += 1
             if agent_type:
                 self._llm_cache.pop(agent_type, None)
                 self._tools_cache.pop(agent_type, None)
+                self._config_cache.pop(agent_type, None)
                 self._config_hashes.pop(agent_type, None)
                 logger.info(f"[AgentRegistry] 已失效缓存: {agent_type}")
             else:
                 self._llm_cache.clear()
                 self._tools_cache.clear()
+                self._config_cache.clear()
                 self._config_hashes.clear()
                 logger.info("[AgentRegistry] 已清除所有缓存")
     
@@ -8,8 +8,11 @@
 - code: 代码检索（MCP、文件操作、grep）
 - log: 日志查询（企业日志 API）
 - db: 数据库查询（SQL 查询）
+- testing: 智能测试（按需导入）
 """
 
+import importlib
+
 # 实体发现类工具
 from .discovery import (
     search_businesses,
@@ -58,6 +61,7 @@ from .log import (
 # 数据库查询类工具
 from .db import (
     get_table_schema,
+    get_table_schemas,
     query_database,
     get_db_tools,
     DatabaseConfig,
@@ -68,6 +72,55 @@ from .db import (
 # 工具列表导出
 # ============================================================
 
+# 工具列表在导入时构建一次，工厂函数返回副本（调用方常在其上拼接其他工具）
+_ALL_CHAT_TOOLS = (
+    # 实体发现
+    search_businesses,
+    search_implementations,
+    search_data_resources,
+    search_steps,
+    # 上下文获取
+    get_business_context,
+    get_implementation_context,
+    get_resource_context,
+    # 影响面分析
+    get_implementation_business_usages,
+    get_resource_business_usages,
+    # 图拓扑
+    get_neighbors,
+    get_path_between_entities,
+    # 代码检索
+    search_code_context,
+    grep_code,
+    list_directory,
+    read_file,
+    read_file_range,
+)
+
+_LOG_TROUBLESHOOT_TOOLS = (
+    # 日志查询
+    search_logs,
+    
+    # 代码检索（完整保留）
+    search_code_context,
+    grep_code,
+    list_directory,
+    read_file,
+    read_file_range,
+    
+    # 业务理解（保留核心）
+    search_businesses,
+    get_business_context,
+    search_implementations,
+    get_implementation_context,
+    
+    # 数据库查询
+    get_table_schema,
+    get_table_schemas,
+    query_database,
+)
+
+
 def get_all_chat_tools():
     """获取所有 Chat 工具列表（业务知识问答 Agent 使用）
     
@@ -78,80 +131,51 @@ def get_all_chat_tools():
     - 图拓扑: 2 个
     - 代码检索: 5 个
     """
-    return [
-        # 实体发现
-        search_businesses,
-        search_implementations,
-        search_data_resources,
-        search_steps,
-        # 上下文获取
-        get_business_context,
-        get_implementation_context,
-        get_resource_context,
-        # 影响面分析
-        get_implementation_business_usages,
-        get_resource_business_usages,
-        # 图拓扑
-        get_neighbors,
-        get_path_between_entities,
-        # 代码检索
-        search_code_context,
-        grep_code,
-        list_directory,
-        read_file,
-        read_file_range,
-    ]
+    return list(_ALL_CHAT_TOOLS)
 
 
 def get_log_troubleshoot_tools():
     """获取日志排查 Agent 的工具集（精简版）
     
-    共 12 个工具：
+    共 13 个工具：
     - 日志查询: 1 个 (search_logs)
     - 代码检索: 5 个 (search_code_context, grep_code, list_directory, read_file, read_file_range)
     - 业务理解: 4 个 (search_businesses, get_business_context, search_implementations, get_implementation_context)
-    - 数据库查询: 2 个 (get_table_schema, query_database)
+    - 数据库查询: 3 个 (get_table_schema, get_table_schemas, query_database)
     
     对比完整版，移除的工具（日志排查场景低频/冗余）：
     - search_steps, search_data_resources, get_resource_context (业务细节工具)
     - get_implementation_business_usages, get_resource_business_usages (影响面分析)
     - get_neighbors, get_path_between_entities (图拓扑遍历)
     """
-    return [
-        # 日志查询
-        search_logs,
-        
-        # 代码检索（完整保留）
-        search_code_context,
-        grep_code,
-        list_directory,
-        read_file,
-        read_file_range,
-        
-        # 业务理解（保留核心）
-        search_businesses,
-        get_business_context,
-        search_implementations,
-        get_implementation_context,
-        
-        # 数据库查询
-        get_table_schema,
-        query_database,
-    ]
+    return list(_LOG_TROUBLESHOOT_TOOLS)
 
 
 # 测试工具（transition_phase 已删除，阶段切换由编排器控制）
-from .testing import (
-    create_task_board,
-    update_task_status,
-    save_phase_summary,
-    get_phase_summary,
-    get_coding_issue_detail,
-    get_all_testing_tools,
-    get_testing_tools_phase1,
-    get_testing_tools_phase2,
-    get_testing_tools_phase3,
-)
+# 仅智能测试流程使用，按需在首次访问时再导入（PEP 562），问答类 Agent 启动时不加载
+_LAZY_EXPORTS = {
+    name: ".testing"
+    for name in (
+        "create_task_board",
+        "update_task_status",
+        "save_phase_summary",
+        "get_phase_summary",
+        "get_coding_issue_detail",
+        "get_all_testing_tools",
+        "get_testing_tools_phase1",
+        "get_testing_tools_phase2",
+        "get_testing_tools_phase3",
+    )
+}
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
 
 
 # 导出所有公开 API
@@ -175,6 +199,7 @@ __all__ = [
     "grep_code",
     "search_logs",
     "get_table_schema",
+    "get_table_schemas",
     "query_database",
     # 测试工具（transition_phase 已删除）
     "create_task_board",
@@ -3,8 +3,11 @@
 提供实体发现类工具使用的 LLM 选择器等共享功能。
 
 核心组件：
+- dumps_json / loads_json: 工具返回值的 JSON 序列化（优先使用 orjson）
+- safe_tool_json: 工具返回 dict 的统一序列化与异常兜底装饰器
+- filter_known_ids: 按 SQLite 实体表预检 ID，跳过不存在 ID 的图查询
 - extract_keywords: 从用户查询中提取关键词，用于 SQL 预过滤
-- call_selector_llm: 调用轻量模型进行实体精排
+- call_selector_llm: 调用轻量模型进行实体精排（带进程内结果缓存，并发请求自动合批）
 
 优化策略（针对大数据量场景）：
 1. 关键词提取 → SQL LIKE 预过滤（几百条 → 几十条）
@@ -12,27 +15,108 @@
 3. 小模型精排（从几十条中选 Top N）
 """
 
+import functools
+import hashlib
 import json
 import re
-from typing import List
+import time
+from collections import OrderedDict
+from threading import Event, Lock
+from typing import Any, Callable, List, Optional, Sequence, Set, Tuple
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from openai import BadRequestError
+from sqlalchemy.orm import Session
 
 from backend.app.db.sqlite import SessionLocal
 from backend.app.llm.factory import get_lite_task_llm
 from backend.app.core.logger import logger
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson 未安装时回退到标准库
+    orjson = None
+
+
+# ============================================================
+# JSON 序列化
+# ============================================================
+
+def dumps_json(obj: Any) -> str:
+    """序列化工具返回值，等价于 json.dumps(obj, ensure_ascii=False, default=str)
+
+    orjson 直接输出 UTF-8，速度是标准库的数倍；未安装或遇到 orjson 不支持的类型
+    （如超过 64 位的整数）时回退到标准库。
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False, default=str)
+
+
+def loads_json(data: Any) -> Any:
+    """反序列化 JSON 字符串/字节，优先使用 orjson"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def safe_tool_json(name: str) -> Callable:
+    """工具返回值统一序列化装饰器
+    
+    被装饰函数直接返回 dict，由装饰器统一 dumps_json；
+    异常时记录日志并返回 {"error": ...}，与各工具原有的 try/except 行为一致。
+    需放在 @tool 下方，使 @tool 看到的是包装后的函数。
+    """
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs) -> str:
+            try:
+                return dumps_json(fn(*args, **kwargs))
+            except Exception as e:
+                logger.error(f"[{name}] 查询失败: {e}", exc_info=True)
+                return dumps_json({"error": str(e)})
+        return wrapper
+    return decorator
+
+
+# ============================================================
+# ID 预检（用于上下文类工具）
+# ============================================================
+
+def filter_known_ids(id_column, ids: Sequence[str]) -> Set[str]:
+    """返回 ids 中在 SQLite 实体表里存在的 ID
+    
+    图谱节点由 SQLite 中的实体同步而来，本地按主键 IN 查询亚毫秒级，
+    先剔除模型臆造/拼错的 ID，不存在的 ID 无需再访问远端 Neo4j（全部不存在时完全省去一次往返）。
+    """
+    unique_ids = list(dict.fromkeys(i for i in ids if i))
+    if not unique_ids:
+        return set()
+    db = SessionLocal()
+    try:
+        return {row[0] for row in db.query(id_column).filter(id_column.in_(unique_ids))}
+    finally:
+        db.close()
+
 
 # ============================================================
 # 关键词提取（用于 SQL 预过滤）
 # ============================================================
 
 # 停用词表：这些词对实体匹配没有区分度，过滤掉
-_STOPWORDS = {
+_STOPWORDS = frozenset({
     # 通用停用词
     '的', '了', '是', '在', '有', '和', '与', '或', '等', '个', '这', '那', '什么', '怎么', '如何',
     # 实体搜索场景的无效词（用户常说但无区分度）
     '接口', '流程', '功能', '查询', '获取', '搜索', '查找', '相关', '信息', '数据', '记录',
     '表', '库', '服务', '系统', '模块', '方法', '函数', '处理', '操作', '业务', '逻辑',
-}
+})
+
+# 切分关键词的分隔符：空白与中英文标点
+_TOKEN_SPLIT_RE = re.compile(r'[\s,，。、/\-_()（）【】\[\]]+')
 
 
 def extract_keywords(query: str, max_keywords: int = 5) -> List[str]:
@@ -59,26 +143,16 @@ def extract_keywords(query: str, max_keywords: int = 5) -> List[str]:
         >>> extract_keywords("查询用户订单信息")
         ['用户', '订单']
     """
-    # 按标点符号和空格切分
-    tokens = re.split(r'[\s,，。、/\-_()（）【】\[\]]+', query)
-    
-    # 过滤：去停用词、去短词、去空串
+    # 按标点符号和空格切分；过滤：去停用词、去短词、去空串（每个 token 只 strip 一次）
     keywords = [
-        token.strip() 
-        for token in tokens 
-        if token.strip() and len(token.strip()) >= 2 and token.strip() not in _STOPWORDS
+        kw
+        for token in _TOKEN_SPLIT_RE.split(query)
+        if len(kw := token.strip()) >= 2 and kw not in _STOPWORDS
     ]
     
     # 去重并保持顺序
-    seen = set()
-    unique_keywords = []
-    for kw in keywords:
-        if kw not in seen:
-            seen.add(kw)
-            unique_keywords.append(kw)
-    
-    result = unique_keywords[:max_keywords]
-    logger.debug(f"[extract_keywords] '{query}' → {result}")
+    result = list(dict.fromkeys(keywords))[:max_keywords]
+    logger.debug("[extract_keywords] '{}' → {}", query, result)
     return result
 
 
@@ -86,79 +160,394 @@ def extract_keywords(query: str, max_keywords: int = 5) -> List[str]:
 # 小 LLM 实体选择器
 # ============================================================
 
-ENTITY_SELECTOR_PROMPT = """你是一个实体匹配助手。根据用户的查询描述，从候选列表中选择最相关的实体。
-
-## 用户查询
-{query}
+# Prompt 拆分为「静态指令」（system）+「动态内容」（user）：
+# 静态部分放在最前且每次完全相同，便于服务端 Prompt 前缀缓存命中；
+# 查询、候选、数量上限等变化内容全部放在末尾的 user 消息中。
 
-## 候选列表（JSON 格式）
-```json
-{candidates}
-```
+ENTITY_SELECTOR_SYSTEM_PROMPT = """你是一个实体匹配助手。根据用户的查询描述，从候选列表中选择最相关的实体。
 
 ## 任务
-请分析用户查询，从上述 JSON 候选列表中选择最相关的实体（最多选择 {limit} 个）。
+请分析用户查询，从用户给出的 JSON 候选列表中选择最相关的实体（数量不超过用户给出的上限）。
+候选列表中每个候选是一个数组，字段顺序见列表标题，第一个字段为 id。
 只返回你认为相关的实体，如果没有相关的可以返回空列表。
 
 ## 输出格式
 请严格按 JSON 格式返回选中的实体 ID 列表，例如：
-{{"selected_ids": ["id1", "id2"]}}
+{"selected_ids": ["id1", "id2"]}
 
 ## **重要** 严禁更改 id 的内容！必须从候选列表中原样复制 id 值！
 
 只输出 JSON，不要有其他内容。"""
 
+# user 消息按替换点拆成固定片段，构建时直接拼接，避免每次 str.format 解析模板
+_SELECTOR_USER_HEAD = "## 用户查询\n"
+_SELECTOR_USER_MID = "\n\n## 候选列表（每项格式 "
+_SELECTOR_USER_LIMIT = "，最多选择 "
+_SELECTOR_USER_TAIL = " 个）\n```json\n"
+_SELECTOR_USER_END = "\n```"
 
-def call_selector_llm(query: str, candidates: List[dict], id_field: str, limit: int = 5) -> List[str]:
-    """调用轻量 LLM 进行实体选择
+
+def _candidates_to_json(candidates: List[dict]) -> str:
+    """候选列表转为紧凑 JSON（固定键顺序，相同候选生成完全相同的文本），用作缓存键签名"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(candidates, default=str, option=orjson.OPT_SORT_KEYS).decode()
+        except TypeError:
+            pass
+    return json.dumps(candidates, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _encode_candidates(candidates: List[dict], id_field: str) -> Tuple[str, str]:
+    """候选列表编码为紧凑的「数组行」格式，返回 (字段说明, 候选 JSON)
+
+    [{"process_id": "p1", "name": "开通月卡"}, ...] → "[process_id, name]", '[["p1","开通月卡"],...]'
+    键名只在标题中出现一次，不再随每个候选重复，候选越多节省的 Prompt token 越多。
+    """
+    other_fields = sorted({k for c in candidates for k in c if k != id_field})
+    fields = [id_field, *other_fields]
+    fields_desc = f"[{', '.join(fields)}]"
+    rows = [[c.get(f) for f in fields] for c in candidates]
+    if orjson is not None:
+        try:
+            return fields_desc, orjson.dumps(rows, default=str).decode()
+        except TypeError:
+            pass
+    return fields_desc, json.dumps(rows, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _build_selector_user_prompt(query: str, fields_desc: str, candidates_json: str, limit: int) -> str:
+    return "".join((
+        _SELECTOR_USER_HEAD, query,
+        _SELECTOR_USER_MID, fields_desc,
+        _SELECTOR_USER_LIMIT, str(limit),
+        _SELECTOR_USER_TAIL, candidates_json,
+        _SELECTOR_USER_END,
+    ))
+
+
+# ============================================================
+# 选择器结果缓存
+# ============================================================
+
+# 缓存条目上限（每条仅保存选中的 ID 元组，占用很小）
+SELECTOR_CACHE_MAX_SIZE = 2048
+
+_selector_cache: "OrderedDict[str, Tuple[str, ...]]" = OrderedDict()
+_selector_cache_lock = Lock()
+
+
+def _selector_cache_key(model: str, query: str, candidates: List[dict], id_field: str, limit: int) -> str:
+    """生成选择器缓存键
     
-    Args:
-        query: 用户查询
-        candidates: 候选列表（字典列表）
-        id_field: ID 字段名（如 'process_id', 'impl_id' 等）
-        limit: 最多选择数量
+    候选列表按 ID 排序后整体参与哈希：底层数据变更（新增、删除、改名）会使候选内容变化，
+    从而自然失效旧缓存，无需在写库处显式清理。
+    """
+    candidates_sig = _candidates_to_json(sorted(candidates, key=lambda c: str(c.get(id_field, ""))))
+    raw = f"{model}|{limit}|{id_field}|{query.strip()}|{candidates_sig}"
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _selector_cache_get(key: str) -> Optional[List[str]]:
+    with _selector_cache_lock:
+        cached = _selector_cache.get(key)
+        if cached is None:
+            return None
+        _selector_cache.move_to_end(key)
+        return list(cached)
+
+
+def _selector_cache_put(key: str, selected_ids: List[str]) -> None:
+    with _selector_cache_lock:
+        _selector_cache[key] = tuple(selected_ids)
+        _selector_cache.move_to_end(key)
+        while len(_selector_cache) > SELECTOR_CACHE_MAX_SIZE:
+            _selector_cache.popitem(last=False)
+
+
+def clear_selector_cache() -> None:
+    """清空选择器结果缓存"""
+    with _selector_cache_lock:
+        _selector_cache.clear()
+
+
+ENTITY_SELECTOR_BATCH_SYSTEM_PROMPT = """你是一个实体匹配助手。用户会给出多个相互独立的匹配任务，每个任务包含一个用户查询和一份候选列表。
+请分别为每个任务从其自己的候选列表中选择最相关的实体。
+
+## 要求
+- 每个任务只能从该任务自己的候选列表中选择，数量不超过该任务给出的上限
+- 候选列表中每个候选是一个数组，字段顺序见列表标题，第一个字段为 id
+- 只返回你认为相关的实体，如果没有相关的可以返回空列表
+
+## 输出格式
+请严格按 JSON 格式返回，results 的键为任务编号，例如：
+{"results": {"0": ["id1", "id2"], "1": []}}
+
+## **重要** 严禁更改 id 的内容！必须从候选列表中原样复制 id 值！
+
+只输出 JSON，不要有其他内容。"""
+
+_SELECTOR_BATCH_TASK_HEAD = "## 任务 "
+_SELECTOR_BATCH_TASK_QUERY = "\n### 用户查询\n"
+_SELECTOR_BATCH_TASK_MID = "\n\n### 候选列表（每项格式 "
+
+
+def _build_selector_batch_task(index: int, query: str, fields_desc: str, candidates_json: str, limit: int) -> str:
+    return "".join((
+        _SELECTOR_BATCH_TASK_HEAD, str(index),
+        _SELECTOR_BATCH_TASK_QUERY, query,
+        _SELECTOR_BATCH_TASK_MID, fields_desc,
+        _SELECTOR_USER_LIMIT, str(limit),
+        _SELECTOR_USER_TAIL, candidates_json,
+        _SELECTOR_USER_END,
+    ))
+
+# 批量窗口：同一轮 Agent 并发发起的多个 search_* 调用在此窗口内合并为一次 LLM 请求
+SELECTOR_BATCH_WINDOW_SECONDS = 0.02
+
+
+class _SelectorTask:
+    """一次实体选择请求（在批量窗口内排队等待）"""
     
-    Returns:
-        选中的 ID 列表
+    __slots__ = ("query", "candidates", "id_field", "limit", "db", "cache_key", "result", "done")
+    
+    def __init__(
+        self,
+        query: str,
+        candidates: List[dict],
+        id_field: str,
+        limit: int,
+        db: Optional[Session] = None,
+    ):
+        self.query = query
+        self.candidates = candidates
+        self.id_field = id_field
+        self.limit = limit
+        self.db = db
+        self.cache_key = ""
+        self.result: List[str] = []
+        self.done = Event()
+
+
+class _SelectorBatcher:
+    """实体选择请求合批器
+    
+    工具在 LangGraph 的线程池中并发执行。第一个到达的请求成为 leader，
+    仅当有其他选择请求正在进行时才等待一个很短的窗口收集同时到达的请求，
+    然后一次性调用 LLM 并分发结果；单独的请求不等待，直接执行。
     """
-    db = SessionLocal()
-    try:
-        llm = get_lite_task_llm(db)
+    
+    def __init__(self, window: float):
+        self._window = window
+        self._pending: List[_SelectorTask] = []
+        self._active = 0  # 已提交且尚未返回的请求数（含正在执行的批次）
+        self._lock = Lock()
+    
+    def submit(self, task: _SelectorTask) -> List[str]:
+        with self._lock:
+            self._pending.append(task)
+            self._active += 1
+            is_leader = len(self._pending) == 1
+            has_concurrent = self._active > 1
         
-        # 将候选列表转为 JSON 字符串
-        candidates_json = json.dumps(candidates, ensure_ascii=False, indent=2)
+        try:
+            if not is_leader:
+                task.done.wait()
+                return task.result
+            
+            if has_concurrent:
+                time.sleep(self._window)
+            with self._lock:
+                batch, self._pending = self._pending, []
+            try:
+                # leader 在自己的线程中执行，可复用自己调用方传入的数据库会话
+                _run_selector_batch(batch, task.db)
+            finally:
+                for t in batch:
+                    t.done.set()
+            return task.result
+        finally:
+            with self._lock:
+                self._active -= 1
+
+
+_selector_batcher = _SelectorBatcher(SELECTOR_BATCH_WINDOW_SECONDS)
+
+
+# 选择器输出只是简短的 ID 列表 JSON，按 limit 估算输出 token 上限，避免预留 2000 token 的解码预算
+SELECTOR_BASE_MAX_TOKENS = 64
+SELECTOR_MAX_TOKENS_PER_ID = 16
+
+# 不支持 response_format=json_object 的模型（按模型名记录，后续调用直接走普通模式）
+_json_mode_unsupported: set = set()
+
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.S)
+
+
+def _selector_max_tokens(limits: List[int]) -> int:
+    return sum(SELECTOR_BASE_MAX_TOKENS + SELECTOR_MAX_TOKENS_PER_ID * limit for limit in limits)
+
+
+def _invoke_selector(llm, messages: list, max_tokens: int):
+    """调用选择器 LLM：限制输出 token，并优先使用 JSON 模式
+
+    部分自定义网关不支持 response_format（返回 400），首次失败后按模型名记录并回退到普通模式。
+    """
+    model = getattr(llm, "model_name", "")
+    if model not in _json_mode_unsupported:
+        try:
+            return llm.invoke(messages, max_tokens=max_tokens, response_format={"type": "json_object"})
+        except BadRequestError as e:
+            _json_mode_unsupported.add(model)
+            logger.warning(f"[EntitySelector] 模型 {model} 不支持 JSON 模式，回退普通模式: {e}")
+    return llm.invoke(messages, max_tokens=max_tokens)
+
+
+def _parse_selector_json(result_text: str) -> dict:
+    """解析 LLM 返回的 JSON
+
+    JSON 模式下直接解析；对不遵循 JSON 模式的模型（如用 ```json 代码块包裹），提取首尾花括号之间的内容再解析。
+    """
+    try:
+        return loads_json(result_text)
+    except ValueError:
+        match = _JSON_OBJECT_RE.search(result_text)
+        if match is None:
+            raise
+        return loads_json(match.group(0))
+
+
+def _filter_selected_ids(task: _SelectorTask, selected: list) -> List[str]:
+    """只保留该任务自己候选列表中的 ID（模型可能编造 ID 或混用其他任务的 ID），并截断到 limit"""
+    candidate_ids = {str(c.get(task.id_field)) for c in task.candidates}
+    return [sid for sid in selected if str(sid) in candidate_ids][:task.limit]
+
+
+def _select_single(llm, task: _SelectorTask) -> None:
+    """单任务选择（沿用原有 Prompt）"""
+    try:
+        fields_desc, candidates_json = _encode_candidates(task.candidates, task.id_field)
         
-        prompt = ENTITY_SELECTOR_PROMPT.format(
-            query=query,
-            candidates=candidates_json,
-            limit=limit,
-        )
+        messages = [
+            SystemMessage(content=ENTITY_SELECTOR_SYSTEM_PROMPT),
+            HumanMessage(content=_build_selector_user_prompt(task.query, fields_desc, candidates_json, task.limit)),
+        ]
         
-        logger.debug(f"[EntitySelector] 调用轻量模型")
+        logger.debug("[EntitySelector] 调用轻量模型")
         
-        response = llm.invoke(prompt)
+        response = _invoke_selector(llm, messages, _selector_max_tokens([task.limit]))
         result_text = response.content.strip()
-        logger.debug(f"[EntitySelector] LLM 返回: {result_text}")
+        logger.debug("[EntitySelector] LLM 返回: {}", result_text)
         
         # 检查是否为空
         if not result_text:
             logger.warning("[EntitySelector] LLM 返回空内容")
-            return []
+            return
         
-        # 解析 JSON
-        if result_text.startswith("```"):
-            lines = result_text.split("```")
-            if len(lines) >= 2:
-                result_text = lines[1]
-                if result_text.startswith("json"):
-                    result_text = result_text[4:]
-        
-        result_text = result_text.strip()
-        result = json.loads(result_text)
-        return result.get("selected_ids", [])
+        selected = _parse_selector_json(result_text).get("selected_ids")
+        if not isinstance(selected, list):
+            # 格式错误的返回不缓存，避免后续相同查询一直拿到空结果
+            logger.warning(f"[EntitySelector] selected_ids 格式错误: {result_text}")
+            return
+        task.result = _filter_selected_ids(task, selected)
+        _selector_cache_put(task.cache_key, task.result)
         
     except Exception as e:
         logger.error(f"[EntitySelector] 调用失败: {e}", exc_info=True)
-        return []
-    finally:
-        db.close()
+
+
+def _select_batch(llm, tasks: List[_SelectorTask]) -> None:
+    """多任务合并为一次 LLM 请求；失败时逐个回退到单任务选择"""
+    try:
+        task_sections = "\n\n".join(
+            _build_selector_batch_task(i, t.query, *_encode_candidates(t.candidates, t.id_field), t.limit)
+            for i, t in enumerate(tasks)
+        )
+        messages = [
+            SystemMessage(content=ENTITY_SELECTOR_BATCH_SYSTEM_PROMPT),
+            HumanMessage(content=task_sections),
+        ]
+        
+        logger.debug(f"[EntitySelector] 批量调用轻量模型: tasks={len(tasks)}")
+        
+        response = _invoke_selector(llm, messages, _selector_max_tokens([t.limit for t in tasks]))
+        result_text = response.content.strip()
+        logger.debug("[EntitySelector] 批量 LLM 返回: {}", result_text)
+        
+        results = _parse_selector_json(result_text).get("results")
+        if not isinstance(results, dict):
+            raise ValueError(f"results 字段格式错误: {type(results).__name__}")
+    except Exception as e:
+        logger.warning(f"[EntitySelector] 批量调用失败，回退为逐个调用: {e}")
+        for t in tasks:
+            _select_single(llm, t)
+        return
+    
+    for i, t in enumerate(tasks):
+        selected = results.get(str(i))
+        if not isinstance(selected, list):
+            # 模型遗漏了该任务或返回格式错误：不能当作"无匹配"缓存，单独重试
+            logger.warning(f"[EntitySelector] 批量结果缺少任务 {i}，回退为单独调用")
+            _select_single(llm, t)
+            continue
+        t.result = _filter_selected_ids(t, selected)
+        _selector_cache_put(t.cache_key, t.result)
+
+
+def _run_selector_batch(tasks: List[_SelectorTask], db: Optional[Session] = None) -> None:
+    """执行一批选择任务：先查缓存，未命中的按数量走单任务或合并请求
+    
+    小任务模型配置与 LLM 实例均有进程内缓存，通常无需访问数据库；
+    调用方未传入会话时，仅在配置缓存未命中时才由服务层临时创建会话。
+    """
+    try:
+        llm = get_lite_task_llm(db)
+    except Exception as e:
+        logger.error(f"[EntitySelector] 获取轻量模型失败: {e}", exc_info=True)
+        return
+    
+    model = getattr(llm, "model_name", "")
+    pending: List[_SelectorTask] = []
+    for t in tasks:
+        # 相同模型 + 查询 + 候选集合 + limit 的结果直接复用，跳过 LLM 往返
+        t.cache_key = _selector_cache_key(model, t.query, t.candidates, t.id_field, t.limit)
+        cached_ids = _selector_cache_get(t.cache_key)
+        if cached_ids is not None:
+            logger.debug("[EntitySelector] 命中缓存: {}", cached_ids)
+            t.result = cached_ids
+        else:
+            pending.append(t)
+    
+    if len(pending) == 1:
+        _select_single(llm, pending[0])
+    elif pending:
+        _select_batch(llm, pending)
+
+
+def call_selector_llm(
+    query: str,
+    candidates: List[dict],
+    id_field: str,
+    limit: int = 5,
+    db: Optional[Session] = None,
+) -> List[str]:
+    """调用轻量 LLM 进行实体选择
+    
+    同一时刻并发到达的多个选择请求（如 Agent 一轮内并行调用多个 search_* 工具）
+    会被合并为一次 LLM 请求；单个请求仍使用原有的单任务 Prompt。
+    
+    Args:
+        query: 用户查询
+        candidates: 候选列表（字典列表）
+        id_field: ID 字段名（如 'process_id', 'impl_id' 等）
+        limit: 最多选择数量
+        db: 可选，调用方已打开的数据库会话（复用以避免额外创建会话）
+    
+    Returns:
+        选中的 ID 列表
+    """
+    # 候选数量不超过上限时无需挑选，直接全部返回（省去一次 LLM 往返）
+    if len(candidates) <= limit:
+        logger.debug(f"[EntitySelector] 候选数 {len(candidates)} <= limit {limit}，跳过 LLM")
+        return [c[id_field] for c in candidates if c.get(id_field) is not None]
+    
+    return _selector_batcher.submit(_SelectorTask(query, candidates, id_field, limit, db))
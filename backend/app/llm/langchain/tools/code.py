@@ -8,10 +8,16 @@
 - grep_code: 精确文本/正则搜索（ripgrep）
 """
 
-import json
+import mmap
 import os
+import re
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional
+from functools import lru_cache
+from threading import Lock, Timer
+from typing import Dict, List, Optional, Tuple
 
 from langchain_core.tools import tool
 from pydantic import BaseModel, Field
@@ -19,12 +25,79 @@ from pydantic import BaseModel, Field
 from backend.app.llm.config import CodeWorkspaceConfig
 from backend.app.core.logger import logger
 from backend.mcp.ace_code_engine import get_ace_mcp_client
+from ._common import dumps_json, loads_json
+
+
+# ============================================================
+# 工作区根目录与路径越界检查
+# ============================================================
+
+@lru_cache(maxsize=None)
+def _get_workspace_root(workspace: Optional[str]) -> str:
+    """获取工作区根目录绝对路径（工作区配置为静态常量，解析一次后缓存）"""
+    return os.path.abspath(CodeWorkspaceConfig.get_workspace_root(workspace))
+
+
+@lru_cache(maxsize=None)
+def _root_prefix(root: str) -> str:
+    root = os.path.normcase(root)
+    return root if root.endswith(os.sep) else root + os.sep
+
+
+def _join_root(root: str, rel_path: str) -> str:
+    """拼接并规范化 root 下的路径（root 已是绝对路径，只需 normpath，不必再走 abspath）"""
+    return os.path.normpath(os.path.join(root, rel_path))
+
+
+def _is_within_root(root: str, full_path: str) -> bool:
+    """判断已规范化的 full_path 是否位于 root 之内（字符串前缀比较，替代 commonpath）"""
+    normalized = os.path.normcase(full_path)
+    return normalized == os.path.normcase(root) or normalized.startswith(_root_prefix(root))
 
 
 # ============================================================
 # search_code_context
 # ============================================================
 
+# MCP 返回文本中的转义序列（\\u / \\n / \\t），命中时才做 unicode_escape 解码
+_ESCAPE_SEQ_RE = re.compile(r"\\[unt]")
+
+
+def _normalize_mcp_item(item: dict) -> Optional[dict]:
+    """规范化 MCP 返回的单个内容条目为 {"type", "text"}
+
+    条目已是规范形式且文本无需解析/反转义时返回原对象（调用方据此判断能否原样透传）。
+    """
+    if not isinstance(item, dict) or not isinstance(item.get("text"), str):
+        return None
+    raw = item["text"]
+    new_type = item.get("type", "text")
+    # 如果 text 本身是 JSON（如 {"type": "text", "text": "..."}），先解析一层；
+    # 绝大多数条目是纯文本代码片段，首字符不是 { / [ 时直接跳过解析
+    if raw.lstrip()[:1] in ("{", "["):
+        try:
+            inner = loads_json(raw)
+        except ValueError:
+            inner = None
+        else:
+            if isinstance(inner, dict) and isinstance(inner.get("text"), str):
+                return {"type": inner.get("type", new_type), "text": inner["text"]}
+            return _canonical_mcp_item(item, new_type, raw)
+    # 否则尝试按 unicode_escape 处理 \uXXXX
+    if _ESCAPE_SEQ_RE.search(raw):
+        try:
+            return {"type": new_type, "text": bytes(raw, "utf-8").decode("unicode_escape")}
+        except Exception:
+            pass
+    return _canonical_mcp_item(item, new_type, raw)
+
+
+def _canonical_mcp_item(item: dict, item_type: str, text: str) -> dict:
+    if len(item) == 2 and "type" in item:
+        return item
+    return {"type": item_type, "text": text}
+
+
 class SearchCodeContextInput(BaseModel):
     query: str = Field(..., description="用于代码上下文检索的自然语言查询，如'开卡接口的校验逻辑'、'支付回调处理流程'")
     workspace: str = Field(..., description="目标代码库名称，用于指定搜索哪个代码库")
@@ -38,55 +111,45 @@ def search_code_context(query: str, workspace: Optional[str] = None) -> str:
         client = get_ace_mcp_client()
         result = client.search_context(query, project_root_path=project_root)
         if isinstance(result, dict):
-            def _normalize_item(item: dict) -> Optional[dict]:
-                if not isinstance(item, dict) or not isinstance(item.get("text"), str):
-                    return None
-                raw = item["text"]
-                new_type = item.get("type", "text")
-                new_text = raw
-                # 如果 text 本身是 JSON（如 {"type": "text", "text": "..."}），先解析一层
-                try:
-                    inner = json.loads(raw)
-                    if isinstance(inner, dict) and isinstance(inner.get("text"), str):
-                        new_text = inner["text"]
-                        new_type = inner.get("type", new_type)
-                except Exception:
-                    # 否则尝试按 unicode_escape 处理 \uXXXX
-                    try:
-                        if "\\u" in raw or "\\n" in raw or "\\t" in raw:
-                            new_text = bytes(raw, "utf-8").decode("unicode_escape")
-                    except Exception:
-                        new_text = raw
-                return {"type": new_type, "text": new_text}
-
             # 优先处理标准 MCP 结构: {"content": [{"type": "text", "text": "..."}, ...]}
             contents = result.get("content")
             if isinstance(contents, list) and contents:
                 normalized = []
+                unchanged = True
                 for item in contents:
-                    norm = _normalize_item(item)
+                    norm = _normalize_mcp_item(item)
+                    if norm is not item:
+                        unchanged = False
                     if norm is not None:
                         normalized.append(norm)
                 if normalized:
-                    return json.dumps({"content": normalized}, ensure_ascii=False)
+                    # 全部条目都无需改写时原样序列化 MCP 结果，省去重建结构
+                    return dumps_json(result if unchanged and len(result) == 1 else {"content": normalized})
 
             # 兼容直接带 text 字段的情况
             if isinstance(result.get("text"), str):
-                norm = _normalize_item({"type": result.get("type", "text"), "text": result["text"]})
+                norm = _normalize_mcp_item({"type": result.get("type", "text"), "text": result["text"]})
                 if norm is not None:
-                    return json.dumps(norm, ensure_ascii=False)
+                    return dumps_json(norm)
 
-        # 兜底：直接返回 JSON 字符串（包含 ensure_ascii=False，以便中文正常显示）
-        return json.dumps(result, ensure_ascii=False)
+        # 兜底：直接返回 JSON 字符串（中文保持原样输出）
+        return dumps_json(result)
     except Exception as e:
         logger.error(f"[search_code_context] 查询失败: {e}", exc_info=True)
-        return json.dumps({"error": str(e)}, ensure_ascii=False)
+        return dumps_json({"error": str(e)})
 
 
 # ============================================================
 # list_directory
 # ============================================================
 
+# 依赖/构建产物/IDE 等目录：浏览代码结构时基本是噪声，遍历时默认不进入
+_DEFAULT_PRUNE_DIRS = frozenset({
+    "node_modules", ".git", "__pycache__", ".venv", "venv",
+    "dist", "build", ".idea", ".vscode", "target",
+})
+
+
 class ListDirectoryInput(BaseModel):
     path: Optional[str] = Field(
         default=None,
@@ -114,6 +177,10 @@ class ListDirectoryInput(BaseModel):
         default=True,
         description="是否包含目录",
     )
+    include_vendor: bool = Field(
+        default=False,
+        description="是否进入 node_modules、.git、venv、build、target 等依赖/构建目录（默认只列出不展开）",
+    )
 
 
 @tool(args_schema=ListDirectoryInput)
@@ -124,63 +191,70 @@ def list_directory(
     include_hidden: bool = False,
     include_files: bool = True,
     include_dirs: bool = True,
+    include_vendor: bool = False,
 ) -> str:
     """列出指定代码库目录下的文件和子目录，用于浏览项目结构。"""
     try:
-        root = os.path.abspath(CodeWorkspaceConfig.get_workspace_root(workspace))
+        root = _get_workspace_root(workspace)
         rel_path = path or ""
-        target = os.path.abspath(os.path.join(root, rel_path))
+        target = _join_root(root, rel_path)
 
         # 路径越界检查
-        try:
-            common = os.path.commonpath([root, target])
-        except ValueError:
-            return json.dumps({"error": "路径非法", "path": rel_path}, ensure_ascii=False)
-        if common != root:
-            return json.dumps({
+        if not _is_within_root(root, target):
+            return dumps_json({
                 "error": "路径越界，不允许访问项目根目录之外的文件",
                 "path": rel_path,
-            }, ensure_ascii=False)
+            })
 
         if not os.path.isdir(target):
-            return json.dumps({
+            return dumps_json({
                 "error": "目录不存在或不是有效目录",
                 "path": rel_path,
-            }, ensure_ascii=False)
+            })
 
         entries = []
         root_abs = root
 
-        for dirpath, dirnames, filenames in os.walk(target):
-            rel_dir = os.path.relpath(dirpath, target)
-            if rel_dir == ".":
-                depth = 0
-            else:
-                depth = rel_dir.count(os.sep) + 1
+        # 目标目录相对项目根目录的前缀（POSIX 形式），子条目路径在此基础上拼接，
+        # 避免对每个条目调用 os.path.relpath
+        target_rel = os.path.relpath(target, root_abs).replace("\\", "/")
+        base_prefix = "" if target_rel == "." else target_rel + "/"
 
-            # 超出最大深度则不再向下遍历
-            if depth >= max_depth:
-                dirnames[:] = []
+        # 手动 DFS（与 os.walk 自顶向下的输出顺序一致）：
+        # os.scandir 的 DirEntry 自带类型信息并缓存 stat 结果，每个条目最多一次 stat 调用
+        stack = [(target, base_prefix, 0)]
+        while stack:
+            dirpath, rel_prefix, depth = stack.pop()
+            try:
+                with os.scandir(dirpath) as it:
+                    dir_entries = list(it)
+            except OSError:
+                continue
 
-            # 过滤隐藏目录
-            if not include_hidden:
-                dirnames[:] = [d for d in dirnames if not d.startswith(".")]
-                filenames = [f for f in filenames if not f.startswith(".")]
+            subdirs = []
+            file_entries = []
+            for entry in dir_entries:
+                if not include_hidden and entry.name.startswith("."):
+                    continue
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    subdirs.append(entry)
+                else:
+                    file_entries.append(entry)
 
             # 目录条目
             if include_dirs:
-                for d in dirnames:
-                    full_path = os.path.join(dirpath, d)
-                    rel = os.path.relpath(full_path, root_abs)
+                for d in subdirs:
                     try:
-                        stat = os.stat(full_path)
-                        modified_at = datetime.fromtimestamp(stat.st_mtime).isoformat()
+                        modified_at = datetime.fromtimestamp(d.stat().st_mtime).isoformat()
                     except OSError:
-                        stat = None
                         modified_at = None
                     entries.append({
-                        "name": d,
-                        "path": rel.replace("\\", "/"),
+                        "name": d.name,
+                        "path": rel_prefix + d.name,
                         "type": "directory",
                         "size": None,
                         "modified_at": modified_at,
@@ -188,41 +262,258 @@ def list_directory(
 
             # 文件条目
             if include_files:
-                for f in filenames:
-                    full_path = os.path.join(dirpath, f)
-                    rel = os.path.relpath(full_path, root_abs)
+                for f in file_entries:
                     try:
-                        stat = os.stat(full_path)
+                        stat = f.stat()
                         size = stat.st_size
                         modified_at = datetime.fromtimestamp(stat.st_mtime).isoformat()
                     except OSError:
                         size = None
                         modified_at = None
                     entries.append({
-                        "name": f,
-                        "path": rel.replace("\\", "/"),
+                        "name": f.name,
+                        "path": rel_prefix + f.name,
                         "type": "file",
                         "size": size,
                         "modified_at": modified_at,
                     })
 
+            # 未超出最大深度时继续向下遍历（与 os.walk 一致，不进入符号链接目录；
+            # 依赖/构建目录本身照常列出，但默认不展开）
+            if depth + 1 < max_depth:
+                for d in reversed(subdirs):
+                    if not include_vendor and d.name in _DEFAULT_PRUNE_DIRS:
+                        continue
+                    if not d.is_symlink():
+                        stack.append((d.path, rel_prefix + d.name + "/", depth + 1))
+
         result = {
             "root": root_abs.replace("\\", "/"),
-            "path": os.path.relpath(target, root_abs).replace("\\", "/"),
+            "path": target_rel,
             "max_depth": max_depth,
             "entries": entries,
         }
-        return json.dumps(result, ensure_ascii=False, default=str)
+        return dumps_json(result)
 
     except Exception as e:
         logger.error(f"[list_directory] 失败: {e}", exc_info=True)
-        return json.dumps({"error": str(e)}, ensure_ascii=False)
+        return dumps_json({"error": str(e)})
 
 
 # ============================================================
 # read_file
 # ============================================================
 
+# 文件名索引：{项目根目录: (构建时间, 根目录 mtime, {文件名: [相对路径, ...]})}
+# read_file 仅传文件名时直接查表，避免每次调用都全量 os.walk 项目目录
+FILENAME_INDEX_TTL_SECONDS = 60
+# 索引不收录依赖/构建目录以控制构建耗时；索引未命中时会退回全量遍历，这些目录中的文件仍可按文件名找到
+_FILENAME_INDEX_SKIP_DIRS = _DEFAULT_PRUNE_DIRS
+_FILENAME_INDEX: Dict[str, Tuple[float, float, Dict[str, List[str]]]] = {}
+_FILENAME_INDEX_LOCK = Lock()
+
+
+FILENAME_INDEX_MAX_WORKERS = 8
+
+
+# 支持基于目录 fd 的遍历时（Linux 等）用 os.fwalk：子目录经 openat 相对父目录 fd 打开，
+# 内核不必为每个目录从根重新解析整条路径；其他平台（如 Windows）退回 os.walk
+if hasattr(os, "fwalk") and os.scandir in os.supports_fd:
+    def _iter_dir_tree(top: str):
+        for dirpath, dirnames, filenames, _dir_fd in os.fwalk(top):
+            yield dirpath, dirnames, filenames
+else:
+    _iter_dir_tree = os.walk
+
+
+def _walk_filenames(root: str, top: str) -> List[Tuple[str, str]]:
+    """遍历 top 目录，返回 (文件名, 相对项目根目录路径) 列表"""
+    results: List[Tuple[str, str]] = []
+    # 遍历产出的 dirpath 均以 root + 分隔符开头，直接切片得到相对路径，无需 relpath
+    root_len = len(_root_prefix(root))
+    for dirpath, dirnames, filenames in _iter_dir_tree(top):
+        dirnames[:] = [d for d in dirnames if d not in _FILENAME_INDEX_SKIP_DIRS]
+        rel_dir = dirpath[root_len:]
+        if os.sep != "/":
+            rel_dir = rel_dir.replace(os.sep, "/")
+        prefix = rel_dir + "/"
+        for fname in filenames:
+            results.append((fname, prefix + fname))
+    return results
+
+
+def _build_filename_index(root: str) -> Dict[str, List[str]]:
+    """构建 文件名 -> 相对路径列表 的索引
+
+    遍历以 I/O 为主，按顶层子目录拆分后用线程池并发 os.walk，大仓库首次构建时明显更快。
+    """
+    index: Dict[str, List[str]] = {}
+    top_dirs: List[str] = []
+    with os.scandir(root) as it:
+        for entry in it:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                # 与 os.walk 一致：不进入符号链接目录
+                if entry.name not in _FILENAME_INDEX_SKIP_DIRS and not entry.is_symlink():
+                    top_dirs.append(entry.path)
+            else:
+                index.setdefault(entry.name, []).append(entry.name)
+
+    if not top_dirs:
+        return index
+
+    workers = min(FILENAME_INDEX_MAX_WORKERS, len(top_dirs))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # executor.map 按提交顺序返回结果，合并后的候选顺序稳定
+        for results in executor.map(lambda top: _walk_filenames(root, top), sorted(top_dirs)):
+            for fname, rel in results:
+                index.setdefault(fname, []).append(rel)
+    return index
+
+
+def _scan_files_by_name(root: str, filename: str) -> List[str]:
+    """全量遍历项目目录（不跳过任何目录）按文件名查找，作为索引未命中时的兜底"""
+    matches: List[str] = []
+    root_len = len(_root_prefix(root))
+    for dirpath, _dirnames, filenames in _iter_dir_tree(root):
+        if filename not in filenames:
+            continue
+        rel_dir = dirpath[root_len:]
+        if os.sep != "/":
+            rel_dir = rel_dir.replace(os.sep, "/")
+        matches.append(f"{rel_dir}/{filename}" if rel_dir else filename)
+    return matches
+
+
+def _find_files_by_name(root: str, filename: str) -> List[str]:
+    """按文件名查找项目内的文件，返回相对项目根目录的路径列表
+
+    先查文件名索引：索引懒加载，超过 TTL 或根目录 mtime 变化时重建，且不收录依赖/构建目录。
+    索引未命中时退回全量遍历整个项目（与建索引前的行为一致），因此依赖/构建目录中的文件，
+    以及索引构建后才在子目录中新增的文件（根目录 mtime 不变、尚未到 TTL）仍能找到。
+    索引命中时直接返回索引结果，TTL 内新增的同名文件不会出现在候选中。
+    """
+    try:
+        root_mtime = os.stat(root).st_mtime
+    except OSError:
+        return []
+
+    now = time.monotonic()
+    cached = _FILENAME_INDEX.get(root)
+    if cached is None or now - cached[0] > FILENAME_INDEX_TTL_SECONDS or cached[1] != root_mtime:
+        with _FILENAME_INDEX_LOCK:
+            cached = _FILENAME_INDEX.get(root)
+            if cached is None or now - cached[0] > FILENAME_INDEX_TTL_SECONDS or cached[1] != root_mtime:
+                started = time.perf_counter()
+                index = _build_filename_index(root)
+                cached = (time.monotonic(), root_mtime, index)
+                _FILENAME_INDEX[root] = cached
+                logger.info(
+                    f"[read_file] 文件名索引已构建: root={root}, 文件名数={len(index)}, "
+                    f"耗时={(time.perf_counter() - started) * 1000:.1f}ms"
+                )
+
+    matches = cached[2].get(filename)
+    if matches:
+        return list(matches)
+
+    logger.debug(f"[read_file] 文件名索引未命中，全量遍历查找: root={root}, filename={filename}")
+    return _scan_files_by_name(root, filename)
+
+
+def clear_filename_index(workspace: Optional[str] = None) -> None:
+    """清空文件名索引（指定 workspace 时只清该项目），下次按文件名查找时重建
+
+    供代码库更新（如重新拉取、切换分支）后主动失效，无需等待 TTL。
+    """
+    with _FILENAME_INDEX_LOCK:
+        if workspace is None:
+            _FILENAME_INDEX.clear()
+        else:
+            _FILENAME_INDEX.pop(_get_workspace_root(workspace), None)
+
+
+# 文件内容缓存：{(绝对路径, mtime_ns, size, max_bytes): (文本, 编码, 是否截断)}
+# 按已缓存文本的总字符数做 LRU 淘汰；文件被修改后 mtime/size 变化，旧条目自然不再命中
+FILE_CONTENT_CACHE_MAX_CHARS = 64 * 1024 * 1024
+_file_content_cache: "OrderedDict[Tuple[str, int, int, int], Tuple[str, str, bool]]" = OrderedDict()
+_file_content_cache_chars = 0
+_file_content_cache_lock = Lock()
+
+
+def _file_content_cache_get(key: Tuple[str, int, int, int]) -> Optional[Tuple[str, str, bool]]:
+    with _file_content_cache_lock:
+        cached = _file_content_cache.get(key)
+        if cached is not None:
+            _file_content_cache.move_to_end(key)
+        return cached
+
+
+def _file_content_cache_put(key: Tuple[str, int, int, int], value: Tuple[str, str, bool]) -> None:
+    global _file_content_cache_chars
+    text_len = len(value[0])
+    if text_len > FILE_CONTENT_CACHE_MAX_CHARS:
+        return
+    with _file_content_cache_lock:
+        old = _file_content_cache.pop(key, None)
+        if old is not None:
+            _file_content_cache_chars -= len(old[0])
+        _file_content_cache[key] = value
+        _file_content_cache_chars += text_len
+        while _file_content_cache_chars > FILE_CONTENT_CACHE_MAX_CHARS:
+            _, evicted = _file_content_cache.popitem(last=False)
+            _file_content_cache_chars -= len(evicted[0])
+
+
+# 常见 BOM → 编码（长的 UTF-32 BOM 须排在以相同字节开头的 UTF-16 BOM 之前）
+_ENC_BOMS = (
+    (b"\xef\xbb\xbf", "utf-8-sig"),
+    (b"\xff\xfe\x00\x00", "utf-32-le"),
+    (b"\x00\x00\xfe\xff", "utf-32-be"),
+    (b"\xff\xfe", "utf-16-le"),
+    (b"\xfe\xff", "utf-16-be"),
+)
+
+
+def _decode_file_bytes(data) -> Tuple[str, str]:
+    """按 BOM 直接选定编码解码；无 BOM 时先试 UTF-8，失败回退 latin-1（不会失败）
+
+    data 可以是 bytes 或 memoryview（如 mmap 的视图），统一用 str(buf, enc) 解码，不产生中间拷贝。
+    """
+    head = bytes(data[:4])
+    for bom, enc in _ENC_BOMS:
+        if head.startswith(bom):
+            try:
+                # utf-8-sig 会自行去掉 BOM，其余编码手动跳过 BOM 字节
+                return str(data if enc == "utf-8-sig" else data[len(bom):], enc), enc
+            except UnicodeDecodeError:
+                # 截断点落在多字节字符中间等情况，交给下面的通用逻辑
+                break
+    try:
+        return str(data, "utf-8"), "utf-8"
+    except UnicodeDecodeError:
+        return str(data, "latin-1"), "latin-1"
+
+
+# 超过该大小的文件用 mmap 读取并直接从映射区解码，省去一次整段 bytes 拷贝
+READ_FILE_MMAP_THRESHOLD = 64 * 1024
+
+
+def _read_and_decode(full_path: str, size: int, max_bytes: int) -> Tuple[str, str]:
+    """读取文件前 min(size, max_bytes) 字节并解码，返回 (文本, 编码)"""
+    length = min(size, max_bytes)
+    with open(full_path, "rb") as f:
+        if length <= READ_FILE_MMAP_THRESHOLD:
+            return _decode_file_bytes(f.read(length))
+        with mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ) as mm:
+            # 视图须在 mmap 关闭前释放
+            with memoryview(mm) as view:
+                return _decode_file_bytes(view)
+
+
 class ReadFileInput(BaseModel):
     path: str = Field(..., description="仅传文件名如 'MyClass.java'，也兼容相对项目根目录的文件路径，如 'backend/app/main.py'，注意winodws分隔符")
     workspace: Optional[str] = Field(
@@ -241,127 +532,94 @@ class ReadFileInput(BaseModel):
 def read_file(path: str, workspace: Optional[str] = None, max_bytes: int = 200_000) -> str:
     """读取指定代码库中文件的文本内容（可能被截断）。"""
     try:
-        root = os.path.abspath(CodeWorkspaceConfig.get_workspace_root(workspace))
+        root = _get_workspace_root(workspace)
         logger.info(f"[read_file] 尝试读取文件: {path}，当前代码库根目录: {root}")
 
         # 规范化传入路径/文件名
         raw_path = path.strip()
         normalized = raw_path.replace("\\", "/")
 
-        # 判断是"仅文件名"还是包含目录的路径
-        has_sep = "/" in normalized or "\\" in raw_path
+        # 判断是"仅文件名"还是包含目录的路径（normalized 已统一为 / 分隔）
+        has_sep = "/" in normalized
 
         resolved_rel_path = normalized
 
         if not has_sep:
             # 仅传入文件名：在项目根目录下递归搜索同名文件
-            matches: list[str] = []
-            for dirpath, _, filenames in os.walk(root):
-                for fname in filenames:
-                    if fname == normalized:
-                        rel = os.path.relpath(os.path.join(dirpath, fname), root)
-                        matches.append(rel.replace("\\", "/"))
+            matches = _find_files_by_name(root, normalized)
 
             if not matches:
-                return json.dumps({
+                return dumps_json({
                     "error": "未在项目根目录内找到同名文件",
                     "path": raw_path,
-                }, ensure_ascii=False)
+                })
 
             if len(matches) > 1:
                 # 多个重名文件，返回候选列表让上层自行选择
-                return json.dumps({
+                return dumps_json({
                     "error": "ambiguous_path",
                     "message": "找到多个同名文件，请根据 candidates 中的路径选择一个精确路径重新调用 read_file",
                     "path": raw_path,
                     "candidates": matches,
-                }, ensure_ascii=False)
+                })
 
             # 唯一匹配，使用该相对路径继续后续逻辑
             resolved_rel_path = matches[0]
 
-        # 兼容 Windows 路径分隔符，按解析后的相对路径拼接
-        full_path = os.path.abspath(os.path.join(root, resolved_rel_path.replace("\\", "/")))
+        # resolved_rel_path 已是 / 分隔的相对路径，直接拼接
+        full_path = _join_root(root, resolved_rel_path)
 
-        try:
-            common = os.path.commonpath([root, full_path])
-        except ValueError:
-            return json.dumps({"error": "路径非法", "path": path}, ensure_ascii=False)
-        if common != root:
-            return json.dumps({
+        if not _is_within_root(root, full_path):
+            return dumps_json({
                 "error": "路径越界，不允许访问项目根目录之外的文件",
                 "path": resolved_rel_path,
-            }, ensure_ascii=False)
+            })
 
         if not os.path.isfile(full_path):
             # 兜底：如果按传入路径找不到文件，再按文件名在项目根目录内搜索一次
             basename = os.path.basename(normalized)
             # 避免与前面的"仅文件名"逻辑重复，这里只在原始路径包含分隔符时兜底
             if basename and basename != normalized:
-                matches: list[str] = []
-                for dirpath, _, filenames in os.walk(root):
-                    for fname in filenames:
-                        if fname == basename:
-                            rel = os.path.relpath(os.path.join(dirpath, fname), root)
-                            matches.append(rel.replace("\\", "/"))
+                matches = _find_files_by_name(root, basename)
 
                 if not matches:
-                    return json.dumps({
+                    return dumps_json({
                         "error": "文件不存在或不是普通文件",
                         "path": path,
-                    }, ensure_ascii=False)
+                    })
 
                 if len(matches) > 1:
                     # 多个重名文件，返回候选列表让上层自行选择
-                    return json.dumps({
+                    return dumps_json({
                         "error": "ambiguous_path",
                         "message": "找到多个同名文件，请根据 candidates 中的路径选择一个精确路径重新调用 read_file",
                         "path": basename,
                         "candidates": matches,
-                    }, ensure_ascii=False)
+                    })
 
                 # 唯一匹配，使用该相对路径继续后续读取逻辑
                 resolved_rel_path = matches[0]
-                full_path = os.path.abspath(os.path.join(root, resolved_rel_path.replace("\\", "/")))
+                full_path = _join_root(root, resolved_rel_path)
             else:
-                return json.dumps({
+                return dumps_json({
                     "error": "文件不存在或不是普通文件",
                     "path": path,
-                }, ensure_ascii=False)
-
-        # 读取原始字节
-        with open(full_path, "rb") as f:
-            data = f.read(max_bytes + 1)
-
-        truncated = len(data) > max_bytes
-        if truncated:
-            data = data[:max_bytes]
-
-        # 尝试多种编码解码
-        encoding_candidates = ["utf-8", "utf-8-sig", "latin-1"]
-        last_error = None
-        text = None
-        used_encoding = None
-        for enc in encoding_candidates:
-            try:
-                text = data.decode(enc)
-                used_encoding = enc
-                break
-            except UnicodeDecodeError as de:
-                last_error = de
-        if text is None:
-            msg = "无法以文本方式读取文件（可能是二进制文件）"
-            if last_error is not None:
-                msg = f"{msg}: {last_error}"
-            return json.dumps({
-                "error": msg,
-                "path": path,
-            }, ensure_ascii=False)
-
-        try:
-            size = os.path.getsize(full_path)
-        except OSError:
-            size = None
+                })
+
+        # 文件未变化（mtime + size 相同）时直接复用已解码的内容
+        st = os.stat(full_path)
+        size = st.st_size
+        cache_key = (full_path, st.st_mtime_ns, size, max_bytes)
+        cached = _file_content_cache_get(cache_key)
+        if cached is not None:
+            text, used_encoding, truncated = cached
+        else:
+            # 文件大小已由上面的 stat 得到，直接据此判断是否截断，不再多读 1 个字节探测；
+            # 解码前先嗅探 BOM，避免对非 UTF-8 文件做多余的整段解码尝试
+            truncated = size > max_bytes
+            text, used_encoding = _read_and_decode(full_path, size, max_bytes)
+
+            _file_content_cache_put(cache_key, (text, used_encoding, truncated))
 
         result = {
             "path": resolved_rel_path,
@@ -372,17 +630,92 @@ def read_file(path: str, workspace: Optional[str] = None, max_bytes: int = 200_0
             "max_bytes": max_bytes,
             "content": text,
         }
-        return json.dumps(result, ensure_ascii=False)
+        return dumps_json(result)
 
     except Exception as e:
         logger.error(f"[read_file] 失败: {e}", exc_info=True)
-        return json.dumps({"error": str(e)}, ensure_ascii=False)
+        return dumps_json({"error": str(e)})
 
 
 # ============================================================
 # read_file_range
 # ============================================================
 
+_COUNT_CHUNK_SIZE = 1 << 20
+
+
+def _count_lines_from(mm: mmap.mmap, offset: int, size: int) -> int:
+    """统计 [offset, size) 区间内的行数（末行无换行符也计为一行）"""
+    count = 0
+    for chunk_start in range(offset, size, _COUNT_CHUNK_SIZE):
+        count += mm[chunk_start:min(chunk_start + _COUNT_CHUNK_SIZE, size)].count(b"\n")
+    if size > offset and mm[size - 1] != 0x0A:
+        count += 1
+    return count
+
+
+def _read_line_range(
+    full_path: str,
+    start_line: int,
+    end_line: int,
+    include_total_lines: bool,
+) -> Tuple[List[Tuple[int, str]], int, bool]:
+    """按行号区间读取文件
+
+    通过 mmap 定位换行符（bytes.find 由 C 实现），只解码目标区间的字节，
+    不再逐行解码 start_line 之前的全部内容。
+
+    Returns:
+        (lines, total_lines, reached_eof)：lines 为 (行号, 文本) 列表；
+        reached_eof 为 False 时表示未扫描到文件末尾，total_lines 无意义
+    """
+    with open(full_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return [], 0, True
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # 定位 start_line 的起始偏移
+            start_off = 0
+            line_no = 1
+            while line_no < start_line:
+                nl = mm.find(b"\n", start_off)
+                if nl == -1:
+                    start_off = size
+                    break
+                start_off = nl + 1
+                line_no += 1
+            if line_no < start_line or start_off >= size:
+                # 起始行超出文件范围，此时已扫描整个文件
+                return [], _count_lines_from(mm, 0, size), True
+
+            # 定位 end_line 的结束偏移
+            end_off = start_off
+            while line_no <= end_line:
+                nl = mm.find(b"\n", end_off)
+                if nl == -1:
+                    end_off = size
+                    break
+                end_off = nl + 1
+                line_no += 1
+
+            text = mm[start_off:end_off].decode("utf-8", errors="replace")
+            reached_eof = end_off >= size
+            rest_lines = 0
+            if not reached_eof and include_total_lines:
+                rest_lines = _count_lines_from(mm, end_off, size)
+                reached_eof = True
+
+    raw_lines = text.split("\n")
+    if text.endswith("\n"):
+        raw_lines.pop()
+    lines = [
+        (start_line + i, line[:-1] if line.endswith("\r") else line)
+        for i, line in enumerate(raw_lines)
+    ]
+    total_lines = start_line - 1 + len(lines) + rest_lines
+    return lines, total_lines, reached_eof
+
+
 class ReadFileRangeInput(BaseModel):
     path: str = Field(..., description="相对项目根目录的文件路径，如 'backend/app/main.py'")
     workspace: Optional[str] = Field(
@@ -391,70 +724,76 @@ class ReadFileRangeInput(BaseModel):
     )
     start_line: int = Field(..., ge=1, description="起始行号（从 1 开始，包含）")
     end_line: int = Field(..., ge=1, description="结束行号（从 1 开始，包含）")
+    include_total_lines: bool = Field(
+        default=False,
+        description="是否统计文件总行数（需要读到文件末尾，大文件较慢），默认不统计",
+    )
 
 
 @tool(args_schema=ReadFileRangeInput)
-def read_file_range(path: str, workspace: Optional[str] = None, start_line: int = 1, end_line: int = 100) -> str:
+def read_file_range(
+    path: str,
+    workspace: Optional[str] = None,
+    start_line: int = 1,
+    end_line: int = 100,
+    include_total_lines: bool = False,
+) -> str:
     """按行读取指定代码库文件的部分内容，用于查看局部代码上下文。"""
     try:
         if end_line < start_line:
-            return json.dumps({
+            return dumps_json({
                 "error": "end_line 必须大于等于 start_line",
                 "path": path,
                 "start_line": start_line,
                 "end_line": end_line,
-            }, ensure_ascii=False)
+            })
 
-        root = os.path.abspath(CodeWorkspaceConfig.get_workspace_root(workspace))
-        full_path = os.path.abspath(os.path.join(root, path))
+        root = _get_workspace_root(workspace)
+        full_path = _join_root(root, path)
 
-        try:
-            common = os.path.commonpath([root, full_path])
-        except ValueError:
-            return json.dumps({"error": "路径非法", "path": path}, ensure_ascii=False)
-        if common != root:
-            return json.dumps({
+        if not _is_within_root(root, full_path):
+            return dumps_json({
                 "error": "路径越界，不允许访问项目根目录之外的文件",
                 "path": path,
-            }, ensure_ascii=False)
+            })
 
         if not os.path.isfile(full_path):
-            return json.dumps({
+            return dumps_json({
                 "error": "文件不存在或不是普通文件",
                 "path": path,
-            }, ensure_ascii=False)
-
-        lines = []
-        total_lines = 0
+            })
 
-        with open(full_path, "r", encoding="utf-8", errors="replace") as f:
-            for idx, line in enumerate(f, start=1):
-                total_lines = idx
-                if start_line <= idx <= end_line:
-                    lines.append({"line_no": idx, "text": line.rstrip("\n")})
+        lines, total_lines, reached_eof = _read_line_range(
+            full_path, start_line, end_line, include_total_lines
+        )
 
-        if start_line > total_lines:
-            return json.dumps({
+        if reached_eof and start_line > total_lines:
+            return dumps_json({
                 "error": f"行号超出文件范围（总行数: {total_lines})",
                 "path": path,
                 "start_line": start_line,
                 "end_line": end_line,
                 "total_lines": total_lines,
-            }, ensure_ascii=False)
+            })
 
         result = {
             "path": path,
             "absolute_path": full_path.replace("\\", "/"),
             "start_line": start_line,
             "end_line": end_line,
-            "total_lines": total_lines,
             "lines": lines,
         }
-        return json.dumps(result, ensure_ascii=False)
+        # 未读到文件末尾时总行数未知，不返回该字段；has_more 告知 Agent 是否还有后续内容可读
+        if reached_eof:
+            result["total_lines"] = total_lines
+            result["has_more"] = total_lines > end_line
+        else:
+            result["has_more"] = True
+        return dumps_json(result)
 
     except Exception as e:
         logger.error(f"[read_file_range] 失败: {e}", exc_info=True)
-        return json.dumps({"error": str(e)}, ensure_ascii=False)
+        return dumps_json({"error": str(e)})
 
 
 # ============================================================
@@ -472,6 +811,13 @@ class GrepCodeInput(BaseModel):
     max_matches: int = Field(default=30, ge=1, le=100, description="最大匹配数量，防止结果过多")
 
 
+# grep_code 整体超时（秒）
+GREP_TIMEOUT_SECONDS = 30
+
+# 需要解析的 rg --json 记录（只关心匹配行与上下文行）
+_RG_WANTED_PREFIXES = (b'{"type":"match"', b'{"type":"context"')
+
+
 @tool(args_schema=GrepCodeInput)
 def grep_code(
     pattern: str,
@@ -498,27 +844,27 @@ def grep_code(
     
     try:
         if not is_ripgrep_installed():
-            return json.dumps({
+            return dumps_json({
                 "error": "ripgrep 未安装，请重启服务器自动安装或手动安装",
-            }, ensure_ascii=False)
+            })
         
         rg_path = get_ripgrep_path()
-        root = os.path.abspath(CodeWorkspaceConfig.get_workspace_root(workspace))
+        root = _get_workspace_root(workspace)
         search_path = os.path.join(root, path) if path else root
         
         # 验证搜索路径
         if not os.path.exists(search_path):
-            return json.dumps({
+            return dumps_json({
                 "error": f"搜索路径不存在: {path}",
                 "workspace": workspace,
-            }, ensure_ascii=False)
+            })
         
         # 构建 ripgrep 命令
         cmd = [
             rg_path,
             "--json",           # JSON 输出便于解析
             "--no-heading",     # 不分组显示
-            "-m", str(max_matches),  # 限制总匹配数
+            "-m", str(max_matches),  # 单个文件的最大匹配数（总数在读取输出时控制）
         ]
         
         if ignore_case:
@@ -533,38 +879,58 @@ def grep_code(
         cmd.append(pattern)
         cmd.append(search_path)
         
-        # 执行搜索（指定 UTF-8 编码，处理 Windows 默认 GBK 问题）
-        result = subprocess.run(
+        # 流式读取 rg 输出（字节模式，rg --json 本身是 UTF-8，避开 Windows 默认 GBK 解码问题）：
+        # -m 只限制单个文件的匹配数，凑够 max_matches 个匹配后立即结束 rg，不再缓冲其余输出
+        proc = subprocess.Popen(
             cmd,
-            capture_output=True,
-            text=True,
-            encoding='utf-8',
-            errors='replace',
-            timeout=30,
-            cwd=root
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=root,
         )
+        timed_out = []
+
+        def _on_timeout():
+            timed_out.append(True)
+            proc.kill()
+
+        # 整体超时：到时直接结束 rg，读取循环随管道关闭退出
+        timer = Timer(GREP_TIMEOUT_SECONDS, _on_timeout)
+        timer.start()
         
         # 解析 JSON 输出
         matches = []
         current_file = None
         current_match = None
+        # rg 输出的路径以传入的搜索路径（位于 root 之下）开头，直接切掉根目录前缀得到相对路径
+        root_prefix = root if root.endswith(os.sep) else root + os.sep
         
-        stdout = result.stdout or ""
-        for line in stdout.strip().split("\n"):
-            if not line:
-                continue
-            try:
-                data = json.loads(line)
+        try:
+            for line in proc.stdout:
+                # rg --json 每行以 type 字段开头，begin/end/summary 等无关记录按前缀跳过，不做 JSON 解析
+                if not line.startswith(_RG_WANTED_PREFIXES):
+                    continue
+                try:
+                    data = loads_json(line)
+                except ValueError:
+                    continue
                 msg_type = data.get("type")
                 
                 if msg_type == "match":
-                    # 保存上一个匹配
+                    # 保存上一个匹配（此时它的后置上下文已全部读到）
                     if current_match:
                         matches.append(current_match)
+                        current_match = None
+                        if len(matches) >= max_matches:
+                            break
                     
                     match_data = data.get("data", {})
                     file_path = match_data.get("path", {}).get("text", "")
-                    rel_path = os.path.relpath(file_path, root).replace("\\", "/")
+                    if file_path.startswith(root_prefix):
+                        rel_path = file_path[len(root_prefix):]
+                    else:
+                        rel_path = os.path.relpath(file_path, root)
+                    if os.sep != "/":
+                        rel_path = rel_path.replace(os.sep, "/")
                     
                     current_match = {
                         "file": rel_path,
@@ -585,33 +951,37 @@ def grep_code(
                         current_match["context_before"].append(ctx_text)
                     else:
                         current_match["context_after"].append(ctx_text)
-                        
-            except json.JSONDecodeError:
-                continue
+        finally:
+            timer.cancel()
+            if proc.poll() is None:
+                proc.kill()
+            proc.stdout.close()
+            proc.wait()
+        
+        if timed_out:
+            return dumps_json({"error": "搜索超时，请缩小搜索范围"})
         
         # 添加最后一个匹配
         if current_match:
             matches.append(current_match)
         
         if not matches:
-            return json.dumps({
+            return dumps_json({
                 "pattern": pattern,
                 "workspace": workspace,
                 "path": path,
                 "matches": [],
                 "message": f"未找到匹配 '{pattern}' 的内容"
-            }, ensure_ascii=False)
+            })
         
-        return json.dumps({
+        return dumps_json({
             "pattern": pattern,
             "workspace": workspace,
             "path": path,
             "total_matches": len(matches),
             "matches": matches,
-        }, ensure_ascii=False)
+        })
         
-    except subprocess.TimeoutExpired:
-        return json.dumps({"error": "搜索超时，请缩小搜索范围"}, ensure_ascii=False)
     except Exception as e:
         logger.error(f"[grep_code] 失败: {e}", exc_info=True)
-        return json.dumps({"error": str(e)}, ensure_ascii=False)
+        return dumps_json({"error": str(e)})
@@ -6,18 +6,53 @@
 - get_resource_context: 获取数据资源上下文
 """
 
-import json
-from typing import List
+from typing import Any, Callable, Dict, List
 
 from langchain_core.tools import tool
 from pydantic import BaseModel, Field
 
 from backend.app.services.graph_service import (
-    get_business_context as _get_business_context,
-    get_implementation_context as _get_implementation_context,
-    get_resource_context as _get_resource_context,
+    get_business_contexts as _get_business_contexts,
+    get_implementation_contexts as _get_implementation_contexts,
+    get_resource_contexts as _get_resource_contexts,
 )
-from backend.app.core.logger import logger
+from backend.app.models.resource_graph import Business, Implementation, DataResource
+from ._common import filter_known_ids, safe_tool_json
+
+
+def _batch_context(
+    ids: List[str],
+    id_column: Any,
+    fetcher: Callable[[List[str]], Dict[str, Any]],
+    id_label: str,
+) -> Dict[str, Any]:
+    """三个 get_*_context 工具的公共实现：批量取上下文并按输入顺序组装结果
+
+    Args:
+        ids: 待查询的实体 ID 列表
+        id_column: SQLite 中对应的 ID 列，用于预过滤不存在的 ID
+        fetcher: graph_service 中的批量上下文获取函数（返回 {id: context}）
+        id_label: 结果中 ID 字段的名称（如 process_id）
+    """
+    results = []
+    errors = []
+    
+    # 一次批量查询取回全部上下文，避免逐个 ID 访问 Neo4j
+    # 先在本地剔除不存在的 ID（如模型臆造的 ID），这些 ID 不再发往 Neo4j
+    known_ids = filter_known_ids(id_column, ids)
+    context_map = fetcher([i for i in ids if i in known_ids])
+    for entity_id in ids:
+        context = context_map.get(entity_id)
+        if context:
+            results.append({id_label: entity_id, "context": context})
+        else:
+            errors.append(f"未找到 {id_label}={entity_id}")
+    
+    return {
+        "results": results,
+        "total": len(results),
+        "errors": errors if errors else None
+    }
 
 
 # ============================================================
@@ -30,30 +65,13 @@ class GetBusinessContextInput(BaseModel):
 
 
 @tool(args_schema=GetBusinessContextInput)
-def get_business_context(process_ids: List[str]) -> str:
+@safe_tool_json("get_business_context")
+def get_business_context(process_ids: List[str]) -> Dict[str, Any]:
     """获取指定业务流程的完整上下文信息（支持批量查询）。
     包括流程步骤、涉及的实现/接口、数据资源访问等。
     用于深入了解一个或多个业务流程的详细结构。
     """
-    try:
-        results = []
-        errors = []
-        
-        for process_id in process_ids:
-            context = _get_business_context(process_id)
-            if context:
-                results.append({"process_id": process_id, "context": context})
-            else:
-                errors.append(f"未找到 process_id={process_id}")
-        
-        return json.dumps({
-            "results": results,
-            "total": len(results),
-            "errors": errors if errors else None
-        }, ensure_ascii=False, default=str)
-    except Exception as e:
-        logger.error(f"[get_business_context] 查询失败: {e}", exc_info=True)
-        return json.dumps({"error": str(e)}, ensure_ascii=False)
+    return _batch_context(process_ids, Business.process_id, _get_business_contexts, "process_id")
 
 
 # ============================================================
@@ -66,30 +84,13 @@ class GetImplementationContextInput(BaseModel):
 
 
 @tool(args_schema=GetImplementationContextInput)
-def get_implementation_context(impl_ids: List[str]) -> str:
+@safe_tool_json("get_implementation_context")
+def get_implementation_context(impl_ids: List[str]) -> Dict[str, Any]:
     """获取指定实现/接口的上下文信息（支持批量查询）。
     包括该接口所属系统、访问的数据资源、调用的其他接口等。
     用于了解一个或多个接口的技术细节和依赖关系。
     """
-    try:
-        results = []
-        errors = []
-        
-        for impl_id in impl_ids:
-            context = _get_implementation_context(impl_id)
-            if context:
-                results.append({"impl_id": impl_id, "context": context})
-            else:
-                errors.append(f"未找到 impl_id={impl_id}")
-        
-        return json.dumps({
-            "results": results,
-            "total": len(results),
-            "errors": errors if errors else None
-        }, ensure_ascii=False, default=str)
-    except Exception as e:
-        logger.error(f"[get_implementation_context] 查询失败: {e}", exc_info=True)
-        return json.dumps({"error": str(e)}, ensure_ascii=False)
+    return _batch_context(impl_ids, Implementation.impl_id, _get_implementation_contexts, "impl_id")
 
 
 # ============================================================
@@ -102,27 +103,10 @@ class GetResourceContextInput(BaseModel):
 
 
 @tool(args_schema=GetResourceContextInput)
-def get_resource_context(resource_ids: List[str]) -> str:
+@safe_tool_json("get_resource_context")
+def get_resource_context(resource_ids: List[str]) -> Dict[str, Any]:
     """获取指定数据资源的上下文信息（支持批量查询）。
     包括哪些接口访问了这个资源、以什么方式访问等。
     用于了解一个或多个数据表/资源的使用情况。
     """
-    try:
-        results = []
-        errors = []
-        
-        for resource_id in resource_ids:
-            context = _get_resource_context(resource_id)
-            if context:
-                results.append({"resource_id": resource_id, "context": context})
-            else:
-                errors.append(f"未找到 resource_id={resource_id}")
-        
-        return json.dumps({
-            "results": results,
-            "total": len(results),
-            "errors": errors if errors else None
-        }, ensure_ascii=False, default=str)
-    except Exception as e:
-        logger.error(f"[get_resource_context] 查询失败: {e}", exc_info=True)
-        return json.dumps({"error": str(e)}, ensure_ascii=False)
+    return _batch_context(resource_ids, DataResource.resource_id, _get_resource_contexts, "resource_id")
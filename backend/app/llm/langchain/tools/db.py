@@ -2,24 +2,34 @@
 
 提供数据库查询能力：
 - get_table_schema: 获取表的 DDL 结构定义
+- get_table_schemas: 批量获取多张表的 DDL 结构定义
 - query_database: 执行只读 SQL 查询（根据业务线自动选择数据库）
 """
 
-import json
+import queue
 import re
-from typing import Optional, List, Dict, Any, Annotated
+import threading
+import time
+from typing import Optional, List, Dict, Any, Annotated, Collection, FrozenSet, NamedTuple, Tuple
 from contextlib import contextmanager
+from datetime import date, datetime, time as dt_time, timedelta
+from decimal import Decimal
+from functools import lru_cache
+from itertools import islice
 
 import pymysql
-from pymysql.cursors import DictCursor
+from pymysql.constants import FIELD_TYPE
+from pymysql.cursors import DictCursor, SSDictCursor
 from langchain_core.tools import tool, InjectedToolArg
 from langchain_core.runnables import RunnableConfig
 from pydantic import BaseModel, Field
+from sqlalchemy import case, event, or_
 
 from backend.app.db.sqlite import SessionLocal
 from backend.app.models.resource_graph import DataResource
 from backend.app.core.logger import logger
 from backend.app.llm.langchain.tools.log import BusinessLine, PrivateServer
+from ._common import dumps_json
 
 
 # ============================================================
@@ -80,6 +90,8 @@ class DatabaseConfig:
         r"password|secret|token|pwd": "'[REDACTED]'",
         r"bank_card|card_no|bankcard": "CONCAT('****',RIGHT({col},4))",
     }
+    # 所有脱敏规则的字段名模式合并为一个预编译正则，判定敏感字段只需一次扫描
+    SENSITIVE_COLUMN_RE = re.compile('|'.join(f'(?:{pat})' for pat in MASKING_RULES), re.IGNORECASE)
     
     # 禁止访问的表（黑名单）
     BLOCKED_TABLES: List[str] = [
@@ -88,6 +100,8 @@ class DatabaseConfig:
         "sys_secret",
         "payment_key",
     ]
+    # 黑名单的小写集合（类定义时计算一次，校验时直接哈希查找）
+    _BLOCKED_TABLES_LC = frozenset(t.lower() for t in BLOCKED_TABLES)
     
     @classmethod
     def get_connection(cls, database: str) -> Optional[Dict[str, Any]]:
@@ -137,29 +151,41 @@ class SQLValidator:
                         'TRUNCATE', 'REPLACE', 'GRANT', 'REVOKE', 'EXECUTE',
                         'CALL', 'INTO', 'SET', 'LOCK', 'UNLOCK'}
     
+    # 以下正则在类定义时预编译：禁止关键字合并为一个交替模式，一次扫描即可判定
+    _BLOCKED_RE = re.compile(r'\b(?:' + '|'.join(sorted(map(re.escape, BLOCKED_KEYWORDS))) + r')\b')
+    _TABLE_RE = re.compile(r'(?:FROM|JOIN)\s+`?(\w+)`?')
+    _JOIN_RE = re.compile(r'\bJOIN\b')
+    _LIMIT_RE = re.compile(r'\bLIMIT\s+(\d+)')
+    _LIMIT_SUB_RE = re.compile(r'\bLIMIT\s+\d+', re.IGNORECASE)
+    
     @classmethod
-    def validate(cls, sql: str, allowed_tables: List[str]) -> tuple[bool, str]:
+    def validate(cls, sql: str, allowed_tables: Collection[str], sql_upper: Optional[str] = None) -> tuple[bool, str]:
         """
         校验 SQL 语句安全性
         
+        Args:
+            sql: 待校验的 SQL
+            allowed_tables: 表名白名单；传入小写表名的 frozenset 时直接做哈希查找
+            sql_upper: 调用方已计算好的 sql.upper().strip()，传入时不再重复转换
+        
         Returns:
             (is_valid, error_message)
         """
         logger.debug(f"[SQLValidator] 开始校验 SQL, 长度={len(sql)}, 白名单表数={len(allowed_tables)}")
-        sql_upper = sql.upper().strip()
+        if sql_upper is None:
+            sql_upper = sql.upper().strip()
         
         # 1. 必须以 SELECT 开头
         if not sql_upper.startswith('SELECT'):
             logger.warning(f"[SQLValidator] 校验失败: SQL 不是以 SELECT 开头, sql={sql[:100]}")
             return False, "仅允许 SELECT 查询语句"
         
-        # 2. 检查禁止的关键字
-        for keyword in cls.BLOCKED_KEYWORDS:
-            # 使用单词边界匹配，避免误判
-            pattern = r'\b' + keyword + r'\b'
-            if re.search(pattern, sql_upper):
-                logger.warning(f"[SQLValidator] 校验失败: 包含禁止关键字 {keyword}, sql={sql[:100]}")
-                return False, f"禁止使用 {keyword} 语句"
+        # 2. 检查禁止的关键字（使用单词边界匹配，避免误判）
+        blocked = cls._BLOCKED_RE.search(sql_upper)
+        if blocked:
+            keyword = blocked.group(0)
+            logger.warning(f"[SQLValidator] 校验失败: 包含禁止关键字 {keyword}, sql={sql[:100]}")
+            return False, f"禁止使用 {keyword} 语句"
         
         # 3. 检查是否包含注释（防止注入）
         if '--' in sql or '/*' in sql:
@@ -173,24 +199,26 @@ class SQLValidator:
         
         # 5. 提取涉及的表名并校验
         # 简单的表名提取（FROM/JOIN 后面的标识符）
-        table_pattern = r'(?:FROM|JOIN)\s+`?(\w+)`?'
-        tables_in_sql = re.findall(table_pattern, sql_upper)
+        tables_in_sql = cls._TABLE_RE.findall(sql_upper)
         
         logger.debug(f"[SQLValidator] SQL 中涉及的表: {tables_in_sql}")
         
+        if allowed_tables and not isinstance(allowed_tables, frozenset):
+            allowed_tables = frozenset(t.lower() for t in allowed_tables)
+        
         for table in tables_in_sql:
             table_lower = table.lower()
             # 检查黑名单
-            if table_lower in [t.lower() for t in DatabaseConfig.BLOCKED_TABLES]:
+            if table_lower in DatabaseConfig._BLOCKED_TABLES_LC:
                 logger.warning(f"[SQLValidator] 校验失败: 尝试访问黑名单表 {table}")
                 return False, f"禁止访问表: {table}"
             # 检查白名单（如果提供）
-            if allowed_tables and table_lower not in [t.lower() for t in allowed_tables]:
+            if allowed_tables and table_lower not in allowed_tables:
                 logger.warning(f"[SQLValidator] 校验失败: 表 {table} 不在白名单中")
                 return False, f"表 {table} 不在可查询范围内"
         
         # 6. 检查 JOIN 数量
-        join_count = len(re.findall(r'\bJOIN\b', sql_upper))
+        join_count = len(cls._JOIN_RE.findall(sql_upper))
         if join_count > DatabaseConfig.MAX_JOIN_TABLES:
             logger.warning(f"[SQLValidator] 校验失败: JOIN 数量 {join_count} 超过限制 {DatabaseConfig.MAX_JOIN_TABLES}")
             return False, f"JOIN 表数量超过限制（最多 {DatabaseConfig.MAX_JOIN_TABLES} 个）"
@@ -199,24 +227,20 @@ class SQLValidator:
         return True, ""
     
     @classmethod
-    def ensure_limit(cls, sql: str, max_rows: int = None) -> str:
-        """确保 SQL 包含 LIMIT 子句"""
+    def ensure_limit(cls, sql: str, max_rows: int = None, sql_upper: Optional[str] = None) -> str:
+        """确保 SQL 包含 LIMIT 子句（sql_upper 可复用 validate 时已计算的大写 SQL）"""
         max_rows = max_rows or DatabaseConfig.MAX_ROWS
-        sql_upper = sql.upper().strip().rstrip(';')
+        if sql_upper is None:
+            sql_upper = sql.upper().strip()
         
         # 检查是否已有 LIMIT
-        limit_match = re.search(r'\bLIMIT\s+(\d+)', sql_upper)
+        limit_match = cls._LIMIT_RE.search(sql_upper)
         if limit_match:
             current_limit = int(limit_match.group(1))
             if current_limit > max_rows:
                 logger.info(f"[SQLValidator] 调整 LIMIT: {current_limit} -> {max_rows}")
                 # 替换为最大限制
-                sql = re.sub(
-                    r'\bLIMIT\s+\d+',
-                    f'LIMIT {max_rows}',
-                    sql,
-                    flags=re.IGNORECASE
-                )
+                sql = cls._LIMIT_SUB_RE.sub(f'LIMIT {max_rows}', sql)
             else:
                 logger.debug(f"[SQLValidator] LIMIT 已存在且合规: {current_limit}")
         else:
@@ -231,55 +255,186 @@ class SQLValidator:
 # 数据库执行器
 # ============================================================
 
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _to_float(value: Any) -> Any:
+    return None if value is None else float(value)
+
+
+def _to_isoformat(value: Any) -> Any:
+    # 非法日期（如 0000-00-00）会被 pymysql 原样返回为字符串
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def _to_str(value: Any) -> Any:
+    # TIME 字段返回 timedelta，转为字符串以便 JSON 序列化
+    return None if value is None else str(value)
+
+
+def _decode_bytes(value: Any) -> Any:
+    return value.decode('utf-8', errors='replace') if isinstance(value, bytes) else value
+
+
+# 未知字段类型时按值的 Python 类型分派（一次字典查找，代替逐个 hasattr 判断）
+_VALUE_CONVERTERS: Dict[type, Any] = {
+    datetime: datetime.isoformat,
+    date: date.isoformat,
+    dt_time: dt_time.isoformat,
+    Decimal: float,
+    timedelta: str,
+    bytes: _decode_bytes,
+    bytearray: lambda value: bytes(value).decode('utf-8', errors='replace'),
+}
+
+
+def _to_serializable(value: Any) -> Any:
+    """未知字段类型的兜底转换"""
+    conv = _VALUE_CONVERTERS.get(type(value))
+    return conv(value) if conv else value
+
+
+# MySQL 字段类型 -> 值转换函数：按 cursor.description 为每列选定一次，逐行只做一次调用
+_FIELD_CONVERTERS: Dict[int, Any] = {
+    FIELD_TYPE.DECIMAL: _to_float,
+    FIELD_TYPE.NEWDECIMAL: _to_float,
+    FIELD_TYPE.TINY: _identity,
+    FIELD_TYPE.SHORT: _identity,
+    FIELD_TYPE.LONG: _identity,
+    FIELD_TYPE.LONGLONG: _identity,
+    FIELD_TYPE.INT24: _identity,
+    FIELD_TYPE.YEAR: _identity,
+    FIELD_TYPE.FLOAT: _identity,
+    FIELD_TYPE.DOUBLE: _identity,
+    FIELD_TYPE.NULL: _identity,
+    FIELD_TYPE.DATE: _to_isoformat,
+    FIELD_TYPE.NEWDATE: _to_isoformat,
+    FIELD_TYPE.DATETIME: _to_isoformat,
+    FIELD_TYPE.TIMESTAMP: _to_isoformat,
+    FIELD_TYPE.TIME: _to_str,
+    FIELD_TYPE.VARCHAR: _decode_bytes,
+    FIELD_TYPE.VAR_STRING: _decode_bytes,
+    FIELD_TYPE.STRING: _decode_bytes,
+    FIELD_TYPE.ENUM: _decode_bytes,
+    FIELD_TYPE.SET: _decode_bytes,
+    FIELD_TYPE.JSON: _decode_bytes,
+    FIELD_TYPE.BIT: _decode_bytes,
+    FIELD_TYPE.TINY_BLOB: _decode_bytes,
+    FIELD_TYPE.MEDIUM_BLOB: _decode_bytes,
+    FIELD_TYPE.LONG_BLOB: _decode_bytes,
+    FIELD_TYPE.BLOB: _decode_bytes,
+}
+
+
 class DatabaseExecutor:
     """数据库查询执行器"""
     
+    # 每个数据库保留的最大空闲连接数
+    POOL_MAX_IDLE = 8
+    
+    # 空闲连接池：database_key -> 空闲连接栈（后进先出，优先复用最近用过、最可能仍存活的连接）
+    _POOLS: Dict[str, "queue.LifoQueue"] = {}
+    _POOLS_LOCK = threading.Lock()
+    
+    @classmethod
+    def _get_pool(cls, database: str) -> "queue.LifoQueue":
+        pool = cls._POOLS.get(database)
+        if pool is None:
+            with cls._POOLS_LOCK:
+                pool = cls._POOLS.get(database)
+                if pool is None:
+                    pool = queue.LifoQueue(maxsize=cls.POOL_MAX_IDLE)
+                    cls._POOLS[database] = pool
+        return pool
+    
+    @classmethod
+    def _connect(cls, database: str, config: Dict[str, Any]) -> pymysql.connections.Connection:
+        """新建一个数据库连接"""
+        start_time = time.time()
+        logger.debug(f"[DatabaseExecutor] 连接参数: host={config['host']}, port={config['port']}, db={config['database']}")
+        conn = pymysql.connect(
+            host=config['host'],
+            port=config['port'],
+            user=config['user'],
+            password=config['password'],
+            database=config['database'],
+            charset=config.get('charset', 'utf8mb4'),
+            read_timeout=DatabaseConfig.QUERY_TIMEOUT,
+            write_timeout=DatabaseConfig.QUERY_TIMEOUT,
+            connect_timeout=10,
+            cursorclass=DictCursor,
+            # 连接会被复用，开启自动提交，避免长事务的一致性快照导致后续查询读到旧数据
+            autocommit=True,
+        )
+        connect_time = time.time() - start_time
+        logger.info(f"[DatabaseExecutor] 新建数据库连接: database={database}, 耗时={connect_time:.3f}s")
+        return conn
+    
     @classmethod
     @contextmanager
     def get_connection(cls, database: str):
         """
         获取数据库连接（上下文管理器）
         
+        优先从空闲连接池取出连接（ping 确认存活），用完归还；
+        池中无可用连接时才新建，省去每次查询的 TCP 握手与认证开销。
+        
         使用方式:
             with DatabaseExecutor.get_connection('stc_parking') as conn:
                 cursor = conn.cursor()
                 ...
         """
-        import time
-        
-        logger.info(f"[DatabaseExecutor] 准备连接数据库: database={database}")
         config = DatabaseConfig.get_connection(database)
         if not config:
             logger.error(f"[DatabaseExecutor] 数据库配置未找到: {database}")
             raise ValueError(f"数据库 {database} 未配置")
         
+        pool = cls._get_pool(database)
         conn = None
+        while conn is None:
+            try:
+                conn = pool.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                conn.ping(reconnect=False)
+            except pymysql.Error:
+                # 空闲期间被服务端断开的连接直接丢弃
+                logger.debug(f"[DatabaseExecutor] 丢弃失效的空闲连接: database={database}")
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+                conn = None
+        
         start_time = time.time()
+        broken = False
         try:
-            logger.debug(f"[DatabaseExecutor] 连接参数: host={config['host']}, port={config['port']}, db={config['database']}")
-            conn = pymysql.connect(
-                host=config['host'],
-                port=config['port'],
-                user=config['user'],
-                password=config['password'],
-                database=config['database'],
-                charset=config.get('charset', 'utf8mb4'),
-                read_timeout=DatabaseConfig.QUERY_TIMEOUT,
-                write_timeout=DatabaseConfig.QUERY_TIMEOUT,
-                connect_timeout=10,
-                cursorclass=DictCursor,
-            )
-            connect_time = time.time() - start_time
-            logger.info(f"[DatabaseExecutor] 成功连接数据库: database={database}, 耗时={connect_time:.3f}s")
+            if conn is None:
+                conn = cls._connect(database, config)
             yield conn
         except pymysql.Error as e:
-            logger.error(f"[DatabaseExecutor] 连接数据库失败: database={database}, error={e}, error_code={e.args[0] if e.args else 'N/A'}")
+            # 连接层错误（断连、超时等）后连接状态不确定，不再放回池中；SQL 语法等错误不影响连接复用
+            broken = isinstance(e, (pymysql.OperationalError, pymysql.InterfaceError))
+            logger.error(f"[DatabaseExecutor] 数据库操作失败: database={database}, error={e}, error_code={e.args[0] if e.args else 'N/A'}")
+            raise
+        except BaseException:
+            broken = True
             raise
         finally:
-            if conn:
-                conn.close()
+            if conn is not None:
+                returned = False
+                if not broken and conn.open:
+                    try:
+                        pool.put_nowait(conn)
+                        returned = True
+                    except queue.Full:
+                        pass
+                if not returned:
+                    conn.close()
                 total_time = time.time() - start_time
-                logger.debug(f"[DatabaseExecutor] 关闭数据库连接: database={database}, 总耗时={total_time:.3f}s")
+                logger.debug(f"[DatabaseExecutor] 释放数据库连接: database={database}, 归还连接池={returned}, 总耗时={total_time:.3f}s")
     
     @classmethod
     def execute(cls, sql: str, database: str) -> List[Dict[str, Any]]:
@@ -293,42 +448,35 @@ class DatabaseExecutor:
         Returns:
             查询结果列表，每行为一个字典
         """
-        import time
-        
         logger.info(f"[DatabaseExecutor] 开始执行 SQL: database={database}")
         logger.debug(f"[DatabaseExecutor] SQL 内容: {sql}")
         
         with cls.get_connection(database) as conn:
-            cursor = conn.cursor()
+            # 非缓冲游标：边从网络读取边转换，不再先 fetchall 出一份完整行列表再复制一份
+            cursor = conn.cursor(SSDictCursor)
             exec_start = time.time()
             try:
                 cursor.execute(sql)
                 exec_time = time.time() - exec_start
                 logger.info(f"[DatabaseExecutor] SQL 执行完成, 耗时={exec_time:.3f}s")
                 
+                # 将结果转换为可序列化的格式：按列类型预先选定转换函数，不再逐值判断类型
+                # （行字典按列顺序排列，与 description 一一对应）
                 fetch_start = time.time()
-                results = cursor.fetchall()
-                fetch_time = time.time() - fetch_start
-                logger.info(f"[DatabaseExecutor] 数据获取完成: rows={len(results)}, 耗时={fetch_time:.3f}s")
+                converters = [
+                    _FIELD_CONVERTERS.get(desc[1], _to_serializable)
+                    for desc in (cursor.description or ())
+                ]
+                # SQL 已由 ensure_limit 限制行数，这里再兜底截断一次：多读 1 行用于判断是否被截断
+                serializable_results = [
+                    {key: conv(value) for (key, value), conv in zip(row.items(), converters)}
+                    for row in islice(cursor, DatabaseConfig.MAX_ROWS + 1)
+                ]
+                if len(serializable_results) > DatabaseConfig.MAX_ROWS:
+                    del serializable_results[DatabaseConfig.MAX_ROWS:]
+                    logger.warning(f"[DatabaseExecutor] 结果超过 {DatabaseConfig.MAX_ROWS} 行，已截断")
                 
-                # 将结果转换为可序列化的格式
-                serialize_start = time.time()
-                serializable_results = []
-                for idx, row in enumerate(results):
-                    serializable_row = {}
-                    for key, value in row.items():
-                        # 处理特殊类型（日期、Decimal 等）
-                        if hasattr(value, 'isoformat'):  # datetime/date
-                            serializable_row[key] = value.isoformat()
-                        elif hasattr(value, '__float__'):  # Decimal
-                            serializable_row[key] = float(value)
-                        elif isinstance(value, bytes):
-                            serializable_row[key] = value.decode('utf-8', errors='replace')
-                        else:
-                            serializable_row[key] = value
-                    serializable_results.append(serializable_row)
-                
-                serialize_time = time.time() - serialize_start
+                fetch_time = time.time() - fetch_start
                 total_time = time.time() - exec_start
                 
                 logger.info(
@@ -336,8 +484,7 @@ class DatabaseExecutor:
                     f"rows={len(serializable_results)}, "
                     f"总耗时={total_time:.3f}s ("
                     f"执行={exec_time:.3f}s, "
-                    f"获取={fetch_time:.3f}s, "
-                    f"序列化={serialize_time:.3f}s)"
+                    f"获取及序列化={fetch_time:.3f}s)"
                 )
                 
                 # 记录结果样例（仅debug级别）
@@ -370,6 +517,119 @@ class GetTableSchemaInput(BaseModel):
     )
 
 
+class _TableResource(NamedTuple):
+    """get_table_schema 所需的数据资源字段（脱离 Session 的只读快照，可安全缓存）"""
+    name: str
+    system: Optional[str]
+    type: Optional[str]
+    description: Optional[str]
+    ddl: Optional[str]
+
+
+# 按 _TableResource 字段顺序只查询所需列，避免加载完整 ORM 实体
+_TABLE_RESOURCE_COLUMNS = (
+    DataResource.name,
+    DataResource.system,
+    DataResource.type,
+    DataResource.description,
+    DataResource.ddl,
+)
+
+# 表结构缓存：{表名: (过期时间, 数据资源快照)}。Agent 常在一次排查中反复查看同一张表
+TABLE_SCHEMA_CACHE_TTL_SECONDS = 60.0
+_table_resource_cache: Dict[str, Tuple[float, _TableResource]] = {}
+
+
+def _clear_table_resource_cache(mapper, connection, target) -> None:
+    """数据资源增删改后清空表结构缓存，用户补充 DDL 后重试即可拿到最新结构，无需等待 TTL"""
+    _table_resource_cache.clear()
+
+
+# 注册在 ORM 映射事件上，服务层写库时自动触发，无需引用工具模块
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(DataResource, _event_name, _clear_table_resource_cache)
+
+
+def _lookup_table_resource(table_name: str) -> Tuple[Optional[_TableResource], List[str]]:
+    """按表名查找数据资源，返回 (精确匹配的资源, 模糊匹配建议)
+
+    精确命中缓存时不再打开 Session；否则用一条 SQL 同时取回精确匹配与模糊匹配（精确匹配排在最前），
+    未命中时不必再发第二次查询取建议。
+    """
+    cached = _table_resource_cache.get(table_name)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1], []
+    
+    db = SessionLocal()
+    try:
+        is_exact = DataResource.name == table_name
+        # 只取所需字段；模糊匹配行只用于给出建议，不取其 DDL
+        rows = (
+            db.query(*_TABLE_RESOURCE_COLUMNS[:-1], case((is_exact, DataResource.ddl), else_=None))
+            .filter(or_(is_exact, DataResource.name.ilike(f'%{table_name}%')))
+            .order_by(case((is_exact, 0), else_=1))
+            .limit(6)
+            .all()
+        )
+        if not rows or rows[0].name != table_name:
+            return None, [r.name for r in rows[:5]]
+        resource = _TableResource(*rows[0])
+    finally:
+        db.close()
+    _table_resource_cache[table_name] = (time.monotonic() + TABLE_SCHEMA_CACHE_TTL_SECONDS, resource)
+    return resource, []
+
+
+def _build_table_schema(resource: _TableResource) -> Dict[str, Any]:
+    """由数据资源快照构建表结构返回结果（DDL + 解析出的字段列表）"""
+    result = {
+        "table_name": resource.name,
+        "description": resource.description,
+    }
+    
+    if resource.ddl:
+        logger.debug(f"[get_table_schema] DDL 长度: {len(resource.ddl)} 字符")
+        result["ddl"] = resource.ddl
+        # 尝试从 DDL 中解析字段列表（简化展示）
+        columns = _parse_columns_from_ddl(resource.ddl)
+        if columns:
+            logger.info(f"[get_table_schema] 解析到 {len(columns)} 个字段")
+            result["columns"] = columns
+        else:
+            logger.warning(f"[get_table_schema] DDL 解析失败，未提取到字段")
+    else:
+        logger.warning(f"[get_table_schema] 表 {resource.name} 没有 DDL 信息")
+        result["ddl"] = None
+        result["warning"] = "该表尚未配置 DDL 结构定义，无法进行数据查询。请先在数据资源中补充表结构信息。"
+    return result
+
+
+def _get_table_resources(table_names: List[str]) -> Dict[str, _TableResource]:
+    """批量按表名精确查找数据资源：缓存未命中的表名合并为一次 IN 查询"""
+    now = time.monotonic()
+    found: Dict[str, _TableResource] = {}
+    missing: List[str] = []
+    for name in table_names:
+        cached = _table_resource_cache.get(name)
+        if cached is not None and cached[0] > now:
+            found[name] = cached[1]
+        else:
+            missing.append(name)
+    
+    if missing:
+        db = SessionLocal()
+        try:
+            rows = db.query(*_TABLE_RESOURCE_COLUMNS).filter(DataResource.name.in_(missing)).all()
+            expires_at = time.monotonic() + TABLE_SCHEMA_CACHE_TTL_SECONDS
+            for row in rows:
+                resource = _TableResource(*row)
+                found[row.name] = resource
+                _table_resource_cache[row.name] = (expires_at, resource)
+        finally:
+            db.close()
+    return found
+
+
 @tool(args_schema=GetTableSchemaInput)
 def get_table_schema(table_name: str) -> str:
     """获取指定表的 DDL 结构定义。
@@ -382,60 +642,90 @@ def get_table_schema(table_name: str) -> str:
     logger.info(f"[get_table_schema] 开始查询表结构: table_name={table_name}")
     
     try:
-        db = SessionLocal()
-        try:
-            # 精确匹配表名
-            logger.debug(f"[get_table_schema] 查询数据资源表: table_name={table_name}")
-            resource = db.query(DataResource).filter(DataResource.name == table_name).first()
-            
-            if not resource:
-                logger.warning(f"[get_table_schema] 未找到表: table_name={table_name}, 尝试模糊匹配")
-                # 尝试模糊匹配给出建议
-                fuzzy_results = db.query(DataResource).filter(
-                    DataResource.name.ilike(f'%{table_name}%')
-                ).limit(5).all()
-                
-                suggestions = [r.name for r in fuzzy_results]
-                logger.info(f"[get_table_schema] 模糊匹配结果: {suggestions}")
-                
-                return json.dumps({
-                    "error": f"未找到表 {table_name}，该表可能尚未在系统中注册",
-                    "suggestions": suggestions if suggestions else None,
-                    "hint": "请确认表名是否正确，或联系管理员添加表结构信息"
-                }, ensure_ascii=False)
-            
-            logger.info(f"[get_table_schema] 找到表: name={resource.name}, system={resource.system}, type={resource.type}")
-            
-            # 构建返回结果
-            result = {
-                "table_name": resource.name,
-                "description": resource.description,
-            }
-            
-            if resource.ddl:
-                logger.debug(f"[get_table_schema] DDL 长度: {len(resource.ddl)} 字符")
-                result["ddl"] = resource.ddl
-                # 尝试从 DDL 中解析字段列表（简化展示）
-                columns = _parse_columns_from_ddl(resource.ddl)
-                if columns:
-                    logger.info(f"[get_table_schema] 解析到 {len(columns)} 个字段")
-                    result["columns"] = columns
-                else:
-                    logger.warning(f"[get_table_schema] DDL 解析失败，未提取到字段")
-            else:
-                logger.warning(f"[get_table_schema] 表 {table_name} 没有 DDL 信息")
-                result["ddl"] = None
-                result["warning"] = "该表尚未配置 DDL 结构定义，无法进行数据查询。请先在数据资源中补充表结构信息。"
-            
-            logger.info(f"[get_table_schema] 返回结果: table={resource.name}, has_ddl={bool(resource.ddl)}, col_count={len(result.get('columns', []))}")
-            return json.dumps(result, ensure_ascii=False)
+        # 精确匹配表名（命中进程内缓存时不访问 SQLite），未命中时同一次查询已带回模糊匹配建议
+        logger.debug(f"[get_table_schema] 查询数据资源表: table_name={table_name}")
+        resource, suggestions = _lookup_table_resource(table_name)
+        
+        if not resource:
+            logger.warning(f"[get_table_schema] 未找到表: table_name={table_name}")
+            logger.info(f"[get_table_schema] 模糊匹配结果: {suggestions}")
             
-        finally:
-            db.close()
+            return dumps_json({
+                "error": f"未找到表 {table_name}，该表可能尚未在系统中注册",
+                "suggestions": suggestions if suggestions else None,
+                "hint": "请确认表名是否正确，或联系管理员添加表结构信息"
+            })
+        
+        logger.info(f"[get_table_schema] 找到表: name={resource.name}, system={resource.system}, type={resource.type}")
+        
+        result = _build_table_schema(resource)
+        
+        logger.info(f"[get_table_schema] 返回结果: table={resource.name}, has_ddl={bool(resource.ddl)}, col_count={len(result.get('columns', []))}")
+        return dumps_json(result)
             
     except Exception as e:
         logger.error(f"[get_table_schema] 查询失败: {e}", exc_info=True)
-        return json.dumps({"error": str(e)}, ensure_ascii=False)
+        return dumps_json({"error": str(e)})
+
+
+class GetTableSchemasInput(BaseModel):
+    """get_table_schemas 工具输入参数"""
+    table_names: List[str] = Field(
+        ...,
+        description="表名称列表，如 ['t_user_card', 't_order_info']。必须是明确的表名。"
+    )
+
+
+@tool(args_schema=GetTableSchemasInput)
+def get_table_schemas(table_names: List[str]) -> str:
+    """批量获取多张表的 DDL 结构定义（一次调用返回全部表）。
+    
+    需要了解多张表（如 JOIN 涉及的表）时优先使用此工具，避免逐表调用 get_table_schema。
+    
+    注意：只有在明确知道要查询的表名时才调用此工具。
+    """
+    names = list(dict.fromkeys(n.strip() for n in table_names if n and n.strip()))
+    logger.info(f"[get_table_schemas] 开始批量查询表结构: table_names={names}")
+    
+    try:
+        resources = _get_table_resources(names)
+        not_found = [n for n in names if n not in resources]
+        if not_found:
+            logger.warning(f"[get_table_schemas] 未找到表: {not_found}")
+        
+        tables = {name: _build_table_schema(resources[name]) for name in names if name in resources}
+        logger.info(f"[get_table_schemas] 返回结果: found={len(tables)}, not_found={len(not_found)}")
+        return dumps_json({
+            "tables": tables,
+            "not_found": not_found or None,
+            "hint": "未找到的表可使用 get_table_schema 单独查询以获取相似表名建议" if not_found else None,
+        })
+    
+    except Exception as e:
+        logger.error(f"[get_table_schemas] 查询失败: {e}", exc_info=True)
+        return dumps_json({"error": str(e)})
+
+
+# DDL 字段定义行，格式: field_name TYPE [constraints] [COMMENT 'xxx']
+_COL_DEF_RE = re.compile(
+    r'^\s*`?(\w+)`?\s+(\w+(?:\([^)]+\))?)[^,\n]*?(?:COMMENT\s+[\'"]([^\'"]*)[\'"])?',
+    re.IGNORECASE,
+)
+
+# CREATE TABLE 行
+_DDL_CREATE_RE = re.compile(r'CREATE\b', re.IGNORECASE)
+# 索引与约束定义行：[PRIMARY|UNIQUE|FOREIGN|FULLTEXT|SPATIAL] KEY/INDEX ...、CONSTRAINT ...、UNIQUE (...)
+# 只匹配行首关键字（按单词边界），user_key、unique_code 等字段名及字段行内的 PRIMARY KEY 不会被误判
+_DDL_SKIP_RE = re.compile(
+    r'(?:(?:PRIMARY|UNIQUE|FOREIGN|FULLTEXT|SPATIAL)\s+)?(?:KEY|INDEX)\b|CONSTRAINT\b|UNIQUE\b',
+    re.IGNORECASE,
+)
+
+
+@lru_cache(maxsize=4096)
+def _is_sensitive_column(col_name: str) -> bool:
+    """字段名是否命中脱敏规则（id、phone 等字段名在各表间大量重复，按字段名缓存）"""
+    return bool(DatabaseConfig.SENSITIVE_COLUMN_RE.search(col_name))
 
 
 def _parse_columns_from_ddl(ddl: str) -> List[Dict[str, str]]:
@@ -449,51 +739,85 @@ def _parse_columns_from_ddl(ddl: str) -> List[Dict[str, str]]:
         phone VARCHAR(20) COMMENT '手机号'
     );
     """
+    # 解析结果按 DDL 文本缓存，这里每次返回新的字典列表，调用方可自由修改
+    return [
+        {"name": name, "type": col_type, "comment": comment, "sensitive": sensitive}
+        for name, col_type, comment, sensitive in _parse_column_tuples(ddl)
+    ]
+
+
+@lru_cache(maxsize=512)
+def _parse_column_tuples(ddl: str) -> Tuple[Tuple[str, str, str, bool], ...]:
+    """解析 DDL 得到 (字段名, 类型, 注释, 是否敏感) 元组；DDL 在部署间基本不变，按文本缓存"""
     columns = []
     try:
-        # 匹配字段定义行
-        # 格式: field_name TYPE [constraints] [COMMENT 'xxx']
-        pattern = r'^\s*`?(\w+)`?\s+(\w+(?:\([^)]+\))?)[^,\n]*?(?:COMMENT\s+[\'"]([^\'"]*)[\'"])?'
-        
         lines = ddl.split('\n')
         for line in lines:
             line = line.strip()
             # 跳过 CREATE TABLE 行和括号行
-            if line.upper().startswith('CREATE') or line in ('(', ')', ');'):
+            if line in ('(', ')', ');') or _DDL_CREATE_RE.match(line):
+                continue
+            # 跳过索引和约束定义（以反引号开头的是字段定义，不跳过）
+            if not line.startswith('`') and _DDL_SKIP_RE.match(line):
                 continue
-            # 跳过索引和约束定义
-            if any(kw in line.upper() for kw in ['PRIMARY KEY', 'INDEX', 'KEY ', 'CONSTRAINT', 'UNIQUE']):
-                if not line.strip().startswith('`'):  # 不是字段定义
-                    continue
             
-            match = re.match(pattern, line, re.IGNORECASE)
+            match = _COL_DEF_RE.match(line)
             if match:
                 col_name = match.group(1)
                 col_type = match.group(2)
                 col_comment = match.group(3) or ""
                 
                 # 标记敏感字段
-                is_sensitive = any(
-                    re.search(pat, col_name, re.IGNORECASE)
-                    for pat in DatabaseConfig.MASKING_RULES.keys()
-                )
+                is_sensitive = _is_sensitive_column(col_name)
                 
-                columns.append({
-                    "name": col_name,
-                    "type": col_type,
-                    "comment": col_comment,
-                    "sensitive": is_sensitive
-                })
+                columns.append((col_name, col_type, col_comment, is_sensitive))
     except Exception as e:
         logger.warning(f"[_parse_columns_from_ddl] 解析失败: {e}")
     
-    return columns
+    return tuple(columns)
 
 
 # ============================================================
 # query_database
 # ============================================================
 
+# 表白名单缓存：(加载时间, 小写表名集合)。白名单很少变化，无需每次查询都访问 SQLite
+ALLOWED_TABLES_TTL_SECONDS = 60.0
+_allowed_tables_cache: Optional[Tuple[float, FrozenSet[str]]] = None
+
+
+def _get_allowed_tables() -> FrozenSet[str]:
+    """获取已注册的表名白名单（小写），超过 TTL 后重新加载"""
+    global _allowed_tables_cache
+    cached = _allowed_tables_cache
+    if cached is not None and time.monotonic() - cached[0] < ALLOWED_TABLES_TTL_SECONDS:
+        return cached[1]
+    
+    logger.debug(f"[query_database] 加载表白名单")
+    db = SessionLocal()
+    try:
+        tables = frozenset(
+            r.name.lower() for r in db.query(DataResource.name)
+            .filter(DataResource.type == 'table')
+            .all()
+            if r.name
+        )
+    finally:
+        db.close()
+    _allowed_tables_cache = (time.monotonic(), tables)
+    return tables
+
+
+def _clear_allowed_tables_cache(mapper, connection, target) -> None:
+    """数据资源增删改后清空表白名单缓存，新注册的表立即可查询，无需等待 TTL"""
+    global _allowed_tables_cache
+    _allowed_tables_cache = None
+
+
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(DataResource, _event_name, _clear_allowed_tables_cache)
+
+
 class QueryDatabaseInput(BaseModel):
     """query_database 工具输入参数"""
     sql: str = Field(
@@ -530,7 +854,7 @@ def query_database(
     # 1. 从 config.metadata 获取用户在 UI 选择的业务线配置
     if not config:
         logger.error(f"[query_database] 缺少运行时配置")
-        return json.dumps({"error": "系统错误：缺少运行时配置"}, ensure_ascii=False)
+        return dumps_json({"error": "系统错误：缺少运行时配置"})
     
     try:
         logger.debug(f"[query_database] 解析业务线配置")
@@ -543,62 +867,55 @@ def query_database(
         
         if not business_line:
             logger.warning(f"[query_database] 未选择业务线")
-            return json.dumps({
+            return dumps_json({
                 "error": "请在界面左上角选择业务线配置",
                 "hint": "数据库查询需要根据业务线确定连接哪个数据库"
-            }, ensure_ascii=False)
+            })
     except Exception as e:
         logger.error(f"[query_database] 获取业务线配置失败: {e}", exc_info=True)
-        return json.dumps({"error": f"获取业务线配置失败: {e}"}, ensure_ascii=False)
+        return dumps_json({"error": f"获取业务线配置失败: {e}"})
     
     # 2. 根据业务线获取数据库 key
     logger.debug(f"[query_database] 根据业务线获取数据库: {business_line}")
     database = DatabaseConfig.get_database_by_business_line(business_line, private_server)
     if not database:
         logger.error(f"[query_database] 业务线 '{business_line}' 未配置数据库")
-        return json.dumps({
+        return dumps_json({
             "error": f"业务线 '{business_line}' 暂未配置数据库连接",
             "hint": "请联系管理员配置该业务线的数据库连接"
-        }, ensure_ascii=False)
+        })
     
     logger.info(f"[query_database] 确定数据库: business_line={business_line}, database={database}")
     
     try:
         # 3. 获取所有已注册的表作为白名单（不再按 system 过滤，因为是同一个库）
-        logger.debug(f"[query_database] 加载表白名单")
-        db = SessionLocal()
-        try:
-            allowed_tables = [
-                r.name for r in db.query(DataResource.name)
-                .filter(DataResource.type == 'table')
-                .all()
-            ]
-            logger.info(f"[query_database] 白名单表数量: {len(allowed_tables)}")
-        finally:
-            db.close()
+        allowed_tables = _get_allowed_tables()
+        logger.info(f"[query_database] 白名单表数量: {len(allowed_tables)}")
         
         # 4. SQL 安全校验
         logger.info(f"[query_database] 开始 SQL 安全校验")
-        is_valid, error_msg = SQLValidator.validate(sql, allowed_tables)
+        # 大写 SQL 只计算一次，校验与 LIMIT 检查共用
+        sql_upper = sql.upper().strip()
+        is_valid, error_msg = SQLValidator.validate(sql, allowed_tables, sql_upper)
         if not is_valid:
             logger.warning(f"[query_database] SQL 校验失败: {error_msg}")
-            return json.dumps({
+            return dumps_json({
                 "error": "SQL 校验失败",
                 "detail": error_msg,
                 "sql": sql
-            }, ensure_ascii=False)
+            })
         
         # 5. 确保 LIMIT 限制
         logger.debug(f"[query_database] 检查 LIMIT 子句")
-        sql = SQLValidator.ensure_limit(sql)
+        sql = SQLValidator.ensure_limit(sql, sql_upper=sql_upper)
         
         # 6. 检查数据库连接配置
         if not DatabaseConfig.get_connection(database):
             logger.error(f"[query_database] 数据库 {database} 未配置连接")
-            return json.dumps({
+            return dumps_json({
                 "error": f"数据库 {database} 未配置连接",
                 "hint": "请在 DatabaseConfig.CONNECTIONS 中添加数据库连接配置"
-            }, ensure_ascii=False)
+            })
         
         # 7. 记录审计日志
         logger.info(f"[query_database] 审计: reason='{reason}', business_line={business_line}, database={database}")
@@ -616,26 +933,26 @@ def query_database(
             )
             logger.info(f"[query_database] ========== 查询完成 ==========")
             
-            return json.dumps({
+            return dumps_json({
                 "business_line": business_line,
                 "database": database,
                 "sql": sql,
                 "row_count": len(results),
                 "data": results
-            }, ensure_ascii=False)
+            })
             
         except pymysql.Error as e:
             logger.error(f"[query_database] 数据库执行失败: {e}", exc_info=True)
-            return json.dumps({
+            return dumps_json({
                 "error": "数据库查询执行失败",
                 "detail": str(e),
                 "sql": sql
-            }, ensure_ascii=False)
+            })
             
     except Exception as e:
         logger.error(f"[query_database] 执行失败: {e}", exc_info=True)
         logger.error(f"[query_database] ========== 查询失败 ==========")
-        return json.dumps({"error": str(e)}, ensure_ascii=False)
+        return dumps_json({"error": str(e)})
 
 
 # ============================================================
@@ -645,6 +962,7 @@ def query_database(
 # 数据库查询工具列表
 DB_TOOLS = [
     get_table_schema,
+    get_table_schemas,
     query_database,
 ]
 
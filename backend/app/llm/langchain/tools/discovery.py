@@ -11,7 +11,7 @@
 1. **SQL 预过滤阶段**：
    - 从用户 query 提取关键词
    - 用 SQL LIKE 在 name/description 上过滤
-   - 将几百条候选缩减到 ≤50 条
+   - 按关键词命中得分排序（name 命中权重更高），保留得分最高的 ≤50 条
 
 2. **LLM 精排阶段**：
    - 将预过滤后的候选（精简字段）交给小模型
@@ -20,17 +20,16 @@
 这种设计解决了大数据量场景下小模型 token 超限的问题。
 """
 
-import json
 from typing import Optional, List
 
 from langchain_core.tools import tool
 from pydantic import BaseModel, Field
-from sqlalchemy import or_
+from sqlalchemy import case, desc, or_
 
 from backend.app.db.sqlite import SessionLocal
 from backend.app.models.resource_graph import Business, Step, Implementation, DataResource
 from backend.app.core.logger import logger
-from ._common import call_selector_llm, extract_keywords
+from ._common import call_selector_llm, dumps_json, extract_keywords
 
 
 # ============================================================
@@ -44,6 +43,38 @@ MAX_CANDIDATES_AFTER_FILTER = 50
 FALLBACK_SAMPLE_SIZE = 20
 
 
+def _keyword_filter_and_rank(q, model, keywords: List[str]):
+    """按关键词过滤并按命中得分降序排列
+    
+    任一关键词命中 name 或 description 即进入候选；得分 = name 命中数 × 2 + description 命中数，
+    保证截断到 MAX_CANDIDATES_AFTER_FILTER 时保留的是最相关的候选，而不是表中靠前的任意行。
+    """
+    conditions = []
+    score = None
+    for kw in keywords:
+        name_hit = model.name.contains(kw)
+        desc_hit = model.description.contains(kw)
+        conditions.extend((name_hit, desc_hit))
+        kw_score = case((name_hit, 2), else_=0) + case((desc_hit, 1), else_=0)
+        score = kw_score if score is None else score + kw_score
+    return q.filter(or_(*conditions)).order_by(desc(score))
+
+
+def _load_selected(db, model, id_column, selected_ids: List[str], candidates_list: List[dict]) -> dict:
+    """按 LLM 选中的 ID 回表查询完整记录，返回 {id: 实体}
+
+    预过滤阶段只投影 id/name 等少量列，详情字段（description 等）仅对选中的几条记录加载。
+    只回表候选列表中出现过的 ID：模型臆造或过期的 ID 即使存在于全表中也不返回，
+    预过滤时的条件（如 system 过滤）因此仍然生效。
+    """
+    candidate_ids = {c[id_column.key] for c in candidates_list}
+    selected_ids = [i for i in selected_ids if i in candidate_ids]
+    if not selected_ids:
+        return {}
+    rows = db.query(model).filter(id_column.in_(selected_ids)).all()
+    return {getattr(row, id_column.key): row for row in rows}
+
+
 # ============================================================
 # search_businesses
 # ============================================================
@@ -65,36 +96,34 @@ def search_businesses(query: str, limit: int = 5) -> str:
         # ========== 阶段1: SQL 预过滤 ==========
         # 从 query 提取关键词，用 LIKE 过滤，减少候选数量
         keywords = extract_keywords(query)
+        # 预过滤阶段只投影构造候选所需的列，避免加载 description 等大字段
+        candidate_columns = (Business.process_id, Business.name)
         
-        q = db.query(Business)
+        q = db.query(*candidate_columns)
         if keywords:
-            # 构造 OR 条件：任一关键词匹配 name 或 description
-            conditions = []
-            for kw in keywords:
-                conditions.append(Business.name.contains(kw))
-                conditions.append(Business.description.contains(kw))
-            q = q.filter(or_(*conditions))
+            # 任一关键词匹配 name 或 description，按命中得分排序
+            q = _keyword_filter_and_rank(q, Business, keywords)
         
         businesses = q.limit(MAX_CANDIDATES_AFTER_FILTER).all()
         
         # Fallback: 预过滤无结果时，尝试只用第一个关键词，或随机采样
         if not businesses and keywords:
-            logger.debug(f"[search_businesses] 预过滤无结果，尝试放宽条件")
-            q = db.query(Business).filter(
+            logger.debug("[search_businesses] 预过滤无结果，尝试放宽条件")
+            q = db.query(*candidate_columns).filter(
                 or_(Business.name.contains(keywords[0]), Business.description.contains(keywords[0]))
             )
             businesses = q.limit(MAX_CANDIDATES_AFTER_FILTER).all()
         
         if not businesses:
             # 仍无结果，随机采样让模型看看有什么
-            logger.debug(f"[search_businesses] 放宽条件仍无结果，随机采样")
-            businesses = db.query(Business).limit(FALLBACK_SAMPLE_SIZE).all()
+            logger.debug("[search_businesses] 放宽条件仍无结果，随机采样")
+            businesses = db.query(*candidate_columns).limit(FALLBACK_SAMPLE_SIZE).all()
         
         if not businesses:
-            return json.dumps({
+            return dumps_json({
                 "candidates": [],
                 "message": "暂无业务流程数据"
-            }, ensure_ascii=False)
+            })
         
         # ========== 阶段2: LLM 精排 ==========
         # 构造精简的候选列表（只传 id + name，减少 token）
@@ -107,11 +136,11 @@ def search_businesses(query: str, limit: int = 5) -> str:
         
         # 调用小 LLM 进行语义精排
         logger.info(f"[search_businesses] 预过滤后候选数={len(candidates_list)}, keywords={keywords}")
-        selected_ids = call_selector_llm(query, candidates_list, "process_id", limit)
+        selected_ids = call_selector_llm(query, candidates_list, "process_id", limit, db)
         logger.info(f"[search_businesses] LLM 精排选中: {selected_ids}")
         
         # 根据选中的 ID 构造结果
-        id_to_business = {b.process_id: b for b in businesses}
+        id_to_business = _load_selected(db, Business, Business.process_id, selected_ids, candidates_list)
         candidates = []
         for pid in selected_ids:
             if pid in id_to_business:
@@ -124,22 +153,22 @@ def search_businesses(query: str, limit: int = 5) -> str:
                 })
         
         if not candidates:
-            return json.dumps({
+            return dumps_json({
                 "candidates": [],
                 "message": f"在 {len(businesses)} 个业务流程中未找到与 '{query}' 相关的结果",
                 "total_count": len(businesses),
-            }, ensure_ascii=False)
+            })
         
-        return json.dumps({
+        return dumps_json({
             "query": query,
             "total_count": len(businesses),
             "matched_count": len(candidates),
             "candidates": candidates,
-        }, ensure_ascii=False)
+        })
         
     except Exception as e:
         logger.error(f"[search_businesses] 查询失败: {e}", exc_info=True)
-        return json.dumps({"error": str(e)}, ensure_ascii=False)
+        return dumps_json({"error": str(e)})
     finally:
         db.close()
 
@@ -165,25 +194,23 @@ def search_implementations(query: str, system: Optional[str] = None, limit: int
     try:
         # ========== 阶段1: SQL 预过滤 ==========
         keywords = extract_keywords(query)
+        # 预过滤阶段只投影构造候选所需的列，避免加载 description 等大字段
+        candidate_columns = (Implementation.impl_id, Implementation.name, Implementation.system)
         
-        q = db.query(Implementation)
+        q = db.query(*candidate_columns)
         if system:
             q = q.filter(Implementation.system == system)
         
         if keywords:
-            # 任一关键词匹配 name 或 description
-            conditions = []
-            for kw in keywords:
-                conditions.append(Implementation.name.contains(kw))
-                conditions.append(Implementation.description.contains(kw))
-            q = q.filter(or_(*conditions))
+            # 任一关键词匹配 name 或 description，按命中得分排序
+            q = _keyword_filter_and_rank(q, Implementation, keywords)
         
         implementations = q.limit(MAX_CANDIDATES_AFTER_FILTER).all()
         
         # Fallback: 预过滤无结果
         if not implementations and keywords:
-            logger.debug(f"[search_implementations] 预过滤无结果，尝试放宽条件")
-            q = db.query(Implementation)
+            logger.debug("[search_implementations] 预过滤无结果，尝试放宽条件")
+            q = db.query(*candidate_columns)
             if system:
                 q = q.filter(Implementation.system == system)
             q = q.filter(or_(
@@ -193,17 +220,17 @@ def search_implementations(query: str, system: Optional[str] = None, limit: int
             implementations = q.limit(MAX_CANDIDATES_AFTER_FILTER).all()
         
         if not implementations:
-            logger.debug(f"[search_implementations] 放宽条件仍无结果，随机采样")
-            q = db.query(Implementation)
+            logger.debug("[search_implementations] 放宽条件仍无结果，随机采样")
+            q = db.query(*candidate_columns)
             if system:
                 q = q.filter(Implementation.system == system)
             implementations = q.limit(FALLBACK_SAMPLE_SIZE).all()
         
         if not implementations:
-            return json.dumps({
+            return dumps_json({
                 "candidates": [],
                 "message": "暂无匹配的实现/接口数据" + (f"（系统: {system}）" if system else "")
-            }, ensure_ascii=False)
+            })
         
         # ========== 阶段2: LLM 精排 ==========
         # 精简字段：只传 id + name + system（system 有助于区分同名接口）
@@ -216,11 +243,11 @@ def search_implementations(query: str, system: Optional[str] = None, limit: int
             })
         
         logger.info(f"[search_implementations] 预过滤后候选数={len(candidates_list)}, keywords={keywords}")
-        selected_ids = call_selector_llm(query, candidates_list, "impl_id", limit)
+        selected_ids = call_selector_llm(query, candidates_list, "impl_id", limit, db)
         logger.info(f"[search_implementations] LLM 精排选中: {selected_ids}")
         
         # 根据选中的 ID 构造结果
-        id_to_impl = {impl.impl_id: impl for impl in implementations}
+        id_to_impl = _load_selected(db, Implementation, Implementation.impl_id, selected_ids, candidates_list)
         candidates = []
         for iid in selected_ids:
             if iid in id_to_impl:
@@ -234,24 +261,24 @@ def search_implementations(query: str, system: Optional[str] = None, limit: int
                 })
         
         if not candidates:
-            return json.dumps({
+            return dumps_json({
                 "candidates": [],
                 "message": f"在 {len(implementations)} 个实现/接口中未找到与 '{query}' 相关的结果",
                 "total_count": len(implementations),
                 "system_filter": system,
-            }, ensure_ascii=False)
+            })
         
-        return json.dumps({
+        return dumps_json({
             "query": query,
             "system_filter": system,
             "total_count": len(implementations),
             "matched_count": len(candidates),
             "candidates": candidates,
-        }, ensure_ascii=False)
+        })
         
     except Exception as e:
         logger.error(f"[search_implementations] 查询失败: {e}", exc_info=True)
-        return json.dumps({"error": str(e)}, ensure_ascii=False)
+        return dumps_json({"error": str(e)})
     finally:
         db.close()
 
@@ -277,24 +304,22 @@ def search_data_resources(query: str, system: Optional[str] = None, limit: int =
     try:
         # ========== 阶段1: SQL 预过滤 ==========
         keywords = extract_keywords(query)
+        # 预过滤阶段只投影构造候选所需的列，避免加载 description 等大字段
+        candidate_columns = (DataResource.resource_id, DataResource.name)
         
-        q = db.query(DataResource)
+        q = db.query(*candidate_columns)
         if system:
             q = q.filter(DataResource.system == system)
         
         if keywords:
-            conditions = []
-            for kw in keywords:
-                conditions.append(DataResource.name.contains(kw))
-                conditions.append(DataResource.description.contains(kw))
-            q = q.filter(or_(*conditions))
+            q = _keyword_filter_and_rank(q, DataResource, keywords)
         
         resources = q.limit(MAX_CANDIDATES_AFTER_FILTER).all()
         
         # Fallback: 预过滤无结果
         if not resources and keywords:
-            logger.debug(f"[search_data_resources] 预过滤无结果，尝试放宽条件")
-            q = db.query(DataResource)
+            logger.debug("[search_data_resources] 预过滤无结果，尝试放宽条件")
+            q = db.query(*candidate_columns)
             if system:
                 q = q.filter(DataResource.system == system)
             q = q.filter(or_(
@@ -304,17 +329,17 @@ def search_data_resources(query: str, system: Optional[str] = None, limit: int =
             resources = q.limit(MAX_CANDIDATES_AFTER_FILTER).all()
         
         if not resources:
-            logger.debug(f"[search_data_resources] 放宽条件仍无结果，随机采样")
-            q = db.query(DataResource)
+            logger.debug("[search_data_resources] 放宽条件仍无结果，随机采样")
+            q = db.query(*candidate_columns)
             if system:
                 q = q.filter(DataResource.system == system)
             resources = q.limit(FALLBACK_SAMPLE_SIZE).all()
         
         if not resources:
-            return json.dumps({
+            return dumps_json({
                 "candidates": [],
                 "message": "暂无匹配的数据资源" + (f"（系统: {system}）" if system else "")
-            }, ensure_ascii=False)
+            })
         
         # ========== 阶段2: LLM 精排 ==========
         # 精简字段：只传 id + name
@@ -326,11 +351,11 @@ def search_data_resources(query: str, system: Optional[str] = None, limit: int =
             })
         
         logger.info(f"[search_data_resources] 预过滤后候选数={len(candidates_list)}, keywords={keywords}")
-        selected_ids = call_selector_llm(query, candidates_list, "resource_id", limit)
+        selected_ids = call_selector_llm(query, candidates_list, "resource_id", limit, db)
         logger.info(f"[search_data_resources] LLM 精排选中: {selected_ids}")
         
         # 根据选中的 ID 构造结果
-        id_to_resource = {res.resource_id: res for res in resources}
+        id_to_resource = _load_selected(db, DataResource, DataResource.resource_id, selected_ids, candidates_list)
         candidates = []
         for rid in selected_ids:
             if rid in id_to_resource:
@@ -344,24 +369,24 @@ def search_data_resources(query: str, system: Optional[str] = None, limit: int =
                 })
         
         if not candidates:
-            return json.dumps({
+            return dumps_json({
                 "candidates": [],
                 "message": f"在 {len(resources)} 个数据资源中未找到与 '{query}' 相关的结果",
                 "total_count": len(resources),
                 "system_filter": system,
-            }, ensure_ascii=False)
+            })
         
-        return json.dumps({
+        return dumps_json({
             "query": query,
             "system_filter": system,
             "total_count": len(resources),
             "matched_count": len(candidates),
             "candidates": candidates,
-        }, ensure_ascii=False)
+        })
         
     except Exception as e:
         logger.error(f"[search_data_resources] 查询失败: {e}", exc_info=True)
-        return json.dumps({"error": str(e)}, ensure_ascii=False)
+        return dumps_json({"error": str(e)})
     finally:
         db.close()
 
@@ -386,35 +411,33 @@ def search_steps(query: str, limit: int = 5) -> str:
     try:
         # ========== 阶段1: SQL 预过滤 ==========
         keywords = extract_keywords(query)
+        # 预过滤阶段只投影构造候选所需的列，避免加载 description 等大字段
+        candidate_columns = (Step.step_id, Step.name)
         
-        q = db.query(Step)
+        q = db.query(*candidate_columns)
         if keywords:
-            conditions = []
-            for kw in keywords:
-                conditions.append(Step.name.contains(kw))
-                conditions.append(Step.description.contains(kw))
-            q = q.filter(or_(*conditions))
+            q = _keyword_filter_and_rank(q, Step, keywords)
         
         steps = q.limit(MAX_CANDIDATES_AFTER_FILTER).all()
         
         # Fallback: 预过滤无结果
         if not steps and keywords:
-            logger.debug(f"[search_steps] 预过滤无结果，尝试放宽条件")
-            q = db.query(Step).filter(or_(
+            logger.debug("[search_steps] 预过滤无结果，尝试放宽条件")
+            q = db.query(*candidate_columns).filter(or_(
                 Step.name.contains(keywords[0]),
                 Step.description.contains(keywords[0])
             ))
             steps = q.limit(MAX_CANDIDATES_AFTER_FILTER).all()
         
         if not steps:
-            logger.debug(f"[search_steps] 放宽条件仍无结果，随机采样")
-            steps = db.query(Step).limit(FALLBACK_SAMPLE_SIZE).all()
+            logger.debug("[search_steps] 放宽条件仍无结果，随机采样")
+            steps = db.query(*candidate_columns).limit(FALLBACK_SAMPLE_SIZE).all()
         
         if not steps:
-            return json.dumps({
+            return dumps_json({
                 "candidates": [],
                 "message": "暂无步骤数据"
-            }, ensure_ascii=False)
+            })
         
         # ========== 阶段2: LLM 精排 ==========
         # 精简字段：只传 id + name
@@ -426,11 +449,11 @@ def search_steps(query: str, limit: int = 5) -> str:
             })
         
         logger.info(f"[search_steps] 预过滤后候选数={len(candidates_list)}, keywords={keywords}")
-        selected_ids = call_selector_llm(query, candidates_list, "step_id", limit)
+        selected_ids = call_selector_llm(query, candidates_list, "step_id", limit, db)
         logger.info(f"[search_steps] LLM 精排选中: {selected_ids}")
         
         # 根据选中的 ID 构造结果
-        id_to_step = {s.step_id: s for s in steps}
+        id_to_step = _load_selected(db, Step, Step.step_id, selected_ids, candidates_list)
         candidates = []
         for sid in selected_ids:
             if sid in id_to_step:
@@ -443,21 +466,21 @@ def search_steps(query: str, limit: int = 5) -> str:
                 })
         
         if not candidates:
-            return json.dumps({
+            return dumps_json({
                 "candidates": [],
                 "message": f"在 {len(steps)} 个步骤中未找到与 '{query}' 相关的结果",
                 "total_count": len(steps),
-            }, ensure_ascii=False)
+            })
         
-        return json.dumps({
+        return dumps_json({
             "query": query,
             "total_count": len(steps),
             "matched_count": len(candidates),
             "candidates": candidates,
-        }, ensure_ascii=False)
+        })
         
     except Exception as e:
         logger.error(f"[search_steps] 查询失败: {e}", exc_info=True)
-        return json.dumps({"error": str(e)}, ensure_ascii=False)
+        return dumps_json({"error": str(e)})
     finally:
         db.close()
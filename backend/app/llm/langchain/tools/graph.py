@@ -5,14 +5,14 @@
 - get_path_between_entities: 查找两个实体之间的路径
 """
 
-import json
-from typing import List
+from typing import Any, Dict, List
 
 from langchain_core.tools import tool
 from pydantic import BaseModel, Field
 
+from backend.app.db.neo4j_client import get_shared_neo4j_driver, DEFAULT_NEO4J_DATABASE
 from backend.app.services.graph_service import get_neighborhood
-from backend.app.core.logger import logger
+from ._common import safe_tool_json
 
 
 # ============================================================
@@ -23,36 +23,51 @@ class GetNeighborsInput(BaseModel):
     """get_neighbors 工具输入参数"""
     node_ids: List[str] = Field(..., description="节点 ID 列表（可以是 process_id / impl_id / resource_id），支持批量查询")
     depth: int = Field(default=1, description="遍历深度，默认 1", ge=1, le=3)
+    limit: int = Field(default=200, description="最多返回的节点数，默认 200", ge=1, le=1000)
 
 
 @tool(args_schema=GetNeighborsInput)
-def get_neighbors(node_ids: List[str], depth: int = 1) -> str:
+@safe_tool_json("get_neighbors")
+def get_neighbors(node_ids: List[str], depth: int = 1, limit: int = 200) -> Dict[str, Any]:
     """获取指定节点的邻居节点（支持批量查询）。
     返回与这些节点直接或间接相连的节点列表。
     用于探索图结构、发现关联实体。
     """
-    try:
-        # get_neighborhood 期望 start_nodes 为 [{"type": "xxx", "id": "yyy"}, ...] 格式
-        # 由于无法确定 node_id 的具体类型，尝试所有可能的类型
-        start_nodes = []
-        for node_id in node_ids:
-            start_nodes.extend([
-                {"type": "business", "id": node_id},
-                {"type": "implementation", "id": node_id},
-                {"type": "resource", "id": node_id},
-            ])
-        
-        result = get_neighborhood(start_nodes, depth)
-        if not result:
-            return json.dumps({
-                "node_ids": node_ids,
-                "neighbors": [],
-                "message": f"未找到节点或这些节点没有邻居"
-            }, ensure_ascii=False)
-        return json.dumps(result, ensure_ascii=False, default=str)
-    except Exception as e:
-        logger.error(f"[get_neighbors] 查询失败: {e}", exc_info=True)
-        return json.dumps({"error": str(e)}, ensure_ascii=False)
+    # get_neighborhood 期望 start_nodes 为 [{"type": "xxx", "id": "yyy"}, ...] 格式
+    # 由于无法确定 node_id 的具体类型，尝试所有可能的类型：
+    # 起点按标签分支走索引查找，未命中的类型只是空查找，不会产生额外遍历，
+    # 因此无需额外一次往返去探测标签；这里只对 ID 去重、剔除空值
+    start_nodes = []
+    for node_id in dict.fromkeys(i for i in node_ids if i):
+        start_nodes.extend([
+            {"type": "business", "id": node_id},
+            {"type": "implementation", "id": node_id},
+            {"type": "resource", "id": node_id},
+        ])
+    
+    result = get_neighborhood(start_nodes, depth)
+    if not result:
+        return {
+            "node_ids": node_ids,
+            "neighbors": [],
+            "message": f"未找到节点或这些节点没有邻居"
+        }
+
+    # depth=3 时邻域可能非常大，只保留前 limit 个节点及它们之间的关系
+    nodes = result["nodes"]
+    if len(nodes) > limit:
+        kept = nodes[:limit]
+        kept_ids = {n["id"] for n in kept}
+        result = {
+            "nodes": kept,
+            "relationships": [
+                r for r in result["relationships"]
+                if r["start_id"] in kept_ids and r["end_id"] in kept_ids
+            ],
+            "total_nodes": len(nodes),
+            "truncated": True,
+        }
+    return result
 
 
 # ============================================================
@@ -66,45 +81,72 @@ class GetPathInput(BaseModel):
     max_depth: int = Field(default=5, description="最大路径长度", ge=1, le=10)
 
 
+# 各类节点的业务 ID 属性（节点上没有通用的 id 属性）
+_ENTITY_ID_PROPS = (
+    ("Business", "process_id"),
+    ("Step", "step_id"),
+    ("Implementation", "impl_id"),
+    ("DataResource", "resource_id"),
+)
+
+def _node_id_expr(node: str) -> str:
+    return f"coalesce({node}.process_id, {node}.step_id, {node}.impl_id, {node}.resource_id)"
+
+
+def _entity_lookup_clause(param: str, alias: str, carry: str = "") -> str:
+    """按业务 ID 定位节点（每个分支走对应标签的 ID 索引）"""
+    branches = "\n        UNION\n".join(
+        f"        MATCH (n:{label} {{{prop}: ${param}}}) RETURN n"
+        for label, prop in _ENTITY_ID_PROPS
+    )
+    return f"CALL {{\n{branches}\n    }}\n    WITH {carry}n AS {alias} LIMIT 1"
+
+
+def _build_path_query(max_depth: int) -> str:
+    # 变长关系的上界不支持参数化，只能写入查询文本
+    return f"""
+    {_entity_lookup_clause("source_id", "source")}
+    {_entity_lookup_clause("target_id", "target", carry="source, ")}
+    MATCH path = shortestPath((source)-[*1..{max_depth}]-(target))
+    RETURN [n in nodes(path) | {{id: {_node_id_expr("n")}, name: n.name, labels: labels(n)}}] as nodes,
+           [r in relationships(path) | {{type: type(r), start: {_node_id_expr("startNode(r)")}, end: {_node_id_expr("endNode(r)")}}}] as relationships
+    """
+
+
+# max_depth 取值范围固定（1~10），启动时预先生成全部查询文本，查询文本稳定也便于 Neo4j 复用执行计划
+PATH_MAX_DEPTH = 10
+_PATH_QUERIES = {depth: _build_path_query(depth) for depth in range(1, PATH_MAX_DEPTH + 1)}
+
+
 @tool(args_schema=GetPathInput)
-def get_path_between_entities(source_id: str, target_id: str, max_depth: int = 5) -> str:
+@safe_tool_json("get_path_between_entities")
+def get_path_between_entities(source_id: str, target_id: str, max_depth: int = 5) -> Dict[str, Any]:
     """查找两个实体之间的路径。
     返回从起点到终点的最短路径及经过的节点和关系。
     用于分析实体间的依赖链路和数据流向。
     """
-    from backend.app.db.neo4j_client import get_neo4j_driver
-    
-    try:
-        driver = get_neo4j_driver()
-        with driver.session() as session:
-            # 使用 shortestPath 查找最短路径
-            result = session.run("""
-                MATCH path = shortestPath(
-                    (source {id: $source_id})-[*1..$max_depth]-(target {id: $target_id})
-                )
-                RETURN path,
-                       [n in nodes(path) | {id: n.id, name: n.name, labels: labels(n)}] as nodes,
-                       [r in relationships(path) | {type: type(r), start: startNode(r).id, end: endNode(r).id}] as relationships
-            """, source_id=source_id, target_id=target_id, max_depth=max_depth)
-            
-            record = result.single()
-            if not record:
-                return json.dumps({
-                    "source_id": source_id,
-                    "target_id": target_id,
-                    "path_found": False,
-                    "message": f"在深度 {max_depth} 内未找到从 {source_id} 到 {target_id} 的路径"
-                }, ensure_ascii=False)
-            
-            return json.dumps({
+    max_depth = min(max(int(max_depth), 1), PATH_MAX_DEPTH)
+    # 复用进程内共享驱动的连接池，每次调用只打开一个轻量 session
+    with get_shared_neo4j_driver().session(database=DEFAULT_NEO4J_DATABASE) as session:
+        # 使用 shortestPath 查找最短路径
+        result = session.run(
+            _PATH_QUERIES[max_depth], source_id=source_id, target_id=target_id
+        )
+        
+        record = result.single()
+        if not record:
+            return {
                 "source_id": source_id,
                 "target_id": target_id,
-                "path_found": True,
-                "path_length": len(record["nodes"]) - 1,
-                "nodes": record["nodes"],
-                "relationships": record["relationships"],
-            }, ensure_ascii=False)
-            
-    except Exception as e:
-        logger.error(f"[get_path_between_entities] 查询失败: {e}", exc_info=True)
-        return json.dumps({"error": str(e)}, ensure_ascii=False)
+                "path_found": False,
+                "message": f"在深度 {max_depth} 内未找到从 {source_id} 到 {target_id} 的路径"
+            }
+        
+        return {
+            "source_id": source_id,
+            "target_id": target_id,
+            "path_found": True,
+            "path_length": len(record["nodes"]) - 1,
+            "nodes": record["nodes"],
+            "relationships": record["relationships"],
+        }
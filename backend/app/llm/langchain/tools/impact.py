@@ -5,17 +5,17 @@
 - get_resource_business_usages: 查询数据资源被哪些业务使用
 """
 
-import json
-from typing import List
+from typing import Any, Dict, List
 
 from langchain_core.tools import tool
 from pydantic import BaseModel, Field
 
 from backend.app.services.graph_service import (
-    get_implementation_context as _get_implementation_context,
-    get_resource_usages as _get_resource_usages,
+    get_implementation_contexts as _get_implementation_contexts,
+    get_resource_usages_bulk as _get_resource_usages_bulk,
 )
-from backend.app.core.logger import logger
+from backend.app.models.resource_graph import Implementation, DataResource
+from ._common import filter_known_ids, safe_tool_json
 
 
 # ============================================================
@@ -28,55 +28,62 @@ class GetImplementationBusinessUsagesInput(BaseModel):
 
 
 @tool(args_schema=GetImplementationBusinessUsagesInput)
-def get_implementation_business_usages(impl_ids: List[str]) -> str:
+@safe_tool_json("get_implementation_business_usages")
+def get_implementation_business_usages(impl_ids: List[str]) -> Dict[str, Any]:
     """查询指定实现/接口在各业务流程中的使用情况（支持批量查询）。
     返回每个实现被哪些业务流程、哪些步骤使用的汇总信息。
     """
-    try:
-        results = []
-        errors = []
-        
-        for impl_id in impl_ids:
-            context = _get_implementation_context(impl_id)
-            if not context:
-                errors.append(f"未找到 impl_id={impl_id}")
+    results = []
+    errors = []
+    
+    # 一次批量查询取回全部实现上下文，避免逐个 ID 访问 Neo4j
+    # 先在本地剔除不存在的 ID（如模型臆造的 ID），这些 ID 不再发往 Neo4j
+    known_ids = filter_known_ids(Implementation.impl_id, impl_ids)
+    context_map = _get_implementation_contexts([i for i in impl_ids if i in known_ids])
+    for impl_id in impl_ids:
+        context = context_map.get(impl_id)
+        if not context:
+            errors.append(f"未找到 impl_id={impl_id}")
+            continue
+
+        process_usages = context.get("process_usages", []) or []
+        process_map = {}
+
+        for usage in process_usages:
+            process = usage.get("process") or {}
+            step = usage.get("step") or {}
+            process_id = process.get("process_id")
+            if not process_id:
                 continue
 
-            process_usages = context.get("process_usages", []) or []
-            process_map = {}
-
-            for usage in process_usages:
-                process = usage.get("process") or {}
-                step = usage.get("step") or {}
-                process_id = process.get("process_id")
-                if not process_id:
-                    continue
-
-                entry = process_map.setdefault(process_id, {
+            # steps 先以 {step_id: step} 去重（O(1) 判重，保留首次出现顺序），输出前再转为列表；
+            # 仅在首次遇到该流程时才构造 entry，避免 setdefault 每次都分配默认字典
+            entry = process_map.get(process_id)
+            if entry is None:
+                entry = process_map[process_id] = {
                     "process": process,
-                    "steps": [],
-                })
+                    "steps": {},
+                }
 
-                step_id = step.get("step_id")
-                if step_id and all(s.get("step_id") != step_id for s in entry["steps"]):
-                    entry["steps"].append(step)
+            step_id = step.get("step_id")
+            if step_id:
+                entry["steps"].setdefault(step_id, step)
 
-            results.append({
-                "impl_id": impl_id,
-                "implementation": context.get("implementation"),
-                "business_usages": list(process_map.values()),
-                "total_businesses": len(process_map),
-            })
+        for entry in process_map.values():
+            entry["steps"] = list(entry["steps"].values())
 
-        return json.dumps({
-            "results": results,
-            "total": len(results),
-            "errors": errors if errors else None
-        }, ensure_ascii=False, default=str)
+        results.append({
+            "impl_id": impl_id,
+            "implementation": context.get("implementation"),
+            "business_usages": list(process_map.values()),
+            "total_businesses": len(process_map),
+        })
 
-    except Exception as e:
-        logger.error(f"[get_implementation_business_usages] 查询失败: {e}", exc_info=True)
-        return json.dumps({"error": str(e)}, ensure_ascii=False)
+    return {
+        "results": results,
+        "total": len(results),
+        "errors": errors if errors else None
+    }
 
 
 # ============================================================
@@ -86,63 +93,75 @@ def get_implementation_business_usages(impl_ids: List[str]) -> str:
 class GetResourceBusinessUsagesInput(BaseModel):
     """get_resource_business_usages 工具输入参数"""
     resource_ids: List[str] = Field(..., description="数据资源的唯一标识列表，支持批量查询多个 resource_id")
+    limit: int = Field(default=200, description="每个数据资源最多返回的业务流程数，默认 200", ge=1, le=1000)
 
 
 @tool(args_schema=GetResourceBusinessUsagesInput)
-def get_resource_business_usages(resource_ids: List[str]) -> str:
+@safe_tool_json("get_resource_business_usages")
+def get_resource_business_usages(resource_ids: List[str], limit: int = 200) -> Dict[str, Any]:
     """查询指定数据资源在各业务流程中的使用情况（支持批量查询）。
     返回每个数据资源被哪些业务流程、哪些步骤和实现使用的汇总信息。
     """
-    try:
-        results = []
-        errors = []
-        
-        for resource_id in resource_ids:
-            data = _get_resource_usages(resource_id)
-            if not data:
-                errors.append(f"未找到 resource_id={resource_id}")
+    results = []
+    errors = []
+    
+    # 一次批量查询取回全部资源使用情况，避免逐个 ID 访问 Neo4j
+    # 先在本地剔除不存在的 ID（如模型臆造的 ID），这些 ID 不再发往 Neo4j
+    known_ids = filter_known_ids(DataResource.resource_id, resource_ids)
+    usages_map = _get_resource_usages_bulk([i for i in resource_ids if i in known_ids])
+    for resource_id in resource_ids:
+        data = usages_map.get(resource_id)
+        if not data:
+            errors.append(f"未找到 resource_id={resource_id}")
+            continue
+
+        usages = data.get("usages", []) or []
+        process_map = {}
+
+        for usage in usages:
+            process = usage.get("process") or {}
+            step = usage.get("step") or {}
+            implementation = usage.get("implementation") or {}
+            access = usage.get("access") or {}
+
+            process_id = process.get("process_id") or access.get("process_id")
+            if not process_id:
                 continue
 
-            usages = data.get("usages", []) or []
-            process_map = {}
-
-            for usage in usages:
-                process = usage.get("process") or {}
-                step = usage.get("step") or {}
-                implementation = usage.get("implementation") or {}
-                access = usage.get("access") or {}
-
-                process_id = process.get("process_id") or access.get("process_id")
-                if not process_id:
-                    continue
-
-                entry = process_map.setdefault(process_id, {
+            # steps / implementations 先以 ID 为键去重（O(1) 判重，保留首次出现顺序），输出前再转为列表；
+            # 仅在首次遇到该流程时才构造 entry
+            entry = process_map.get(process_id)
+            if entry is None:
+                entry = process_map[process_id] = {
                     "process": process,
-                    "steps": [],
-                    "implementations": [],
-                })
-
-                step_id = step.get("step_id")
-                if step_id and all(s.get("step_id") != step_id for s in entry["steps"]):
-                    entry["steps"].append(step)
-
-                impl_id = implementation.get("impl_id")
-                if impl_id and all(i.get("impl_id") != impl_id for i in entry["implementations"]):
-                    entry["implementations"].append(implementation)
-
-            results.append({
-                "resource_id": resource_id,
-                "resource": data.get("resource"),
-                "business_usages": list(process_map.values()),
-                "total_businesses": len(process_map),
-            })
-
-        return json.dumps({
-            "results": results,
-            "total": len(results),
-            "errors": errors if errors else None
-        }, ensure_ascii=False, default=str)
-
-    except Exception as e:
-        logger.error(f"[get_resource_business_usages] 查询失败: {e}", exc_info=True)
-        return json.dumps({"error": str(e)}, ensure_ascii=False)
+                    "steps": {},
+                    "implementations": {},
+                }
+
+            step_id = step.get("step_id")
+            if step_id:
+                entry["steps"].setdefault(step_id, step)
+
+            impl_id = implementation.get("impl_id")
+            if impl_id:
+                entry["implementations"].setdefault(impl_id, implementation)
+
+        # 热点表可能被上千条流程引用，只输出前 limit 个流程，避免超大结果整体序列化
+        business_usages = list(process_map.values())[:limit]
+        for entry in business_usages:
+            entry["steps"] = list(entry["steps"].values())
+            entry["implementations"] = list(entry["implementations"].values())
+
+        results.append({
+            "resource_id": resource_id,
+            "resource": data.get("resource"),
+            "business_usages": business_usages,
+            "total_businesses": len(process_map),
+            "truncated": len(process_map) > limit,
+        })
+
+    return {
+        "results": results,
+        "total": len(results),
+        "errors": errors if errors else None
+    }
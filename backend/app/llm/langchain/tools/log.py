@@ -5,7 +5,6 @@
 - LogQueryConfig: 日志查询配置
 """
 
-import json
 from datetime import datetime, timedelta
 from enum import Enum
 from typing import Optional, List, Annotated
@@ -16,6 +15,7 @@ from langchain_core.runnables import RunnableConfig
 from pydantic import BaseModel, Field
 
 from backend.app.core.logger import logger
+from ._common import dumps_json
 
 
 # ============================================================
@@ -127,7 +127,7 @@ def search_logs(
     #    这些参数不由 AI 决定，而是通过 LangChain 的 config 机制从前端传递
     #    数据流：前端选择 → WebSocket → agent_context → config["metadata"] → 工具参数
     if not config:
-        return json.dumps({"success": False, "error": "系统错误：缺少运行时配置"}, ensure_ascii=False)
+        return dumps_json({"success": False, "error": "系统错误：缺少运行时配置"})
     
     try:
         metadata = config.get("metadata", {}) or {}
@@ -136,9 +136,9 @@ def search_logs(
         private_server = log_query.get("privateServer")
         
         if not business_line:
-            return json.dumps({"success": False, "error": "请在界面左上角选择业务线配置"}, ensure_ascii=False)
+            return dumps_json({"success": False, "error": "请在界面左上角选择业务线配置"})
     except Exception as e:
-        return json.dumps({"success": False, "error": f"获取业务线配置失败: {e}"}, ensure_ascii=False)
+        return dumps_json({"success": False, "error": f"获取业务线配置失败: {e}"})
     
     logger.info(f"[search_logs] 开始查询: keyword={keyword}, server={server_name.value}, "
                 f"time={start_time}~{end_time}, business_line={business_line}")
@@ -149,14 +149,14 @@ def search_logs(
         end_dt = datetime.strptime(end_time, "%Y-%m-%d %H:%M:%S")
         is_valid, error_msg = LogQueryConfig.validate_time_range(start_dt, end_dt)
         if not is_valid:
-            return json.dumps({"success": False, "error": error_msg}, ensure_ascii=False)
+            return dumps_json({"success": False, "error": error_msg})
     except ValueError as e:
-        return json.dumps({"success": False, "error": f"时间格式错误: {e}"}, ensure_ascii=False)
+        return dumps_json({"success": False, "error": f"时间格式错误: {e}"})
     
     # 3. 验证业务线
     if not LogQueryConfig.validate_business_line(business_line):
         allowed = LogQueryConfig.get_allowed_business_lines()
-        return json.dumps({"success": False, "error": f"业务线 '{business_line}' 不在允许列表中: {allowed}"}, ensure_ascii=False)
+        return dumps_json({"success": False, "error": f"业务线 '{business_line}' 不在允许列表中: {allowed}"})
     
     # 4. 构建请求
     request_payload = {
@@ -184,7 +184,7 @@ def search_logs(
             response_data = response.json()
         
         if response_data.get("code") != 200:
-            return json.dumps({"success": False, "error": response_data.get("message", "未知错误")}, ensure_ascii=False)
+            return dumps_json({"success": False, "error": response_data.get("message", "未知错误")})
         
         # API 不支持分页，客户端自行分页
         data = response_data.get("data", {})
@@ -216,12 +216,12 @@ def search_logs(
         return result_text
         
     except httpx.TimeoutException:
-        return json.dumps({"success": False, "error": f"请求超时（{LogQueryConfig.REQUEST_TIMEOUT}秒）"}, ensure_ascii=False)
+        return dumps_json({"success": False, "error": f"请求超时（{LogQueryConfig.REQUEST_TIMEOUT}秒）"})
     except httpx.HTTPStatusError as e:
-        return json.dumps({"success": False, "error": f"HTTP 错误: {e.response.status_code}"}, ensure_ascii=False)
+        return dumps_json({"success": False, "error": f"HTTP 错误: {e.response.status_code}"})
     except Exception as e:
         logger.error(f"[search_logs] 查询异常: {e}", exc_info=True)
-        return json.dumps({"success": False, "error": str(e)}, ensure_ascii=False)
+        return dumps_json({"success": False, "error": str(e)})
 
 
 if __name__ == "__main__":
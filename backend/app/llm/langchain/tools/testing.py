@@ -6,7 +6,6 @@
 - Coding 查询工具（get_coding_issue_detail）
 """
 
-import json
 import uuid
 from typing import List, Optional
 from datetime import datetime, timezone
@@ -14,6 +13,7 @@ from datetime import datetime, timezone
 from langchain_core.tools import tool
 
 from backend.app.core.logger import logger
+from ._common import dumps_json
 
 
 # ============================================================
@@ -417,12 +417,12 @@ def get_coding_issue_detail(project_name: str, issue_code: int) -> str:
             
             logger.info(f"[Testing] 获取结构化需求: {project_name}#{issue_code} - {issue.name}, "
                        f"图片={result['total_images']}, 文本块={result['total_text_blocks']}")
-            return json.dumps(result, ensure_ascii=False)
+            return dumps_json(result)
         finally:
             loop.close()
     except Exception as e:
         logger.error(f"[Testing] 获取结构化需求失败: {e}")
-        return json.dumps({"error": str(e)}, ensure_ascii=False)
+        return dumps_json({"error": str(e)})
 
 
 # ============================================================
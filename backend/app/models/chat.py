@@ -1,7 +1,7 @@
 """Chat 模块数据模型
 
 合并了 Conversation 和 FileUpload 两个与 Chat 相关的模型。
-新增测试助手相关模型：TestSessionAnalysis。
+新增测试助手相关模型：TestSessionAnalysis、TestPhasePlanCache。
 """
 
 from datetime import datetime, timezone
@@ -88,6 +88,26 @@ class TestSessionTask(Base):
     )
 
 
+class TestPhasePlanCache(Base):
+    """测试阶段工具调用计划缓存表
+    
+    记录阶段成功完成时的工具调用顺序，同项目后续任务执行该阶段时作为「参考计划」
+    注入 System Prompt，减少 LLM 重新规划的 Token 和耗时。
+    """
+    __tablename__ = "test_phase_plan_cache"
+    
+    id = Column(String, primary_key=True, comment="UUID")
+    phase = Column(String, nullable=False, comment="阶段: analysis / plan / generate")
+    plan_key = Column(String, nullable=False, comment="计划分组键（项目名称）")
+    tool_sequence = Column(Text, nullable=False, comment="JSON 数组，按顺序记录的工具名称")
+    created_at = Column(DateTime(timezone=True), default=utc_now)
+    updated_at = Column(DateTime(timezone=True), default=utc_now, onupdate=utc_now)
+    
+    __table_args__ = (
+        Index('idx_test_phase_plan_cache_phase_key', 'phase', 'plan_key', unique=True),
+    )
+
+
 class FileUpload(Base):
     """文件上传记录表"""
     __tablename__ = "file_uploads"
@@ -1,3 +1,4 @@
+from threading import Lock
 from typing import List, Optional
 
 from sqlalchemy.orm import Session
@@ -13,6 +14,19 @@ from backend.app.llm.config import LLMConfig
 class AIModelService:
     """LLM 模型配置管理服务。"""
 
+    # 小任务模型配置缓存：工具内部高频读取，模型配置写操作时统一失效
+    _task_config_cache: Optional[LLMConfig] = None
+    _task_config_epoch: int = 0
+    _task_config_lock: Lock = Lock()
+
+    @classmethod
+    def invalidate_config_cache(cls) -> None:
+        """清除模型配置缓存（任何模型配置写操作后调用）。"""
+
+        with cls._task_config_lock:
+            cls._task_config_cache = None
+            cls._task_config_epoch += 1
+
     @staticmethod
     def list_models(db: Session) -> List[AIModel]:
         return db.query(AIModel).order_by(AIModel.id).all()
@@ -38,6 +52,7 @@ class AIModelService:
         )
         db.add(obj)
         db.commit()
+        AIModelService.invalidate_config_cache()
         db.refresh(obj)
         return obj
 
@@ -71,6 +86,7 @@ class AIModelService:
                 setattr(obj, field, value)
 
         db.commit()
+        AIModelService.invalidate_config_cache()
         db.refresh(obj)
         return obj
 
@@ -91,6 +107,7 @@ class AIModelService:
 
         db.delete(obj)
         db.commit()
+        AIModelService.invalidate_config_cache()
         return True
 
     @staticmethod
@@ -108,6 +125,7 @@ class AIModelService:
 
         obj.is_active = True
         db.commit()
+        AIModelService.invalidate_config_cache()
         db.refresh(obj)
         return obj
 
@@ -152,6 +170,7 @@ class AIModelService:
 
         obj.is_task_active = True
         db.commit()
+        AIModelService.invalidate_config_cache()
         db.refresh(obj)
         return obj
 
@@ -161,6 +180,34 @@ class AIModelService:
 
         return db.query(AIModel).filter(AIModel.is_task_active.is_(True)).first()
 
+    @classmethod
+    def get_cached_task_llm_config(cls, db: Optional[Session] = None) -> LLMConfig:
+        """获取小任务模型配置（进程内缓存，写操作后失效）。
+
+        未传入 db 时仅在缓存未命中时才临时创建会话，命中缓存不产生任何数据库访问。
+        """
+
+        cached = cls._task_config_cache
+        if cached is not None:
+            return cached
+
+        epoch = cls._task_config_epoch
+        if db is None:
+            from backend.app.db.sqlite import SessionLocal
+
+            session = SessionLocal()
+            try:
+                config = cls.get_task_llm_config(session)
+            finally:
+                session.close()
+        else:
+            config = cls.get_task_llm_config(db)
+        with cls._task_config_lock:
+            # 读取期间发生过失效则不回填，避免缓存旧配置
+            if epoch == cls._task_config_epoch:
+                cls._task_config_cache = config
+        return config
+
     @staticmethod
     def get_task_llm_config(db: Session) -> LLMConfig:
         """获取小任务模型配置。
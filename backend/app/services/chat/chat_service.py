@@ -685,6 +685,17 @@ async def streaming_chat(
                 log_prefix="[Chat]",
             )
         
+        # 测试助手：阶段成功完成（已保存摘要）时记录工具调用顺序，供同项目后续任务复用
+        if agent_type == "intelligent_testing" and agent_context:
+            tool_names = [info["name"] for info in tool_calls_info]
+            if "save_phase_summary" in tool_names:
+                from backend.app.services.intelligent_testing_service import phase_plan_key, save_phase_plan
+                await save_phase_plan(
+                    phase=agent_context.get("phase", "analysis"),
+                    plan_key=phase_plan_key(agent_context.get("project_name", "")),
+                    tool_names=tool_names,
+                )
+        
         # 发送最终结果消息
         await websocket.send_text(json.dumps({
             "type": "result",
@@ -960,13 +971,19 @@ async def streaming_regenerate(
             temp_checkpoint = await checkpointer.aget(temp_config)
             if temp_checkpoint and "channel_values" in temp_checkpoint:
                 temp_messages = temp_checkpoint["channel_values"].get("messages", [])
-                # 提取新生成的 AI 回复（跳过历史和用户消息）
-                new_ai_messages = temp_messages[len(history_messages) + 1:]  # +1 跳过用户消息
+                # 只提取本次新生成的增量消息（跳过回放的历史和用户消息）
+                new_ai_messages = temp_messages[len(inputs["messages"]):]
                 
                 # 6. 更新原会话的检查点
                 success = await replace_assistant_response(thread_id, user_msg_index, new_ai_messages)
                 if not success:
                     logger.warning(f"[Regenerate] 更新检查点失败")
+            
+            # 临时会话包含完整回放的历史，增量已合并回原会话后即可删除，避免检查点库膨胀
+            try:
+                await checkpointer.adelete_thread(temp_thread_id)
+            except Exception as e:
+                logger.warning(f"[Regenerate] 清理临时会话失败: {temp_thread_id}, {e}")
         
         # 7. 发送最终结果
         await websocket.send_text(json.dumps({
@@ -1,8 +1,12 @@
-from typing import Any, Dict, List, Optional, Sequence
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 from neo4j.exceptions import ServiceUnavailable, AuthError, ClientError
 
-from backend.app.db.neo4j_client import get_neo4j_driver, DEFAULT_NEO4J_DATABASE
+from backend.app.db.neo4j_client import get_neo4j_driver, get_shared_neo4j_driver, DEFAULT_NEO4J_DATABASE
 from backend.app.core.logger import logger
 
 
@@ -63,6 +67,298 @@ def _data_resource_from_node(node) -> Dict[str, Any]:
     }
 
 
+def _build_business_context(session, process_id: str, b_node) -> Dict[str, Any]:
+    """在已打开的会话中，基于已查到的业务流程节点组装上下文"""
+    process = _business_from_node(b_node)
+
+    edge_records = session.run(
+        """
+        MATCH (from:Step)-[e:NEXT {process_id: $pid}]->(to:Step)
+        RETURN from.step_id AS from_id,
+               to.step_id AS to_id,
+               e.edge_type AS edge_type,
+               e.condition AS condition,
+               e.label AS label
+        """,
+        pid=process_id,
+    )
+    edges: List[Dict[str, Any]] = [r.data() for r in edge_records]
+
+    step_ids = set()
+    for e in edges:
+        step_ids.add(e["from_id"])
+        step_ids.add(e["to_id"])
+
+    exec_step_records = session.run(
+        """
+        MATCH (s:Step)-[:EXECUTED_BY {process_id: $pid}]->(:Implementation)
+        RETURN DISTINCT s.step_id AS step_id
+        """,
+        pid=process_id,
+    )
+    for r in exec_step_records:
+        step_ids.add(r["step_id"])
+
+    step_by_id: Dict[str, Dict[str, Any]] = {}
+    if step_ids:
+        step_result = session.run(
+            """
+            MATCH (s:Step)
+            WHERE s.step_id IN $step_ids
+            RETURN s
+            """,
+            step_ids=list(step_ids),
+        )
+        for r in step_result:
+            s_node = r["s"]
+            sid = s_node.get("step_id")
+            if sid is None:
+                continue
+            step_by_id[sid] = _step_from_node(s_node)
+
+    indegree: Dict[str, int] = {sid: 0 for sid in step_ids}
+    adj: Dict[str, List[str]] = {sid: [] for sid in step_ids}
+    for e in edges:
+        from_id = e["from_id"]
+        to_id = e["to_id"]
+        if from_id in adj and to_id in adj:
+            adj[from_id].append(to_id)
+            indegree[to_id] += 1
+
+    queue: List[str] = [sid for sid, deg in indegree.items() if deg == 0]
+    ordered: List[str] = []
+    while queue:
+        sid = queue.pop(0)
+        ordered.append(sid)
+        for nb in adj.get(sid, []):
+            indegree[nb] -= 1
+            if indegree[nb] == 0:
+                queue.append(nb)
+
+    remaining = [sid for sid in step_ids if sid not in ordered]
+    ordered.extend(sorted(remaining))
+
+    prev_steps_by_id: Dict[str, List[Dict[str, Any]]] = {sid: [] for sid in step_ids}
+    next_steps_by_id: Dict[str, List[Dict[str, Any]]] = {sid: [] for sid in step_ids}
+    for e in edges:
+        from_id = e["from_id"]
+        to_id = e["to_id"]
+
+        from_step = step_by_id.get(from_id)
+        to_step = step_by_id.get(to_id)
+
+        next_entry = {
+            "step_id": to_id,
+            "name": to_step.get("name") if to_step else None,
+            "edge_type": e.get("edge_type"),
+            "condition": e.get("condition"),
+            "label": e.get("label"),
+        }
+        if from_id in next_steps_by_id:
+            next_steps_by_id[from_id].append(next_entry)
+
+        prev_entry = {
+            "step_id": from_id,
+            "name": from_step.get("name") if from_step else None,
+            "edge_type": e.get("edge_type"),
+            "condition": e.get("condition"),
+            "label": e.get("label"),
+        }
+        if to_id in prev_steps_by_id:
+            prev_steps_by_id[to_id].append(prev_entry)
+
+    impl_rows = session.run(
+        """
+        MATCH (s:Step)-[r:EXECUTED_BY {process_id: $pid}]->(i:Implementation)
+        WHERE s.step_id IN $step_ids
+        RETURN s.step_id AS step_id, i
+        """,
+        pid=process_id,
+        step_ids=list(step_ids) if step_ids else [],
+    )
+    impls_by_step: Dict[str, List[Dict[str, Any]]] = {}
+    impl_ids_by_step: Dict[str, List[str]] = {}
+    impl_by_id: Dict[str, Dict[str, Any]] = {}
+    for r in impl_rows:
+        step_id = r["step_id"]
+        i_node = r["i"]
+        impl = _implementation_from_node(i_node)
+        impls_by_step.setdefault(step_id, []).append(impl)
+        impl_id = impl.get("impl_id")
+        if impl_id is not None:
+            impl_ids_by_step.setdefault(step_id, []).append(impl_id)
+            if impl_id not in impl_by_id:
+                impl_by_id[impl_id] = impl
+
+    data_rows = session.run(
+        """
+        MATCH (s:Step)-[:EXECUTED_BY {process_id: $pid}]->(i:Implementation)
+        MATCH (i)-[r:ACCESSES_RESOURCE {process_id: $pid}]->(d:DataResource)
+        WHERE s.step_id IN $step_ids
+        RETURN s.step_id AS step_id,
+               i.impl_id AS impl_id,
+               d,
+               r
+        """,
+        pid=process_id,
+        step_ids=list(step_ids) if step_ids else [],
+    )
+
+    data_by_step: Dict[str, List[Dict[str, Any]]] = {}
+    resources_by_id: Dict[str, Dict[str, Any]] = {}
+    accessed_resources_by_impl: Dict[str, List[Dict[str, Any]]] = {}
+    for r in data_rows:
+        step_id = r["step_id"]
+        impl_id = r["impl_id"]
+        d_node = r["d"]
+        rel = r["r"]
+        dr = _data_resource_from_node(d_node)
+        resource_id = dr.get("resource_id")
+        if resource_id is not None and resource_id not in resources_by_id:
+            resources_by_id[resource_id] = dr
+
+        entry = {
+            **dr,
+            "access_type": rel.get("access_type"),
+            "access_pattern": rel.get("access_pattern"),
+        }
+        data_by_step.setdefault(step_id, []).append(entry)
+
+        accessed_entry = {
+            "resource": dr,
+            "access": {
+                "access_type": rel.get("access_type"),
+                "access_pattern": rel.get("access_pattern"),
+                "process_id": rel.get("process_id"),
+            },
+        }
+        accessed_resources_by_impl.setdefault(impl_id, []).append(
+            accessed_entry
+        )
+
+    impl_impl_rows = session.run(
+        """
+        MATCH (from:Implementation)-[r:IMPL_CALL {process_id: $pid}]->(to:Implementation)
+        RETURN from.impl_id AS from_impl_id,
+               to.impl_id AS to_impl_id,
+               r.edge_type AS edge_type,
+               r.condition AS condition,
+               r.label AS label,
+               r.process_id AS process_id
+        """,
+        pid=process_id,
+    )
+    impl_impl_links = [row.data() for row in impl_impl_rows]
+
+    called_impls_by_impl: Dict[str, List[Dict[str, Any]]] = {}
+    called_by_impls_by_impl: Dict[str, List[Dict[str, Any]]] = {}
+    for link in impl_impl_links:
+        from_id = link.get("from_impl_id")
+        to_id = link.get("to_impl_id")
+        if not from_id or not to_id:
+            continue
+
+        from_impl = impl_by_id.get(from_id)
+        to_impl = impl_by_id.get(to_id)
+
+        if to_impl is not None:
+            outgoing_entry = {
+                "impl": {
+                    "impl_id": to_impl.get("impl_id"),
+                    "name": to_impl.get("name"),
+                    "type": to_impl.get("type"),
+                    "system": to_impl.get("system"),
+                },
+                "edge_type": link.get("edge_type"),
+                "condition": link.get("condition"),
+                "label": link.get("label"),
+                "process_id": link.get("process_id"),
+            }
+            called_impls_by_impl.setdefault(from_id, []).append(
+                outgoing_entry
+            )
+
+        if from_impl is not None:
+            incoming_entry = {
+                "impl": {
+                    "impl_id": from_impl.get("impl_id"),
+                    "name": from_impl.get("name"),
+                    "type": from_impl.get("type"),
+                    "system": from_impl.get("system"),
+                },
+                "edge_type": link.get("edge_type"),
+                "condition": link.get("condition"),
+                "label": link.get("label"),
+                "process_id": link.get("process_id"),
+            }
+            called_by_impls_by_impl.setdefault(to_id, []).append(
+                incoming_entry
+            )
+
+    steps: List[Dict[str, Any]] = []
+    for idx, sid in enumerate(ordered):
+        s = step_by_id.get(sid)
+        if not s:
+            continue
+
+        impl_refs: List[Dict[str, Any]] = []
+        for impl_id in impl_ids_by_step.get(sid, []):
+            impl = impl_by_id.get(impl_id)
+            if not impl:
+                continue
+            impl_refs.append(
+                {
+                    "impl_id": impl.get("impl_id"),
+                    "name": impl.get("name"),
+                    "type": impl.get("type"),
+                    "system": impl.get("system"),
+                    "description": impl.get("description"),
+                    "code_ref": impl.get("code_ref"),
+                }
+            )
+
+        step_entry: Dict[str, Any] = {
+            "step": {
+                "order_no": (idx + 1) * 10,
+                "step_id": sid,
+                "name": s.get("name"),
+                "description": s.get("description"),
+                "step_type": s.get("step_type"),
+            },
+            "prev_steps": prev_steps_by_id.get(sid, []),
+            "next_steps": next_steps_by_id.get(sid, []),
+            "implementations": impl_refs,
+            "data_resources": data_by_step.get(sid, []),
+        }
+        steps.append(step_entry)
+
+    implementations: List[Dict[str, Any]] = []
+    for impl_id, impl in impl_by_id.items():
+        implementations.append(
+            {
+                **impl,
+                "accessed_resources": accessed_resources_by_impl.get(
+                    impl_id, []
+                ),
+                "called_impls": called_impls_by_impl.get(impl_id, []),
+                "called_by_impls": called_by_impls_by_impl.get(impl_id, []),
+            }
+        )
+
+    resources: List[Dict[str, Any]] = list(resources_by_id.values())
+
+    logger.info(
+        f"[图查询] 获取业务流程上下文成功 process_id={process_id}, steps={len(steps)}, implementations={len(implementations)}, resources={len(resources)}"
+    )
+
+    return {
+        "process": process,
+        "steps": steps,
+        "implementations": implementations,
+        "resources": resources,
+    }
+
+
 def get_business_context(process_id: str) -> Dict[str, Any]:
     """基于 Neo4j 获取指定业务流程的完整图上下文。"""
 
@@ -80,294 +376,7 @@ def get_business_context(process_id: str) -> Dict[str, Any]:
                 logger.warning(f"[图查询] {msg}")
                 raise ValueError(msg)
             b_node = record["b"]
-            process = _business_from_node(b_node)
-
-            edge_records = session.run(
-                """
-                MATCH (from:Step)-[e:NEXT {process_id: $pid}]->(to:Step)
-                RETURN from.step_id AS from_id,
-                       to.step_id AS to_id,
-                       e.edge_type AS edge_type,
-                       e.condition AS condition,
-                       e.label AS label
-                """,
-                pid=process_id,
-            )
-            edges: List[Dict[str, Any]] = [r.data() for r in edge_records]
-
-            step_ids = set()
-            for e in edges:
-                step_ids.add(e["from_id"])
-                step_ids.add(e["to_id"])
-
-            exec_step_records = session.run(
-                """
-                MATCH (s:Step)-[:EXECUTED_BY {process_id: $pid}]->(:Implementation)
-                RETURN DISTINCT s.step_id AS step_id
-                """,
-                pid=process_id,
-            )
-            for r in exec_step_records:
-                step_ids.add(r["step_id"])
-
-            step_by_id: Dict[str, Dict[str, Any]] = {}
-            if step_ids:
-                step_result = session.run(
-                    """
-                    MATCH (s:Step)
-                    WHERE s.step_id IN $step_ids
-                    RETURN s
-                    """,
-                    step_ids=list(step_ids),
-                )
-                for r in step_result:
-                    s_node = r["s"]
-                    sid = s_node.get("step_id")
-                    if sid is None:
-                        continue
-                    step_by_id[sid] = _step_from_node(s_node)
-
-            indegree: Dict[str, int] = {sid: 0 for sid in step_ids}
-            adj: Dict[str, List[str]] = {sid: [] for sid in step_ids}
-            for e in edges:
-                from_id = e["from_id"]
-                to_id = e["to_id"]
-                if from_id in adj and to_id in adj:
-                    adj[from_id].append(to_id)
-                    indegree[to_id] += 1
-
-            queue: List[str] = [sid for sid, deg in indegree.items() if deg == 0]
-            ordered: List[str] = []
-            while queue:
-                sid = queue.pop(0)
-                ordered.append(sid)
-                for nb in adj.get(sid, []):
-                    indegree[nb] -= 1
-                    if indegree[nb] == 0:
-                        queue.append(nb)
-
-            remaining = [sid for sid in step_ids if sid not in ordered]
-            ordered.extend(sorted(remaining))
-
-            prev_steps_by_id: Dict[str, List[Dict[str, Any]]] = {sid: [] for sid in step_ids}
-            next_steps_by_id: Dict[str, List[Dict[str, Any]]] = {sid: [] for sid in step_ids}
-            for e in edges:
-                from_id = e["from_id"]
-                to_id = e["to_id"]
-
-                from_step = step_by_id.get(from_id)
-                to_step = step_by_id.get(to_id)
-
-                next_entry = {
-                    "step_id": to_id,
-                    "name": to_step.get("name") if to_step else None,
-                    "edge_type": e.get("edge_type"),
-                    "condition": e.get("condition"),
-                    "label": e.get("label"),
-                }
-                if from_id in next_steps_by_id:
-                    next_steps_by_id[from_id].append(next_entry)
-
-                prev_entry = {
-                    "step_id": from_id,
-                    "name": from_step.get("name") if from_step else None,
-                    "edge_type": e.get("edge_type"),
-                    "condition": e.get("condition"),
-                    "label": e.get("label"),
-                }
-                if to_id in prev_steps_by_id:
-                    prev_steps_by_id[to_id].append(prev_entry)
-
-            impl_rows = session.run(
-                """
-                MATCH (s:Step)-[r:EXECUTED_BY {process_id: $pid}]->(i:Implementation)
-                WHERE s.step_id IN $step_ids
-                RETURN s.step_id AS step_id, i
-                """,
-                pid=process_id,
-                step_ids=list(step_ids) if step_ids else [],
-            )
-            impls_by_step: Dict[str, List[Dict[str, Any]]] = {}
-            impl_ids_by_step: Dict[str, List[str]] = {}
-            impl_by_id: Dict[str, Dict[str, Any]] = {}
-            for r in impl_rows:
-                step_id = r["step_id"]
-                i_node = r["i"]
-                impl = _implementation_from_node(i_node)
-                impls_by_step.setdefault(step_id, []).append(impl)
-                impl_id = impl.get("impl_id")
-                if impl_id is not None:
-                    impl_ids_by_step.setdefault(step_id, []).append(impl_id)
-                    if impl_id not in impl_by_id:
-                        impl_by_id[impl_id] = impl
-
-            data_rows = session.run(
-                """
-                MATCH (s:Step)-[:EXECUTED_BY {process_id: $pid}]->(i:Implementation)
-                MATCH (i)-[r:ACCESSES_RESOURCE {process_id: $pid}]->(d:DataResource)
-                WHERE s.step_id IN $step_ids
-                RETURN s.step_id AS step_id,
-                       i.impl_id AS impl_id,
-                       d,
-                       r
-                """,
-                pid=process_id,
-                step_ids=list(step_ids) if step_ids else [],
-            )
-
-            data_by_step: Dict[str, List[Dict[str, Any]]] = {}
-            resources_by_id: Dict[str, Dict[str, Any]] = {}
-            accessed_resources_by_impl: Dict[str, List[Dict[str, Any]]] = {}
-            for r in data_rows:
-                step_id = r["step_id"]
-                impl_id = r["impl_id"]
-                d_node = r["d"]
-                rel = r["r"]
-                dr = _data_resource_from_node(d_node)
-                resource_id = dr.get("resource_id")
-                if resource_id is not None and resource_id not in resources_by_id:
-                    resources_by_id[resource_id] = dr
-
-                entry = {
-                    **dr,
-                    "access_type": rel.get("access_type"),
-                    "access_pattern": rel.get("access_pattern"),
-                }
-                data_by_step.setdefault(step_id, []).append(entry)
-
-                accessed_entry = {
-                    "resource": dr,
-                    "access": {
-                        "access_type": rel.get("access_type"),
-                        "access_pattern": rel.get("access_pattern"),
-                        "process_id": rel.get("process_id"),
-                    },
-                }
-                accessed_resources_by_impl.setdefault(impl_id, []).append(
-                    accessed_entry
-                )
-
-            impl_impl_rows = session.run(
-                """
-                MATCH (from:Implementation)-[r:IMPL_CALL {process_id: $pid}]->(to:Implementation)
-                RETURN from.impl_id AS from_impl_id,
-                       to.impl_id AS to_impl_id,
-                       r.edge_type AS edge_type,
-                       r.condition AS condition,
-                       r.label AS label,
-                       r.process_id AS process_id
-                """,
-                pid=process_id,
-            )
-            impl_impl_links = [row.data() for row in impl_impl_rows]
-
-            called_impls_by_impl: Dict[str, List[Dict[str, Any]]] = {}
-            called_by_impls_by_impl: Dict[str, List[Dict[str, Any]]] = {}
-            for link in impl_impl_links:
-                from_id = link.get("from_impl_id")
-                to_id = link.get("to_impl_id")
-                if not from_id or not to_id:
-                    continue
-
-                from_impl = impl_by_id.get(from_id)
-                to_impl = impl_by_id.get(to_id)
-
-                if to_impl is not None:
-                    outgoing_entry = {
-                        "impl": {
-                            "impl_id": to_impl.get("impl_id"),
-                            "name": to_impl.get("name"),
-                            "type": to_impl.get("type"),
-                            "system": to_impl.get("system"),
-                        },
-                        "edge_type": link.get("edge_type"),
-                        "condition": link.get("condition"),
-                        "label": link.get("label"),
-                        "process_id": link.get("process_id"),
-                    }
-                    called_impls_by_impl.setdefault(from_id, []).append(
-                        outgoing_entry
-                    )
-
-                if from_impl is not None:
-                    incoming_entry = {
-                        "impl": {
-                            "impl_id": from_impl.get("impl_id"),
-                            "name": from_impl.get("name"),
-                            "type": from_impl.get("type"),
-                            "system": from_impl.get("system"),
-                        },
-                        "edge_type": link.get("edge_type"),
-                        "condition": link.get("condition"),
-                        "label": link.get("label"),
-                        "process_id": link.get("process_id"),
-                    }
-                    called_by_impls_by_impl.setdefault(to_id, []).append(
-                        incoming_entry
-                    )
-
-            steps: List[Dict[str, Any]] = []
-            for idx, sid in enumerate(ordered):
-                s = step_by_id.get(sid)
-                if not s:
-                    continue
-
-                impl_refs: List[Dict[str, Any]] = []
-                for impl_id in impl_ids_by_step.get(sid, []):
-                    impl = impl_by_id.get(impl_id)
-                    if not impl:
-                        continue
-                    impl_refs.append(
-                        {
-                            "impl_id": impl.get("impl_id"),
-                            "name": impl.get("name"),
-                            "type": impl.get("type"),
-                            "system": impl.get("system"),
-                            "description": impl.get("description"),
-                            "code_ref": impl.get("code_ref"),
-                        }
-                    )
-
-                step_entry: Dict[str, Any] = {
-                    "step": {
-                        "order_no": (idx + 1) * 10,
-                        "step_id": sid,
-                        "name": s.get("name"),
-                        "description": s.get("description"),
-                        "step_type": s.get("step_type"),
-                    },
-                    "prev_steps": prev_steps_by_id.get(sid, []),
-                    "next_steps": next_steps_by_id.get(sid, []),
-                    "implementations": impl_refs,
-                    "data_resources": data_by_step.get(sid, []),
-                }
-                steps.append(step_entry)
-
-            implementations: List[Dict[str, Any]] = []
-            for impl_id, impl in impl_by_id.items():
-                implementations.append(
-                    {
-                        **impl,
-                        "accessed_resources": accessed_resources_by_impl.get(
-                            impl_id, []
-                        ),
-                        "called_impls": called_impls_by_impl.get(impl_id, []),
-                        "called_by_impls": called_by_impls_by_impl.get(impl_id, []),
-                    }
-                )
-
-            resources: List[Dict[str, Any]] = list(resources_by_id.values())
-
-            logger.info(
-                f"[图查询] 获取业务流程上下文成功 process_id={process_id}, steps={len(steps)}, implementations={len(implementations)}, resources={len(resources)}"
-            )
-
-            return {
-                "process": process,
-                "steps": steps,
-                "implementations": implementations,
-                "resources": resources,
-            }
+            return _build_business_context(session, process_id, b_node)
     except (ServiceUnavailable, AuthError, ClientError) as e:
         logger.error(
             f"[图查询] 获取业务流程上下文 Neo4j 错误 process_id={process_id}, error={e}"
@@ -435,6 +444,45 @@ def list_businesses(
         driver.close()
 
 
+def _build_resource_usages(session, resource_id: str, r_node) -> Dict[str, Any]:
+    """在已打开的会话中，基于已查到的数据资源节点组装上下文"""
+    resource = _data_resource_from_node(r_node)
+
+    rows = session.run(
+        """
+        MATCH (i:Implementation)-[ar:ACCESSES_RESOURCE]->(r:DataResource {resource_id: $rid})
+        MATCH (s:Step)-[ex:EXECUTED_BY {process_id: ar.process_id}]->(i)
+        MATCH (b:Business {process_id: ar.process_id})
+        RETURN b, s, i, ar
+        ORDER BY b.name, s.name, i.name
+        """,
+        rid=resource_id,
+    )
+    usages: List[Dict[str, Any]] = []
+    for row in rows:
+        b_node = row["b"]
+        s_node = row["s"]
+        i_node = row["i"]
+        ar = row["ar"]
+        usages.append(
+            {
+                "process": _business_from_node(b_node),
+                "step": _step_from_node(s_node),
+                "implementation": _implementation_from_node(i_node),
+                "access": {
+                    "access_type": ar.get("access_type"),
+                    "access_pattern": ar.get("access_pattern"),
+                    "process_id": ar.get("process_id"),
+                },
+            }
+        )
+
+    logger.info(
+        f"[图查询] 查询数据资源使用情况完成 resource_id={resource_id}, usages={len(usages)}"
+    )
+    return {"resource": resource, "usages": usages}
+
+
 def get_resource_usages(resource_id: str) -> Dict[str, Any]:
     """查询指定数据资源在各业务流程中的使用情况。"""
 
@@ -453,41 +501,7 @@ def get_resource_usages(resource_id: str) -> Dict[str, Any]:
                 logger.warning(f"[图查询] {msg}")
                 raise ValueError(msg)
             r_node = res_record["r"]
-            resource = _data_resource_from_node(r_node)
-
-            rows = session.run(
-                """
-                MATCH (i:Implementation)-[ar:ACCESSES_RESOURCE]->(r:DataResource {resource_id: $rid})
-                MATCH (s:Step)-[ex:EXECUTED_BY {process_id: ar.process_id}]->(i)
-                MATCH (b:Business {process_id: ar.process_id})
-                RETURN b, s, i, ar
-                ORDER BY b.name, s.name, i.name
-                """,
-                rid=resource_id,
-            )
-            usages: List[Dict[str, Any]] = []
-            for row in rows:
-                b_node = row["b"]
-                s_node = row["s"]
-                i_node = row["i"]
-                ar = row["ar"]
-                usages.append(
-                    {
-                        "process": _business_from_node(b_node),
-                        "step": _step_from_node(s_node),
-                        "implementation": _implementation_from_node(i_node),
-                        "access": {
-                            "access_type": ar.get("access_type"),
-                            "access_pattern": ar.get("access_pattern"),
-                            "process_id": ar.get("process_id"),
-                        },
-                    }
-                )
-
-            logger.info(
-                f"[图查询] 查询数据资源使用情况完成 resource_id={resource_id}, usages={len(usages)}"
-            )
-            return {"resource": resource, "usages": usages}
+            return _build_resource_usages(session, resource_id, r_node)
     except (ServiceUnavailable, AuthError, ClientError) as e:
         logger.error(
             f"[图查询] 查询数据资源使用情况 Neo4j 错误 resource_id={resource_id}, error={e}"
@@ -503,6 +517,70 @@ def get_resource_usages(resource_id: str) -> Dict[str, Any]:
         driver.close()
 
 
+def _build_resource_context(session, resource_id: str, r_node) -> Dict[str, Any]:
+    """在已打开的会话中，基于已查到的数据资源节点组装上下文"""
+    resource = _data_resource_from_node(r_node)
+
+    rows = session.run(
+        """
+        MATCH (i:Implementation)-[ar:ACCESSES_RESOURCE]->(r:DataResource {resource_id: $rid})
+        OPTIONAL MATCH (s:Step)-[ex:EXECUTED_BY {process_id: ar.process_id}]->(i)
+        OPTIONAL MATCH (b:Business {process_id: ar.process_id})
+        RETURN b, s, i, ar
+        """,
+        rid=resource_id,
+    )
+
+    businesses: Dict[str, Dict[str, Any]] = {}
+    steps: Dict[str, Dict[str, Any]] = {}
+    implementations: Dict[str, Dict[str, Any]] = {}
+    impl_resource_links: List[Dict[str, Any]] = []
+
+    for row in rows:
+        b_node = row["b"]
+        s_node = row["s"]
+        i_node = row["i"]
+        ar = row["ar"]
+
+        if b_node is not None:
+            b = _business_from_node(b_node)
+            bid = b.get("process_id")
+            if bid is not None and bid not in businesses:
+                businesses[bid] = b
+        if s_node is not None:
+            s = _step_from_node(s_node)
+            sid = s.get("step_id")
+            if sid is not None and sid not in steps:
+                steps[sid] = s
+        if i_node is not None:
+            impl = _implementation_from_node(i_node)
+            iid = impl.get("impl_id")
+            if iid is not None and iid not in implementations:
+                implementations[iid] = impl
+        if i_node is not None and ar is not None:
+            impl_resource_links.append(
+                {
+                    "process_id": ar.get("process_id"),
+                    "impl_id": i_node.get("impl_id"),
+                    "resource_id": resource_id,
+                    "access_type": ar.get("access_type"),
+                    "access_pattern": ar.get("access_pattern"),
+                }
+            )
+
+    logger.info(
+        f"[图查询] 获取数据资源上下文完成 resource_id={resource_id}, businesses={len(businesses)}, steps={len(steps)}, implementations={len(implementations)}, links={len(impl_resource_links)}"
+    )
+
+    return {
+        "resource": resource,
+        "businesses": list(businesses.values()),
+        "steps": list(steps.values()),
+        "implementations": list(implementations.values()),
+        "impl_resource_links": impl_resource_links,
+    }
+
+
 def get_resource_context(resource_id: str) -> Dict[str, Any]:
     """围绕指定数据资源返回相关业务、步骤与实现的上下文。"""
 
@@ -521,66 +599,7 @@ def get_resource_context(resource_id: str) -> Dict[str, Any]:
                 logger.warning(f"[图查询] {msg}")
                 raise ValueError(msg)
             r_node = res_record["r"]
-            resource = _data_resource_from_node(r_node)
-
-            rows = session.run(
-                """
-                MATCH (i:Implementation)-[ar:ACCESSES_RESOURCE]->(r:DataResource {resource_id: $rid})
-                OPTIONAL MATCH (s:Step)-[ex:EXECUTED_BY {process_id: ar.process_id}]->(i)
-                OPTIONAL MATCH (b:Business {process_id: ar.process_id})
-                RETURN b, s, i, ar
-                """,
-                rid=resource_id,
-            )
-
-            businesses: Dict[str, Dict[str, Any]] = {}
-            steps: Dict[str, Dict[str, Any]] = {}
-            implementations: Dict[str, Dict[str, Any]] = {}
-            impl_resource_links: List[Dict[str, Any]] = []
-
-            for row in rows:
-                b_node = row["b"]
-                s_node = row["s"]
-                i_node = row["i"]
-                ar = row["ar"]
-
-                if b_node is not None:
-                    b = _business_from_node(b_node)
-                    bid = b.get("process_id")
-                    if bid is not None and bid not in businesses:
-                        businesses[bid] = b
-                if s_node is not None:
-                    s = _step_from_node(s_node)
-                    sid = s.get("step_id")
-                    if sid is not None and sid not in steps:
-                        steps[sid] = s
-                if i_node is not None:
-                    impl = _implementation_from_node(i_node)
-                    iid = impl.get("impl_id")
-                    if iid is not None and iid not in implementations:
-                        implementations[iid] = impl
-                if i_node is not None and ar is not None:
-                    impl_resource_links.append(
-                        {
-                            "process_id": ar.get("process_id"),
-                            "impl_id": i_node.get("impl_id"),
-                            "resource_id": resource_id,
-                            "access_type": ar.get("access_type"),
-                            "access_pattern": ar.get("access_pattern"),
-                        }
-                    )
-
-            logger.info(
-                f"[图查询] 获取数据资源上下文完成 resource_id={resource_id}, businesses={len(businesses)}, steps={len(steps)}, implementations={len(implementations)}, links={len(impl_resource_links)}"
-            )
-
-            return {
-                "resource": resource,
-                "businesses": list(businesses.values()),
-                "steps": list(steps.values()),
-                "implementations": list(implementations.values()),
-                "impl_resource_links": impl_resource_links,
-            }
+            return _build_resource_context(session, resource_id, r_node)
     except (ServiceUnavailable, AuthError, ClientError) as e:
         logger.error(
             f"[图查询] 获取数据资源上下文 Neo4j 错误 resource_id={resource_id}, error={e}"
@@ -596,6 +615,106 @@ def get_resource_context(resource_id: str) -> Dict[str, Any]:
         driver.close()
 
 
+def _build_implementation_context(session, impl_id: str, i_node) -> Dict[str, Any]:
+    """在已打开的会话中，基于已查到的实现节点组装上下文"""
+    implementation = _implementation_from_node(i_node)
+
+    rows = session.run(
+        """
+        MATCH (s:Step)-[ex:EXECUTED_BY]->(i:Implementation {impl_id: $iid})
+        MATCH (b:Business {process_id: ex.process_id})
+        RETURN b, s, ex
+        ORDER BY b.name, s.name
+        """,
+        iid=impl_id,
+    )
+
+    process_usages: List[Dict[str, Any]] = []
+    for row in rows:
+        b_node = row["b"]
+        s_node = row["s"]
+        process_usages.append(
+            {
+                "process": _business_from_node(b_node),
+                "step": _step_from_node(s_node),
+            }
+        )
+
+    res_rows = session.run(
+        """
+        MATCH (i:Implementation {impl_id: $iid})-[ar:ACCESSES_RESOURCE]->(d:DataResource)
+        RETURN d, ar
+        ORDER BY d.name
+        """,
+        iid=impl_id,
+    )
+    resources: List[Dict[str, Any]] = []
+    for row in res_rows:
+        d_node = row["d"]
+        ar = row["ar"]
+        dr = _data_resource_from_node(d_node)
+        dr["access_type"] = ar.get("access_type")
+        dr["access_pattern"] = ar.get("access_pattern")
+        dr["process_id"] = ar.get("process_id")
+        resources.append(dr)
+
+    outgoing_rows = session.run(
+        """
+        MATCH (i:Implementation {impl_id: $iid})-[r:IMPL_CALL]->(to:Implementation)
+        RETURN to, r
+        """,
+        iid=impl_id,
+    )
+    outgoing: List[Dict[str, Any]] = []
+    for row in outgoing_rows:
+        to_node = row["to"]
+        r = row["r"]
+        outgoing.append(
+            {
+                "to": _implementation_from_node(to_node),
+                "edge_type": r.get("edge_type"),
+                "condition": r.get("condition"),
+                "label": r.get("label"),
+                "process_id": r.get("process_id"),
+            }
+        )
+
+    incoming_rows = session.run(
+        """
+        MATCH (from:Implementation)-[r:IMPL_CALL]->(i:Implementation {impl_id: $iid})
+        RETURN from, r
+        """,
+        iid=impl_id,
+    )
+    incoming: List[Dict[str, Any]] = []
+    for row in incoming_rows:
+        from_node = row["from"]
+        r = row["r"]
+        incoming.append(
+            {
+                "from": _implementation_from_node(from_node),
+                "edge_type": r.get("edge_type"),
+                "condition": r.get("condition"),
+                "label": r.get("label"),
+                "process_id": r.get("process_id"),
+            }
+        )
+
+    logger.info(
+        f"[图查询] 获取实现上下文完成 impl_id={impl_id}, process_usages={len(process_usages)}, resources={len(resources)}, outgoing_calls={len(outgoing)}, incoming_calls={len(incoming)}"
+    )
+
+    return {
+        "implementation": implementation,
+        "process_usages": process_usages,
+        "resources": resources,
+        "calls": {
+            "outgoing": outgoing,
+            "incoming": incoming,
+        },
+    }
+
+
 def get_implementation_context(impl_id: str) -> Dict[str, Any]:
     """获取指定实现的业务使用情况、资源依赖及实现间调用关系。"""
 
@@ -614,102 +733,7 @@ def get_implementation_context(impl_id: str) -> Dict[str, Any]:
                 logger.warning(f"[图查询] {msg}")
                 raise ValueError(msg)
             i_node = impl_record["i"]
-            implementation = _implementation_from_node(i_node)
-
-            rows = session.run(
-                """
-                MATCH (s:Step)-[ex:EXECUTED_BY]->(i:Implementation {impl_id: $iid})
-                MATCH (b:Business {process_id: ex.process_id})
-                RETURN b, s, ex
-                ORDER BY b.name, s.name
-                """,
-                iid=impl_id,
-            )
-
-            process_usages: List[Dict[str, Any]] = []
-            for row in rows:
-                b_node = row["b"]
-                s_node = row["s"]
-                process_usages.append(
-                    {
-                        "process": _business_from_node(b_node),
-                        "step": _step_from_node(s_node),
-                    }
-                )
-
-            res_rows = session.run(
-                """
-                MATCH (i:Implementation {impl_id: $iid})-[ar:ACCESSES_RESOURCE]->(d:DataResource)
-                RETURN d, ar
-                ORDER BY d.name
-                """,
-                iid=impl_id,
-            )
-            resources: List[Dict[str, Any]] = []
-            for row in res_rows:
-                d_node = row["d"]
-                ar = row["ar"]
-                dr = _data_resource_from_node(d_node)
-                dr["access_type"] = ar.get("access_type")
-                dr["access_pattern"] = ar.get("access_pattern")
-                dr["process_id"] = ar.get("process_id")
-                resources.append(dr)
-
-            outgoing_rows = session.run(
-                """
-                MATCH (i:Implementation {impl_id: $iid})-[r:IMPL_CALL]->(to:Implementation)
-                RETURN to, r
-                """,
-                iid=impl_id,
-            )
-            outgoing: List[Dict[str, Any]] = []
-            for row in outgoing_rows:
-                to_node = row["to"]
-                r = row["r"]
-                outgoing.append(
-                    {
-                        "to": _implementation_from_node(to_node),
-                        "edge_type": r.get("edge_type"),
-                        "condition": r.get("condition"),
-                        "label": r.get("label"),
-                        "process_id": r.get("process_id"),
-                    }
-                )
-
-            incoming_rows = session.run(
-                """
-                MATCH (from:Implementation)-[r:IMPL_CALL]->(i:Implementation {impl_id: $iid})
-                RETURN from, r
-                """,
-                iid=impl_id,
-            )
-            incoming: List[Dict[str, Any]] = []
-            for row in incoming_rows:
-                from_node = row["from"]
-                r = row["r"]
-                incoming.append(
-                    {
-                        "from": _implementation_from_node(from_node),
-                        "edge_type": r.get("edge_type"),
-                        "condition": r.get("condition"),
-                        "label": r.get("label"),
-                        "process_id": r.get("process_id"),
-                    }
-                )
-
-            logger.info(
-                f"[图查询] 获取实现上下文完成 impl_id={impl_id}, process_usages={len(process_usages)}, resources={len(resources)}, outgoing_calls={len(outgoing)}, incoming_calls={len(incoming)}"
-            )
-
-            return {
-                "implementation": implementation,
-                "process_usages": process_usages,
-                "resources": resources,
-                "calls": {
-                    "outgoing": outgoing,
-                    "incoming": incoming,
-                },
-            }
+            return _build_implementation_context(session, impl_id, i_node)
     except (ServiceUnavailable, AuthError, ClientError) as e:
         logger.error(
             f"[图查询] 获取实现上下文 Neo4j 错误 impl_id={impl_id}, error={e}"
@@ -725,6 +749,155 @@ def get_implementation_context(impl_id: str) -> Dict[str, Any]:
         driver.close()
 
 
+# 上下文缓存：多轮问答中 Agent 常对同一 ID 反复调用影响面/上下文等工具，
+# 命中时直接复用已构建的上下文，省去 Neo4j 往返。
+# 键为 (builder 名称, id)，值为 (过期时间, 上下文)；条目超过 TTL 失效，容量超限按 LRU 淘汰。
+# 图谱同步写入后由 invalidate_context_cache() 整体清空（一个流程变化会影响实现/资源的上下文）。
+# 缓存的上下文会被多次返回，调用方只读不改。
+CONTEXT_CACHE_TTL_SECONDS = 60
+CONTEXT_CACHE_MAX_ENTRIES = 2048
+_context_cache: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_context_cache_lock = Lock()
+
+
+def invalidate_context_cache() -> None:
+    """清空上下文缓存（图谱数据写入后调用）"""
+    with _context_cache_lock:
+        _context_cache.clear()
+
+
+# 批量上下文构建线程池（I/O 等待为主；并发度同时受驱动连接池大小约束）
+CONTEXT_BUILD_MAX_WORKERS = 8
+_context_pool = ThreadPoolExecutor(max_workers=CONTEXT_BUILD_MAX_WORKERS, thread_name_prefix="graph-ctx")
+
+
+def _get_contexts_bulk(
+    label: str,
+    id_prop: str,
+    ids: Sequence[str],
+    builder: Callable[[Any, str, Any], Dict[str, Any]],
+    desc: str,
+) -> Dict[str, Dict[str, Any]]:
+    """批量获取上下文，返回 {id: context}，不存在的 ID 不出现在结果中
+
+    所有 ID 共用一个驱动与会话，主节点通过一次 IN 查询批量取回，
+    避免逐个 ID 重复建立连接；单个 ID 不存在不影响其他 ID。
+    """
+    unique_ids = list(dict.fromkeys(i for i in ids if i))
+    if not unique_ids:
+        return {}
+
+    kind = builder.__name__
+    now = time.monotonic()
+    cached: Dict[str, Dict[str, Any]] = {}
+    with _context_cache_lock:
+        for entity_id in unique_ids:
+            key = (kind, entity_id)
+            entry = _context_cache.get(key)
+            if entry is None:
+                continue
+            if entry[0] <= now:
+                del _context_cache[key]
+                continue
+            _context_cache.move_to_end(key)
+            cached[entity_id] = entry[1]
+    if cached:
+        logger.debug(f"[图查询] {desc}上下文命中缓存 ids={list(cached)}")
+        missing_ids = [i for i in unique_ids if i not in cached]
+        if not missing_ids:
+            return {i: cached[i] for i in unique_ids}
+        fetched = _fetch_contexts_bulk(label, id_prop, missing_ids, builder, desc)
+        merged = {**cached, **fetched}
+        return {i: merged[i] for i in unique_ids if i in merged}
+
+    return _fetch_contexts_bulk(label, id_prop, unique_ids, builder, desc)
+
+
+def _fetch_contexts_bulk(
+    label: str,
+    id_prop: str,
+    unique_ids: List[str],
+    builder: Callable[[Any, str, Any], Dict[str, Any]],
+    desc: str,
+) -> Dict[str, Dict[str, Any]]:
+    """从 Neo4j 批量构建上下文，并写入上下文缓存
+
+    主节点一次 IN 查询取回；每个 ID 的上下文需要若干子查询，多个 ID 时
+    在线程池中各用独立会话并发构建（共享驱动的连接池），耗时接近单个 ID。
+    """
+    logger.info(f"[图查询] 批量获取{desc}上下文 ids={unique_ids}")
+    driver = get_shared_neo4j_driver()
+    try:
+        with driver.session(database=DEFAULT_NEO4J_DATABASE) as session:
+            rows = session.run(
+                f"MATCH (n:{label}) WHERE n.{id_prop} IN $ids RETURN n",
+                ids=unique_ids,
+            )
+            node_by_id = {row["n"].get(id_prop): row["n"] for row in rows}
+
+            found_ids = []
+            for entity_id in unique_ids:
+                if entity_id in node_by_id:
+                    found_ids.append(entity_id)
+                else:
+                    logger.warning(f"[图查询] {desc}不存在: {entity_id}")
+
+            contexts: Dict[str, Dict[str, Any]] = {}
+            if len(found_ids) == 1:
+                entity_id = found_ids[0]
+                contexts[entity_id] = builder(session, entity_id, node_by_id[entity_id])
+
+        if len(found_ids) > 1:
+            def _build(entity_id: str) -> Dict[str, Any]:
+                # Neo4j 会话非线程安全，每个任务使用独立会话
+                with driver.session(database=DEFAULT_NEO4J_DATABASE) as worker_session:
+                    return builder(worker_session, entity_id, node_by_id[entity_id])
+
+            # map 按提交顺序返回，结果保持输入 ID 顺序
+            for entity_id, context in zip(found_ids, _context_pool.map(_build, found_ids)):
+                contexts[entity_id] = context
+
+        if contexts:
+            kind = builder.__name__
+            expires_at = time.monotonic() + CONTEXT_CACHE_TTL_SECONDS
+            with _context_cache_lock:
+                for entity_id, context in contexts.items():
+                    _context_cache[(kind, entity_id)] = (expires_at, context)
+                    _context_cache.move_to_end((kind, entity_id))
+                while len(_context_cache) > CONTEXT_CACHE_MAX_ENTRIES:
+                    _context_cache.popitem(last=False)
+        return contexts
+    except (ServiceUnavailable, AuthError, ClientError) as e:
+        logger.error(f"[图查询] 批量获取{desc}上下文 Neo4j 错误 ids={unique_ids}, error={e}")
+        raise
+    except Exception as e:
+        logger.error(
+            f"[图查询] 批量获取{desc}上下文未知异常 ids={unique_ids}, error={e}",
+            exc_info=True,
+        )
+        raise
+
+
+def get_business_contexts(process_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    """批量获取业务流程上下文，返回 {process_id: context}。"""
+    return _get_contexts_bulk("Business", "process_id", process_ids, _build_business_context, "业务流程")
+
+
+def get_implementation_contexts(impl_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    """批量获取实现上下文，返回 {impl_id: context}。"""
+    return _get_contexts_bulk("Implementation", "impl_id", impl_ids, _build_implementation_context, "实现")
+
+
+def get_resource_contexts(resource_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    """批量获取数据资源上下文，返回 {resource_id: context}。"""
+    return _get_contexts_bulk("DataResource", "resource_id", resource_ids, _build_resource_context, "数据资源")
+
+
+def get_resource_usages_bulk(resource_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    """批量查询数据资源使用情况，返回 {resource_id: usages}。"""
+    return _get_contexts_bulk("DataResource", "resource_id", resource_ids, _build_resource_usages, "数据资源")
+
+
 def get_system_usages(system: str) -> Dict[str, Any]:
     """查询指定系统在业务流程图中的使用情况。"""
 
@@ -819,18 +992,22 @@ def get_neighborhood(
 
     depth_clause = f"*1..{int(depth)}"
 
-    where_clause = " OR ".join(
+    # 起点按标签拆成 UNION 分支，每个分支各自走对应标签的 ID 索引；
+    # 原先无标签 MATCH (start) + OR 条件无法命中索引，会退化为全图扫描。
+    # 未知类型的 ID 同时出现在多个列表中时，未命中的分支只是一次空的索引查找。
+    start_branches = "\n        UNION\n".join(
         [
-            "(size($business_ids) > 0 AND start:Business AND start.process_id IN $business_ids)",
-            "(size($step_ids) > 0 AND start:Step AND start.step_id IN $step_ids)",
-            "(size($impl_ids) > 0 AND start:Implementation AND start.impl_id IN $impl_ids)",
-            "(size($resource_ids) > 0 AND start:DataResource AND start.resource_id IN $resource_ids)",
+            "        MATCH (start:Business) WHERE start.process_id IN $business_ids RETURN start",
+            "        MATCH (start:Step) WHERE start.step_id IN $step_ids RETURN start",
+            "        MATCH (start:Implementation) WHERE start.impl_id IN $impl_ids RETURN start",
+            "        MATCH (start:DataResource) WHERE start.resource_id IN $resource_ids RETURN start",
         ]
     )
 
     query = f"""
-    MATCH (start)
-    WHERE {where_clause}
+    CALL {{
+{start_branches}
+    }}
     MATCH p=(start)-[rel{depth_clause}]-(n)
     WHERE all(r IN rel WHERE type(r) IN $rel_types)
     WITH collect(p) AS paths
@@ -19,6 +19,7 @@ from backend.app.models.resource_graph import (
     ImplementationLink,
 )
 from backend.app.core.logger import logger
+from backend.app.services.graph_service import invalidate_context_cache
 
 
 class SyncError(Exception):
@@ -542,6 +543,8 @@ def sync_process(db: Session, process_id: str) -> Dict[str, Any]:
         raise SyncError(error_msg, error_type)
         
     finally:
+        # 无论成功与否都可能已写入部分图数据，清空图查询的上下文缓存
+        invalidate_context_cache()
         if driver:
             driver.close()
             logger.info(f"[Neo4j连接] 连接已关闭")
@@ -11,12 +11,15 @@
 - 阶段间通过数据库摘要传递信息
 """
 
+import asyncio
+import json
+import uuid
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timezone
 
 from sqlalchemy.orm import Session
 
-from backend.app.models.chat import Conversation, TestSessionAnalysis
+from backend.app.models.chat import Conversation, TestSessionAnalysis, TestPhasePlanCache
 from backend.app.core.logger import logger
 
 
@@ -83,8 +86,8 @@ def get_phase_tools(phase: str) -> List:
 # 数据库操作
 # ============================================================
 
-async def get_phase_summary_from_db(session_id: str, analysis_type: str) -> str:
-    """从数据库读取阶段摘要（异步版本）"""
+def _read_phase_summary(session_id: str, analysis_type: str) -> str:
+    """同步读取阶段摘要（在工作线程中执行，避免阻塞事件循环）"""
     from backend.app.db.sqlite import SessionLocal
     
     db = SessionLocal()
@@ -98,11 +101,32 @@ async def get_phase_summary_from_db(session_id: str, analysis_type: str) -> str:
         db.close()
 
 
-def get_phase_summary_sync(session_id: str, analysis_type: str) -> str:
-    """从数据库读取阶段摘要（同步版本，供 configs.py 调用）"""
+async def get_phase_summary_from_db(session_id: str, analysis_type: str) -> str:
+    """从数据库读取阶段摘要（异步版本）
+    
+    SQLAlchemy 会话是同步的，通过 asyncio.to_thread 放到线程池执行，
+    读取期间不阻塞其他会话的流式输出。
+    """
+    return await asyncio.to_thread(_read_phase_summary, session_id, analysis_type)
+
+
+def get_phase_summary_sync(
+    session_id: str,
+    analysis_type: str,
+    db: Optional[Session] = None,
+) -> str:
+    """从数据库读取阶段摘要（同步版本，供 configs.py 调用）
+    
+    Args:
+        session_id: 会话 ID
+        analysis_type: 摘要类型
+        db: 可选，复用调用方的数据库会话；为空时临时创建并在结束后关闭
+    """
     from backend.app.db.sqlite import SessionLocal
     
-    db = SessionLocal()
+    owns_session = db is None
+    if owns_session:
+        db = SessionLocal()
     try:
         record = db.query(TestSessionAnalysis).filter(
             TestSessionAnalysis.session_id == session_id,
@@ -120,10 +144,100 @@ def get_phase_summary_sync(session_id: str, analysis_type: str) -> str:
             logger.warning(f"[Testing] 未找到摘要，该 session 已有的摘要类型: {[r.analysis_type for r in all_records]}")
         
         return result
+    finally:
+        if owns_session:
+            db.close()
+
+
+# ============================================================
+# 阶段计划缓存
+# ============================================================
+
+def _compact_tool_sequence(tool_names: List[str]) -> List[str]:
+    """压缩连续重复的工具调用，如 [a, b, b, b, c] -> [a, b ×3, c]"""
+    compacted: List[str] = []
+    last_name = None
+    repeat = 0
+    for name in tool_names + [None]:
+        if name == last_name:
+            repeat += 1
+            continue
+        if last_name is not None:
+            compacted.append(f"{last_name} ×{repeat}" if repeat > 1 else last_name)
+        last_name = name
+        repeat = 1
+    return compacted
+
+
+def phase_plan_key(project_name: str) -> str:
+    """阶段计划的分组键
+
+    需求标题每个测试会话都不同，按标题分组几乎不会命中；同一项目内各需求的阶段流程高度一致，
+    因此按项目分组（阶段单独成列），保留该项目该阶段最近一次成功的工具调用顺序。
+    """
+    return (project_name or "").strip()
+
+
+def get_cached_phase_plan(db: Session, phase: str, plan_key: str) -> List[str]:
+    """读取阶段的参考工具调用计划，不存在时返回空列表
+
+    构建 System Prompt 时使用调用方的会话，这里只读不写，不会提交或回滚调用方未完成的事务。
+    """
+    if not plan_key:
+        return []
+    try:
+        record = db.query(TestPhasePlanCache.tool_sequence).filter(
+            TestPhasePlanCache.phase == phase,
+            TestPhasePlanCache.plan_key == plan_key,
+        ).first()
+        if not record:
+            return []
+        return json.loads(record.tool_sequence)
+    except Exception as e:
+        logger.warning(f"[IntelligentTesting] 读取阶段计划缓存失败: phase={phase}, key={plan_key}, {e}")
+        return []
+
+
+def _save_phase_plan_sync(phase: str, plan_key: str, tool_names: List[str]) -> None:
+    """同步写入阶段计划（在工作线程中执行，使用独立会话）"""
+    from backend.app.db.sqlite import SessionLocal
+    
+    sequence = json.dumps(_compact_tool_sequence(tool_names), ensure_ascii=False)
+    db = SessionLocal()
+    try:
+        record = db.query(TestPhasePlanCache).filter(
+            TestPhasePlanCache.phase == phase,
+            TestPhasePlanCache.plan_key == plan_key,
+        ).first()
+        if record:
+            record.tool_sequence = sequence
+            record.updated_at = datetime.now(timezone.utc)
+        else:
+            db.add(TestPhasePlanCache(
+                id=str(uuid.uuid4()),
+                phase=phase,
+                plan_key=plan_key,
+                tool_sequence=sequence,
+            ))
+        db.commit()
+        logger.info(f"[IntelligentTesting] 已缓存阶段计划: phase={phase}, key={plan_key}, steps={sequence}")
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"[IntelligentTesting] 缓存阶段计划失败: phase={phase}, key={plan_key}, {e}")
     finally:
         db.close()
 
 
+async def save_phase_plan(phase: str, plan_key: str, tool_names: List[str]) -> None:
+    """阶段成功完成后记录其工具调用顺序，供同项目后续任务复用
+
+    SQLite 写入是同步的，通过 asyncio.to_thread 放到线程池执行，不阻塞流式输出。
+    """
+    if not plan_key or not tool_names:
+        return
+    await asyncio.to_thread(_save_phase_plan_sync, phase, plan_key, tool_names)
+
+
 async def update_session_status(
     db: Session,
     session_id: str,
@@ -0,0 +1,63 @@
+"""测试 DDL 字段解析
+
+覆盖 _parse_columns_from_ddl 对索引/约束定义行的跳过逻辑：
+FOREIGN KEY、FULLTEXT KEY、SPATIAL KEY 等行不能被误解析成字段，
+user_key、unique_code 这类字段名和行内 PRIMARY KEY 的字段不能被误跳过。
+
+运行方式：
+    python -m test.test_ddl_parsing
+"""
+
+import os
+import sys
+
+# 添加项目根目录到 path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.app.llm.langchain.tools.db import _parse_columns_from_ddl
+
+
+SAMPLE_DDL = """CREATE TABLE `t_order` (
+  `id` bigint NOT NULL AUTO_INCREMENT COMMENT '主键',
+  `user_id` bigint NOT NULL COMMENT '用户ID',
+  `user_key` varchar(64) DEFAULT NULL COMMENT '用户标识',
+  `unique_code` varchar(32) DEFAULT NULL COMMENT '订单唯一码',
+  `remark` text COMMENT '备注',
+  `location` point DEFAULT NULL COMMENT '位置',
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uk_unique_code` (`unique_code`),
+  KEY `idx_user_id` (`user_id`),
+  FULLTEXT KEY `ft_remark` (`remark`),
+  SPATIAL KEY `sp_location` (`location`),
+  CONSTRAINT `fk_user` FOREIGN KEY (`user_id`) REFERENCES `t_user` (`id`),
+  FOREIGN KEY (`user_key`) REFERENCES `t_user` (`user_key`)
+) ENGINE=InnoDB COMMENT='订单表';"""
+
+UNQUOTED_DDL = """CREATE TABLE t_user (
+    id BIGINT PRIMARY KEY COMMENT '用户ID',
+    name VARCHAR(100) NOT NULL COMMENT '用户名',
+    index_no INT COMMENT '序号',
+    INDEX idx_name (name)
+);"""
+
+
+def test_skip_index_and_constraint_lines():
+    """索引、约束定义行全部跳过，只保留字段"""
+    columns = _parse_columns_from_ddl(SAMPLE_DDL)
+    names = [c["name"] for c in columns]
+    assert names == ["id", "user_id", "user_key", "unique_code", "remark", "location"], names
+    assert columns[2]["type"] == "varchar(64)"
+
+
+def test_unquoted_columns():
+    """无反引号的字段定义：行内 PRIMARY KEY 的字段保留，INDEX 行跳过"""
+    columns = _parse_columns_from_ddl(UNQUOTED_DDL)
+    names = [c["name"] for c in columns]
+    assert names == ["id", "name", "index_no"], names
+    assert columns[0]["type"] == "BIGINT"
+
+
+if __name__ == "__main__":
+    test_skip_index_and_constraint_lines()
+    test_unquoted_columns()
+    print("DDL 解析测试通过")